@@ -68,6 +68,15 @@
   App.Config.Nav.readOnlySuffix = "-read-only";
   // Similarly, for the print view
   App.Config.Nav.printSuffix = "-print";
+  // If true, the data of every opened paper is kept in the browser's local storage, and only what changed since is
+  // fetched from the server when the paper is opened again
+  App.Config.Nav.cachePapers = true;
+  // Papers that are not cached are fetched this many lines at a time, and their first lines are shown (without
+  // annotations) as soon as they arrive.  Set to 0 to fetch whole papers in one message.
+  App.Config.Nav.windowLines = 200;
+  // If true, the server sends the contexts and events of papers as columns of values rather than as lists of
+  // records, which is smaller and quicker to encode and decode for long papers
+  App.Config.Nav.columnarPayloads = true;
 
 })(App);
 
@@ -274,6 +274,11 @@
       requestNewContext(App.Paper.id, lineNum, newStart, newEnd, contextText, callback);
     };
 
+    App.Contexts.completeFreeTextAsync = function (prefix, limit, callback) {
+      // Asks the server for the known free texts (and their grounding IDs) that start with the given prefix
+      requestCompleteFreeText(prefix, limit, callback);
+    };
+
     App.Contexts.refreshGroundings = function () {
       // Two grounding stores: `grounding` is an object mapping grounding IDs to an array of their associated free-text
       // mentions. `categorised_groundings` is a List of Lists: [<description>, [<prefix>, ...]]. We're using a list to
@@ -694,6 +699,20 @@
       });
   }
 
+  function requestCompleteFreeText(prefix, limit, callback) {
+    // Asks the server to autocomplete a free text
+    // Nothing is changed on the server, so there is nothing to alert the user about
+    var serverResponse = App.Websocket.sendRequestAsync({
+      command: 'complete_free_text',
+      prefix: prefix,
+      limit: limit
+    });
+    $.when(serverResponse)
+      .done(function (msg) {
+        callback(msg);
+      });
+  }
+
   function requestDeleteContext(paperID, serverID, callback) {
     // Asks the server to delete a given context
     // Includes the paper ID as a basic sanity check
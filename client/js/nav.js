@@ -132,10 +132,15 @@
     ");
 
     // We need to query the server for the paper data, and defer further processing until we receive it
-    var serverResponse = App.Websocket.sendRequestAsync({
-      command: 'get_paper_data',
-      paperID: paperID
-    });
+    // If we have a copy of it from before, the server only needs to send what changed since; otherwise, it is
+    // fetched a window at a time
+    var cached = _loadCachedPaper(paperID);
+    var serverResponse;
+    if (cached || !App.Config.Nav.windowLines) {
+      serverResponse = _fetchPaper(paperID, cached);
+    } else {
+      serverResponse = _fetchPaperWindows(paperID, mode);
+    }
     $.when(serverResponse).done(function (msg) {
       // Check whether the paper is locked here first before loading it up
       if (msg.data.paper.locked && mode == "annotate") {
@@ -150,6 +155,8 @@
         return Nav.setHash(Nav.getViewHash(paperID));
       }
 
+      _storeCachedPaper(paperID, msg.data);
+
       // At this point, the server has given us what we need
       // Load and prep data stores
       App.loadData(msg.data);
@@ -176,4 +183,199 @@
       Nav.setHash("");
     });
   }
+
+  function _fetchPaper(paperID, cached) {
+    // Fetches the whole paper, or only what changed since the given cached copy of it
+    var request = _paperRequest({
+      command: 'get_paper_data',
+      paperID: paperID
+    });
+    if (cached) {
+      request.knownVersion = cached.paper.version;
+    }
+    return App.Websocket.sendRequestAsync(request).then(function (msg) {
+      _decodeRecords(msg.data);
+      if (msg.data.not_modified) {
+        msg.data = cached;
+      } else if (msg.data.since !== undefined) {
+        msg.data = _mergePaperDelta(cached, msg.data);
+      }
+      return msg;
+    });
+  }
+
+  function _fetchPaperWindows(paperID, mode) {
+    // Fetches the paper's skeleton, then all its windows of lines at once, previewing the first window as soon as
+    // it arrives.  Resolves with the whole paper, as _fetchPaper() would.
+    return App.Websocket.sendRequestAsync({
+      command: 'get_paper_skeleton',
+      paperID: paperID
+    }).then(function (msg) {
+      var skeleton = msg.data;
+      if (skeleton.paper.locked && mode == "annotate") {
+        // We will be switching to the read-only view anyway
+        return {data: {paper: skeleton.paper}};
+      }
+
+      var windowLines = App.Config.Nav.windowLines;
+      var lineCount = skeleton.paper.line_count;
+      var windows = [];
+      for (var start = 0; start < lineCount; start += windowLines) {
+        windows.push(App.Websocket.sendRequestAsync(_paperRequest({
+          command: 'get_paper_window',
+          paperID: paperID,
+          // The last window also takes any lines added since the skeleton
+          lines: [start, start + windowLines < lineCount ? start + windowLines : null]
+        })).then(function (msg) {
+          _decodeRecords(msg.data);
+          return msg;
+        }));
+      }
+      if (windows.length > 0) {
+        windows[0].done(function (msg) {
+          App.View.initPreview(mode, skeleton.paper, msg.data.sentences);
+        });
+      }
+
+      return $.when.apply($, windows).then(function () {
+        var data = {
+          paper: $.extend({}, skeleton.paper, {sentences: []}),
+          contexts_reach: [],
+          contexts_manual: [],
+          context_categories: skeleton.context_categories,
+          events: []
+        };
+        delete data.paper.line_count;
+
+        // If the paper changed while it was being fetched, catch up with what changed since the skeleton
+        var changed = false;
+        $.each(arguments, function (index, msg) {
+          changed = changed || msg.data.paper.version != skeleton.paper.version;
+          data.paper.sentences = data.paper.sentences.concat(msg.data.sentences);
+          data.contexts_reach = data.contexts_reach.concat(msg.data.contexts_reach);
+          data.contexts_manual = data.contexts_manual.concat(msg.data.contexts_manual);
+          data.events = data.events.concat(msg.data.events);
+        });
+        var byID = function (a, b) {
+          return a.id - b.id;
+        };
+        data.contexts_reach.sort(byID);
+        data.contexts_manual.sort(byID);
+
+        if (changed) {
+          return _fetchPaper(paperID, data);
+        }
+        return {data: data};
+      });
+    });
+  }
+
+  function _paperRequest(request) {
+    // Asks for the contexts and events in the paper data to be sent as columns, if configured
+    if (App.Config.Nav.columnarPayloads) {
+      request.format = "columnar";
+    }
+    return request;
+  }
+
+  function _decodeRecords(data) {
+    // Turns the columnar contexts and events in the given paper data (if any) back into lists of records, in place
+    $.each(["contexts_reach", "contexts_manual", "events"], function (index, key) {
+      var table = data[key];
+      if (table === undefined || $.isArray(table)) {
+        return;
+      }
+
+      var names = Object.keys(table.columns);
+      var records = new Array(table.length);
+      var i, j;
+      for (i = 0; i < table.length; i++) {
+        records[i] = {};
+      }
+      for (j = 0; j < names.length; j++) {
+        var column = table.columns[names[j]];
+        var dictionary = table.dictionaries[names[j]];
+        for (i = 0; i < table.length; i++) {
+          records[i][names[j]] = dictionary ? dictionary[column[i]] : column[i];
+        }
+      }
+      data[key] = records;
+    });
+  }
+
+  function _cachedPaperKey(paperID) {
+    return "paper:" + paperID;
+  }
+
+  function _loadCachedPaper(paperID) {
+    // Returns the paper data stored the last time this paper was opened, if any
+    if (!App.Config.Nav.cachePapers) {
+      return null;
+    }
+    try {
+      var cached = JSON.parse(localStorage.getItem(_cachedPaperKey(paperID)));
+      if (cached && cached.paper && cached.paper.version !== undefined) {
+        return cached;
+      }
+    } catch (e) {
+      // Local storage may be unavailable or hold something unreadable; just fetch the whole paper
+    }
+    return null;
+  }
+
+  function _storeCachedPaper(paperID, data) {
+    // Stored before App.loadData() gets its hands on the data
+    if (!App.Config.Nav.cachePapers || data.paper.version === undefined) {
+      return;
+    }
+    try {
+      localStorage.setItem(_cachedPaperKey(paperID), JSON.stringify(data));
+    } catch (e) {
+      // Most likely out of space: Drop this paper's copy rather than keep a stale one
+      try {
+        localStorage.removeItem(_cachedPaperKey(paperID));
+      } catch (e2) {
+      }
+    }
+  }
+
+  function _mergePaperDelta(cached, delta) {
+    // Applies the changes the server sent since the cached version of the paper
+    var merged = $.extend({}, cached);
+    merged.paper = $.extend({}, cached.paper, delta.paper);
+    if (delta.comments !== undefined) {
+      merged.comments = delta.comments;
+    }
+
+    function ids(records) {
+      return $.map(records, function (record) {
+        return record.id;
+      });
+    }
+
+    function mergeRecords(records, dropped, changed) {
+      // Replaces the dropped and changed records with the changed ones
+      var drop = {};
+      $.each(dropped.concat(ids(changed)), function (i, id) {
+        drop[id] = true;
+      });
+      return $.grep(records, function (record) {
+        return !drop[record.id];
+      }).concat(changed);
+    }
+
+    // A changed context may also have moved between the Reach and manual lists
+    var droppedContexts = delta.deleted_contexts.concat(ids(delta.contexts_reach), ids(delta.contexts_manual));
+    var byID = function (a, b) {
+      return a.id - b.id;
+    };
+    merged.contexts_reach = mergeRecords(cached.contexts_reach, droppedContexts, delta.contexts_reach).sort(byID);
+    merged.contexts_manual = mergeRecords(cached.contexts_manual, droppedContexts, delta.contexts_manual).sort(byID);
+
+    // In the same order as the server sends them
+    merged.events = mergeRecords(cached.events, delta.deleted_events, delta.events).sort(function (a, b) {
+      return (a.line_num - b.line_num) || (a.interval_start - b.interval_start) || (a.id - b.id);
+    });
+    return merged;
+  }
 })(App);
\ No newline at end of file
@@ -47,6 +47,33 @@
 
   };
 
+  View.initPreview = function (mode, paper, sentences) {
+    // Shows the title and the given first sentences of a paper that is still being loaded, without any annotations
+    // initView() replaces the preview once the whole paper is in
+
+    $("#main-wrapper")
+      .html(createPaperViewHTML(mode))
+      .foundation();
+
+    $("#head-paper-title").html(paper.title);
+
+    var sections = $.map(paper.sections.split(","), Number);
+    var mainHTMLList = [];
+    for (var lineNum = 0; lineNum < sentences.length; lineNum++) {
+      if (lineNum > 0 && $.inArray(lineNum, sections) > -1) {
+        mainHTMLList.push("<hr>");
+      }
+      mainHTMLList.push(" ");
+      mainHTMLList.push("<sup class='sentence-number'>(" + lineNum + ")</sup>");
+      mainHTMLList.push("<span class='sentence'>");
+      mainHTMLList.push(prettifyHTMLText(sentences[lineNum].split(/\s+/).join(" ")));
+      mainHTMLList.push("</span>");
+    }
+    mainHTMLList.push("<p>Loading...</p>");
+
+    $("#main-paper-text").html(mainHTMLList.join(""));
+  };
+
   View.refreshSentence = function (lineNum) {
     // Marks up and redraws the given sentence
     preprocessLine(lineNum);
@@ -0,0 +1,63 @@
+"""
+Columnar encoding of the context and event lists in paper responses
+(get_paper_data(), get_paper_window()), for clients that ask for it by
+sending `"format": "columnar"` with their request.
+
+Instead of a list of records that each repeat every key, a list is sent as
+one table:
+
+    {"length": 2,
+     "columns": {"id": [4, 7], "type": [0, 1], "paper_id": [0, 0], ...},
+     "dictionaries": {"type": ["reach", "manual"], "paper_id": ["PMC1"]}}
+
+Every column holds one value per record, in order.  The values of the fields
+in DICTIONARY_FIELDS are each sent once, in the table's `dictionaries`, and
+the column holds their indices instead.
+"""
+
+FORMAT = "columnar"
+
+# Fields with few distinct values per paper
+DICTIONARY_FIELDS = ('type', 'paper_id')
+
+
+def requested(request):
+    """
+    Whether the client asked for columnar responses
+    """
+    return request.get('format') == FORMAT
+
+
+def encode_rows(names, rows):
+    """
+    Returns the table for the given records, as rows of values for the
+    fields in `names`
+    """
+    columns = list(zip(*rows)) if rows else [()] * len(names)
+    table = {
+        'length':       len(rows),
+        'columns':      {},
+        'dictionaries': {}
+    }
+    for name, column in zip(names, columns):
+        if name in DICTIONARY_FIELDS:
+            indices = {}
+            column = [indices.setdefault(value, len(indices))
+                      for value in column]
+            table['dictionaries'][name] = list(indices)
+        table['columns'][name] = column
+    return table
+
+
+def decode(table):
+    """
+    Returns the records in the given table, as dicts
+    """
+    columns = []
+    for name, column in table['columns'].items():
+        dictionary = table['dictionaries'].get(name)
+        if dictionary is not None:
+            column = [dictionary[index] for index in column]
+        columns.append(column)
+    names = list(table['columns'])
+    return [dict(zip(names, values)) for values in zip(*columns)]
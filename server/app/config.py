@@ -79,6 +79,13 @@ db_vars["grounding_text_table"] = "grounding_text"
 # Event-Grounding associations will be tracked individually (many-many)
 db_vars["association_table"] = "event_grounding"
 
+# Digest of every grounding dictionary file, as of its last load
+db_vars["dictionary_table"] = "grounding_dictionary"
+
+# Contexts/events/comments deleted from each paper, by paper version (So that
+# clients can be sent only what changed since the version they have)
+db_vars["deletion_table"] = "deleted_annotation"
+
 # Login role name for the PostgreSQL connection
 db_vars["postgres_login"] = "context"
 
@@ -94,19 +101,97 @@ db_vars["timestamp_format"] = "YYYY/MM/DD HH24:MI:SS [GMTOF]"
 # =============
 grounding_dictionaries_path = "data/dictionaries"
 grounding_dictionary_prefixes = "data/dictionaries/prefixes.tsv"
+# If True, the dictionaries are loaded with COPY and set-based upserts in a
+# single transaction; otherwise (or if the bulk load fails), every entry is
+# created individually through the ORM.
+bulk_dictionary_loading = True
+# Number of worker processes used to decompress and parse the dictionary files
+# (None for one per CPU)
+dictionary_loader_workers = None
+# Maximum number of free text -> grounding ID mappings (and, separately, of
+# grounding IDs) that each server process keeps cached in memory (See
+# app.grounding_cache)
+grounding_cache_size = 250000
+# If True (and loading in bulk), only the entries that were added, removed or
+# remapped in each dictionary file since it was last loaded are applied.
+# The entries of every loaded file are kept in a sorted snapshot (named after
+# the file's digest) in `grounding_snapshot_path`; a file without a snapshot
+# is loaded in full.
+delta_dictionary_loading = True
+grounding_snapshot_path = "data/dictionary_snapshots"
+# The whole GroundingText table is also compiled into a single memory-mapped
+# file (See app.dictionary_snapshot), which the grounding lookups start from
+# instead of reading the table while it is up to date.  None disables it.
+compiled_dictionary_snapshot = "data/dictionary_snapshots/groundings.snapshot"
+# A complete set of dictionaries (e.g., data/new_dictionaries) can be loaded
+# into shadow copies of the grounding tables and swapped in at once (See
+# PostgresProvider._load_grounding_dictionaries_shadow()); the swap gives up
+# if it cannot lock the tables within this many seconds
+grounding_swap_lock_timeout = 5
+# Number of free texts that the `complete_free_text` command returns by
+# default, and at most (See app.grounding_index)
+autocomplete_limit = 10
+autocomplete_max_limit = 100
+# When a new context's free text is not in the dictionaries, it is matched
+# against the known free texts after normalising case, hyphens/dashes,
+# plurals and whitespace before a manual grounding ID is generated.  Known
+# free texts that are at least this similar by character trigrams (0-1; None
+# disables them) are only offered to users as autocomplete suggestions
+# (See app.grounding_matcher)
+grounding_match_threshold = 0.9
+# Each server process keeps the get_paper_data() responses of up to this many
+# recently opened papers, taking up roughly at most this many bytes, and only
+# rebuilds them after the paper changes (See app.paper_cache).  Set
+# `paper_cache_max_papers` to 0 to disable the cache.
+paper_cache_max_papers = 200
+paper_cache_max_bytes = 256 * 1024 * 1024
+# The websocket interface also keeps the encoded frames of up to this many
+# paper, paper list and free text completion responses, taking up at most this
+# many bytes, and re-sends them with only the request ID changed (See
+# app.frame_cache).  Set `frame_cache_max_frames` to 0 to disable it.
+frame_cache_max_frames = 500
+frame_cache_max_bytes = 64 * 1024 * 1024
 
 # The sub-folders in this directory should be named after paper IDs,
 # and should contain all the Reach output txt files and a matching curated
 # TSV file
+# Paper folders may also be bundled into .tar(.gz/.bz2/.xz)/.tgz/.zip
+# archives placed in this directory (or `papers_path` may be a single
+# archive), and any of their files may be gzipped individually; these are
+# read in place, without being extracted.
 papers_path = "data/papers"
 # If the sub-folder's name ends in the following suffix, it will be ignored
 # when loading paper data.
 paper_disabled_suffix = "-disabled"
 
+# If True, new papers are streamed into the database with COPY and merged in a
+# single transaction; otherwise (or if the bulk load fails), every sentence,
+# context and event is created individually through the ORM.
+bulk_paper_ingestion = True
+
+# Parallel loading (_load_all_papers): Number of worker processes used to parse
+# paper folders (None for one per CPU), and of database connections writing the
+# parsed papers.
+paper_loader_workers = None
+paper_loader_writers = 1
+
+# Paper files of at least this many bytes are memory-mapped while they are
+# parsed, and bulk ingestion writes rows to the database in chunks of
+# `paper_ingestion_chunk_size`, so that large papers are loaded in bounded
+# memory.
+paper_mmap_threshold = 1 << 20
+paper_ingestion_chunk_size = 10000
+
+# Watch folder: If True, the server polls `papers_path` every
+# `paper_watch_interval` seconds while it is running, and loads new and
+# changed papers in the background (as _sync_all_papers() would).
+paper_watch_enabled = False
+paper_watch_interval = 30
+
 # In case the full list of grounding prefixes is different from the ones
 # listed in the file specified by `grounding_dictionary_prefixes`
-paper_grounding_prefixes = (r"uaz|go|taxonomy|tissuelist|uniprot|cellosaurus"
-                            r"|uberon")
+paper_grounding_prefixes = ["uaz", "go", "taxonomy", "tissuelist", "uniprot",
+                            "cellosaurus", "uberon", "cl"]
 # Associating prefixes with their textual descriptions
 # (Will be displayed in order by the client)
 context_categories = [
@@ -31,6 +31,7 @@ for interface, details in app.config.interface_classes.items():
 # ====================
 
 import app.exceptions
+import app.ingestor
 
 
 def execute(**kwargs):
@@ -163,8 +164,25 @@ class Act:  # Hurr hurr
         # This is a list of tuples: (ClientInterface, Future)
         self.client_watch = []
 
+        # Background ingestion of new papers, if enabled
+        self.ingestor = None
+        self.ingestor_task = None
+        if app.config.paper_watch_enabled and not kwargs['console']:
+            self.ingestor = app.ingestor.PaperIngestor(self.provider)
+
     @asyncio.coroutine
     def shutdown(self):
+        if self.ingestor is not None:
+            logger.info("Shutting down paper ingestor...")
+            if self.ingestor_task is not None:
+                self.ingestor_task.cancel()
+                try:
+                    yield from self.ingestor_task
+                except CancelledError:
+                    pass
+            self.ingestor.shutdown()
+            self.ingestor = None
+
         logger.info("Shutting down client watchers...")
         for x in self.client_watch:
             # The client watchers are coroutines
@@ -191,6 +209,9 @@ class Act:  # Hurr hurr
         # but NOT fully cancel the current iteration of do_loop() --
         # Old watchers will remain active, which might cause repeated
         #  operations and other subtle bugs.
+        if self.ingestor is not None and self.ingestor_task is None:
+            self.ingestor_task = asyncio.ensure_future(self.ingestor.run())
+
         try:
             while True:
                 yield from self.iterate_controller()
@@ -356,7 +377,10 @@ class Act:  # Hurr hurr
             # Try delegating it to a helper function
             if hasattr(self, 'exec_' + command):
                 command_fn = getattr(self, 'exec_' + command)
-                results = command_fn(request)
+                try:
+                    results = command_fn(request)
+                finally:
+                    self.provider.finish_request()
             else:
                 logger.warning("Invalid input from client.")
                 results = {
@@ -381,6 +405,16 @@ class Act:  # Hurr hurr
         # format the necessary data nicely.
         return self.provider.get_paper_data(request)
 
+    def exec_get_paper_skeleton(self, request):
+        # The per-paper view's metadata, for clients that load the paper
+        # itself a window at a time
+        return self.provider.get_paper_skeleton(request)
+
+    def exec_get_paper_window(self, request):
+        # A range of lines or sections of a paper, with their contexts and
+        # events
+        return self.provider.get_paper_window(request)
+
     def exec_get_paper_diff(self, request):
         # This is for the diff against the base annotations.
         return self.provider.get_paper_diff(request)
@@ -430,6 +464,12 @@ class Act:  # Hurr hurr
                                             request['newEnd'],
                                             request['contextText'])
 
+    def exec_complete_free_text(self, request):
+        # Called as the user types the free text for a new context; returns
+        # the matching free texts from the grounding dictionaries
+        return self.provider.complete_free_text(request['prefix'],
+                                                request.get('limit'))
+
     def exec_delete_context(self, request):
         # Called when the client wants to delete a manual context
         return self.provider.delete_context(request['paperID'],
@@ -441,6 +481,15 @@ class Act:  # Hurr hurr
         return self.provider.save_event_contexts(request['serverID'],
                                                  request['groundings'])
 
+    def exec_get_ingest_status(self, _):
+        # Progress of the background paper ingestor
+        if self.ingestor is None:
+            return {
+                "error": True,
+                "message": "Background paper ingestion is disabled."
+            }
+        return self.ingestor.get_status()
+
     ###################
 
     def exec_view(self, request):
@@ -0,0 +1,219 @@
+"""
+Compiled, memory-mappable snapshot of the GroundingText table, so that the
+grounding lookups (app.grounding_cache, app.grounding_index and
+app.grounding_matcher) can start without reading the whole table from the
+database, and so that server processes on the same host share one copy of it
+through the page cache.
+
+File layout (little-endian):
+
+    header        magic, version, number of free texts (N) and of distinct
+                  grounding IDs (G), checksum of the source table, and the
+                  lengths of the two string blobs
+    text_offsets  N + 1 uint32: where each free text starts in `texts`
+    text_ids      N uint32: the index of each free text's grounding ID
+    id_offsets    G + 1 uint32: where each grounding ID starts in `ids`
+    texts         UTF-8 free texts, sorted by (fold(free_text), free_text)
+    ids           UTF-8 grounding IDs, sorted
+
+Free texts are sorted the same way as in app.grounding_index, so exact
+lookups and prefix searches are both binary searches over the offsets.
+"""
+
+import array
+import mmap
+import os
+import struct
+import sys
+
+from app.grounding_index import fold
+
+MAGIC = b"GRDSNAP1"
+VERSION = 1
+HEADER = struct.Struct("<8sIIIqQQ")
+# Sections start on 8-byte boundaries
+_ALIGN = 8
+
+
+def _padding(size):
+    return -size % _ALIGN
+
+
+def _uint32_array(values):
+    values = array.array('I', values)
+    if sys.byteorder != 'little':
+        values.byteswap()
+    return values.tobytes()
+
+
+def write_snapshot(path, grounding_texts, checksum):
+    """
+    Compiles the given (free_text, grounding_id) pairs into a snapshot file
+    at `path`, replacing any existing one atomically.
+    `checksum` identifies the state of the table the pairs were read from
+    (See PostgresProvider._grounding_text_checksum()).
+    """
+    entries = sorted((fold(free_text), free_text, grounding_id)
+                     for free_text, grounding_id in grounding_texts)
+    grounding_ids = sorted(set(entry[2] for entry in entries))
+    id_numbers = {grounding_id: number
+                  for number, grounding_id in enumerate(grounding_ids)}
+
+    text_blob = bytearray()
+    text_offsets = [0]
+    for _, free_text, _ in entries:
+        text_blob += free_text.encode('utf8')
+        text_offsets.append(len(text_blob))
+    id_blob = bytearray()
+    id_offsets = [0]
+    for grounding_id in grounding_ids:
+        id_blob += grounding_id.encode('utf8')
+        id_offsets.append(len(id_blob))
+
+    sections = [
+        _uint32_array(text_offsets),
+        _uint32_array(id_numbers[entry[2]] for entry in entries),
+        _uint32_array(id_offsets),
+        bytes(text_blob),
+        bytes(id_blob)
+    ]
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_path = "{}.{}.tmp".format(path, os.getpid())
+    with open(temp_path, 'wb') as fp:
+        header = HEADER.pack(MAGIC, VERSION, len(entries), len(grounding_ids),
+                             checksum, len(text_blob), len(id_blob))
+        fp.write(header + b"\0" * _padding(len(header)))
+        for section in sections:
+            fp.write(section + b"\0" * _padding(len(section)))
+    os.replace(temp_path, path)
+
+
+class DictionarySnapshot(object):
+    """
+    Read-only view of a snapshot file.  Nothing is read into memory up
+    front; pages are loaded (and shared with other processes mapping the
+    same file) as they are used.
+    Raises ValueError if the file is not a valid snapshot.
+    """
+    def __init__(self, path):
+        if sys.byteorder != 'little':
+            raise ValueError("Dictionary snapshots need a little-endian "
+                             "host.")
+        self.path = path
+        with open(path, 'rb') as fp:
+            self._mmap = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+
+        view = memoryview(self._mmap)
+        if len(view) < HEADER.size:
+            raise ValueError("Truncated dictionary snapshot: {}".format(path))
+        magic, version, self.text_count, self.id_count, self.checksum, \
+            text_size, id_size = HEADER.unpack_from(view)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Not a dictionary snapshot (version {}): {}"
+                             "".format(VERSION, path))
+
+        position = [HEADER.size + _padding(HEADER.size)]
+
+        def section(size, cast=None):
+            start = position[0]
+            position[0] += size + _padding(size)
+            if position[0] > len(view) + _padding(size):
+                raise ValueError("Truncated dictionary snapshot: {}"
+                                 "".format(path))
+            data = view[start:start + size]
+            return data.cast(cast) if cast else data
+
+        self._text_offsets = section(4 * (self.text_count + 1), 'I')
+        self._text_ids = section(4 * self.text_count, 'I')
+        self._id_offsets = section(4 * (self.id_count + 1), 'I')
+        self._texts = section(text_size)
+        self._ids = section(id_size)
+        view.release()
+
+    def __len__(self):
+        return self.text_count
+
+    def close(self):
+        for view in (self._text_offsets, self._text_ids, self._id_offsets,
+                     self._texts, self._ids):
+            view.release()
+        self._mmap.close()
+
+    def free_text(self, number):
+        offsets = self._text_offsets
+        return str(self._texts[offsets[number]:offsets[number + 1]],
+                   'utf8')
+
+    def grounding_id(self, number):
+        """
+        The grounding ID of the `number`th free text
+        """
+        return self._id(self._text_ids[number])
+
+    def _id(self, id_number):
+        offsets = self._id_offsets
+        return str(self._ids[offsets[id_number]:offsets[id_number + 1]],
+                   'utf8')
+
+    def _first_at_least(self, key):
+        """
+        The number of the first free text whose folded form is >= `key`
+        """
+        low, high = 0, self.text_count
+        while low < high:
+            middle = (low + high) // 2
+            if fold(self.free_text(middle)) < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def grounding_id_for(self, free_text):
+        """
+        Returns the grounding ID of the given free text, or None
+        """
+        key = fold(free_text)
+        number = self._first_at_least(key)
+        while number < self.text_count:
+            candidate = self.free_text(number)
+            if fold(candidate) != key:
+                break
+            if candidate == free_text:
+                return self.grounding_id(number)
+            number += 1
+        return None
+
+    def has_grounding(self, grounding_id):
+        low, high = 0, self.id_count
+        while low < high:
+            middle = (low + high) // 2
+            if self._id(middle) < grounding_id:
+                low = middle + 1
+            else:
+                high = middle
+        return low < self.id_count and self._id(low) == grounding_id
+
+    def iter_prefix(self, prefix):
+        """
+        Yields (folded free text, free text, grounding_id) for every free
+        text that starts with `prefix` (ignoring case), in index order
+        """
+        key = fold(prefix)
+        number = self._first_at_least(key)
+        while number < self.text_count:
+            free_text = self.free_text(number)
+            folded = fold(free_text)
+            if not folded.startswith(key):
+                break
+            yield folded, free_text, self.grounding_id(number)
+            number += 1
+
+    def items(self):
+        """
+        Yields every (free_text, grounding_id) pair in the snapshot
+        """
+        for number in range(self.text_count):
+            yield self.free_text(number), self.grounding_id(number)
@@ -0,0 +1,201 @@
+"""
+Process-wide cache of encoded websocket frames for read responses that many
+requests share (paper data, paper list pages, free text completions), so
+that sending one again skips the JSON encoding, compression and base64
+encoding of its data.
+
+Messages to the client are base64-encoded zlib streams of JSON.  A cached
+frame keeps everything up to the end of the response data already
+compressed and encoded; only the fields that differ per request (the request
+ID, and any `echo` fields such as DataTables' `draw`) are compressed when it
+is sent, as a final deflate block appended after the cached ones, together
+with the zlib checksum of the whole message.
+
+Data providers opt in by returning a CacheableResponse, which names the
+cache entry and carries a stamp of the data it holds; a cached frame is only
+used while the stamp is unchanged.
+"""
+
+import base64
+import collections
+import json
+import struct
+import threading
+import zlib
+
+import app.config
+
+# zlib stream header (deflate, 32K window, default compression)
+_ZLIB_HEADER = b"\x78\x9c"
+_ADLER_BASE = 65521
+
+
+class CacheableResponse(dict):
+    """
+    A response (a dict, as usual) whose encoded frame may be cached under
+    `cache_key` for as long as its `stamp` stays the same.
+    The keys in `echo` are request-specific and are not cached.
+    """
+    def __init__(self, data, cache_key, stamp, echo=()):
+        super().__init__(data)
+        self.cache_key = cache_key
+        self.stamp = stamp
+        self.echo = tuple(echo)
+
+
+def adler32_combine(adler1, adler2, length2):
+    """
+    The Adler-32 checksum of two strings joined together, given the
+    checksums of both and the length of the second (as zlib's
+    adler32_combine())
+    """
+    remainder = length2 % _ADLER_BASE
+    sum1 = adler1 & 0xffff
+    sum2 = (remainder * sum1) % _ADLER_BASE
+    sum1 += (adler2 & 0xffff) + _ADLER_BASE - 1
+    sum2 += (adler1 >> 16) + (adler2 >> 16) + _ADLER_BASE - remainder
+    sum1 %= _ADLER_BASE
+    sum2 %= _ADLER_BASE
+    return (sum2 << 16) | sum1
+
+
+def encode_message(message):
+    """
+    Encodes a message for the websocket client in one go
+    """
+    return base64.b64encode(zlib.compress(json.dumps(message).encode())) \
+        .decode()
+
+
+class Frame(object):
+    """
+    The cached, encoded start of a message.
+    """
+    def __init__(self, stamp, text):
+        self.stamp = stamp
+        self.adler = zlib.adler32(text)
+
+        compressor = zlib.compressobj(wbits=-15)
+        body = _ZLIB_HEADER + compressor.compress(text) + \
+            compressor.flush(zlib.Z_FULL_FLUSH)
+        # Only whole 3-byte groups can be base64-encoded ahead of time; the
+        # rest is encoded with the tail
+        split = len(body) - len(body) % 3
+        self.encoded = base64.b64encode(body[:split]).decode()
+        self.remainder = body[split:]
+        self.size = len(self.encoded)
+
+    def finish(self, tail):
+        """
+        Returns the whole encoded message, given the rest of its text
+        """
+        compressor = zlib.compressobj(wbits=-15)
+        end = compressor.compress(tail) + compressor.flush(zlib.Z_FINISH)
+        adler = adler32_combine(self.adler, zlib.adler32(tail), len(tail))
+        end = self.remainder + end + struct.pack(">I", adler)
+        return self.encoded + base64.b64encode(end).decode()
+
+
+class FrameCache(object):
+    """
+    (command, cache_key) -> Frame LRU cache.
+    Safe to share between threads.
+    """
+    def __init__(self, max_frames=None, max_bytes=None):
+        if max_frames is None:
+            max_frames = app.config.frame_cache_max_frames
+        if max_bytes is None:
+            max_bytes = app.config.frame_cache_max_bytes
+
+        self.max_frames = max_frames
+        self.max_bytes = max_bytes
+        self._frames = collections.OrderedDict()
+        self.size = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._frames)
+
+    def encode(self, message):
+        """
+        Encodes a message (with `id`, `command` and `data`) for the
+        websocket client, from the cache if its data is a CacheableResponse
+        """
+        data = message['data']
+        if not isinstance(data, CacheableResponse) or self.max_frames <= 0:
+            return encode_message(message)
+
+        key = (message['command'], data.cache_key)
+        with self._lock:
+            frame = self._frames.get(key)
+            if frame is not None and frame.stamp == data.stamp:
+                self._frames.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+                frame = None
+
+        if frame is None:
+            frame = Frame(data.stamp, self._cached_text(message))
+            self._put(key, frame)
+        return frame.finish(self._tail_text(message))
+
+    @staticmethod
+    def _cached_text(message):
+        data = message['data']
+        text = json.dumps({key: value for key, value in data.items()
+                           if key not in data.echo})
+        if data.echo:
+            # Leave the data open for the echoed fields
+            text = text[:-1] + (", " if text != "{}" else "")
+        return '{{"command": {}, "data": {}'.format(
+            json.dumps(message['command']), text).encode()
+
+    @staticmethod
+    def _tail_text(message):
+        data = message['data']
+        text = ""
+        if data.echo:
+            text = json.dumps({key: data[key] for key in data.echo})[1:]
+        return '{}, "id": {}}}'.format(text, json.dumps(message['id'])) \
+            .encode()
+
+    def _put(self, key, frame):
+        with self._lock:
+            self._remove(key)
+            if frame.size > self.max_bytes:
+                return
+            self._frames[key] = frame
+            self.size += frame.size
+            while len(self._frames) > self.max_frames or \
+                    self.size > self.max_bytes:
+                self._remove(next(iter(self._frames)))
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._frames.clear()
+            self.size = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'frames':    len(self._frames),
+                'bytes':     self.size,
+                'hits':      self.hits,
+                'misses':    self.misses,
+                'evictions': self.evictions
+            }
+
+    def _remove(self, key):
+        frame = self._frames.pop(key, None)
+        if frame is not None:
+            self.size -= frame.size
+
+
+# The cache for this process
+cache = FrameCache()
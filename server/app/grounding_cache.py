@@ -0,0 +1,184 @@
+"""
+Process-wide cache of the grounding dictionaries: Maps free texts to their
+grounding IDs (as in the GroundingText table) and remembers which grounding
+IDs exist (as in the Grounding table), so that contexts can be created
+without looking their groundings up in the database every time.
+Both maps are bounded LRU caches of `grounding_cache_size` entries each.
+The data provider warms the cache from the database when it starts, and
+updates (or drops) entries whenever it writes to the grounding tables; an
+entry is only ever added for a mapping that is known to be in the database,
+and a miss simply falls through to the database.
+Instead of being warmed, the cache can also sit in front of a compiled
+dictionary snapshot (see app.dictionary_snapshot) that matches the database.
+"""
+
+import collections
+import threading
+
+import app.config
+
+
+class LRUCache(object):
+    """
+    A Dictionary-like map that keeps at most `max_size` entries, evicting
+    the least recently used ones first
+    """
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._entries = collections.OrderedDict()
+
+    def get(self, key, default=None):
+        try:
+            value = self._entries[key]
+        except KeyError:
+            return default
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def discard(self, key):
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class GroundingCache(object):
+    """
+    free_text -> grounding_id and grounding_id existence caches.
+    Safe to share between threads (e.g., the writer threads of
+    _load_all_papers()).
+    """
+    def __init__(self, max_size=None):
+        if max_size is None:
+            max_size = app.config.grounding_cache_size
+
+        self.texts = LRUCache(max_size)
+        self.groundings = LRUCache(max_size)
+        # Set once the cache has been filled from the database
+        self.warmed = False
+        # Optional app.dictionary_snapshot.DictionarySnapshot behind the LRU
+        # caches, and the free texts/grounding IDs it no longer has right
+        self.snapshot = None
+        self._stale_texts = set()
+        self._stale_groundings = set()
+
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def grounding_id_for(self, free_text):
+        """
+        Returns the grounding ID that the given free text is mapped to, or
+        None if it is not cached
+        """
+        with self._lock:
+            grounding_id = self.texts.get(free_text)
+            if grounding_id is None and self.snapshot is not None and \
+                    free_text not in self._stale_texts:
+                grounding_id = self.snapshot.grounding_id_for(free_text)
+            if grounding_id is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return grounding_id
+
+    def has_grounding(self, grounding_id):
+        """
+        Returns True if the given grounding ID is known to exist
+        """
+        with self._lock:
+            if self.groundings.get(grounding_id) or (
+                    self.snapshot is not None and
+                    grounding_id not in self._stale_groundings and
+                    self.snapshot.has_grounding(grounding_id)):
+                self.hits += 1
+                return True
+            self.misses += 1
+            return False
+
+    def add_text(self, free_text, grounding_id):
+        """
+        Records that `free_text` is mapped to `grounding_id` (which therefore
+        exists too)
+        """
+        with self._lock:
+            self.texts.put(free_text, grounding_id)
+            self.groundings.put(grounding_id, True)
+            if self.snapshot is not None and \
+                    self.snapshot.grounding_id_for(free_text) != grounding_id:
+                # Never fall back to the snapshot once this is evicted
+                self._stale_texts.add(free_text)
+
+    def add_grounding(self, grounding_id):
+        with self._lock:
+            self.groundings.put(grounding_id, True)
+
+    def discard_text(self, free_text):
+        with self._lock:
+            self.texts.discard(free_text)
+            if self.snapshot is not None:
+                self._stale_texts.add(free_text)
+
+    def discard_grounding(self, grounding_id):
+        with self._lock:
+            self.groundings.discard(grounding_id)
+            if self.snapshot is not None:
+                self._stale_groundings.add(grounding_id)
+
+    def warm(self, grounding_texts, grounding_ids):
+        """
+        Fills the cache from iterables of (free_text, grounding_id) pairs and
+        of grounding IDs, replacing whatever it held before
+        """
+        with self._lock:
+            self._reset(None)
+            for grounding_id in grounding_ids:
+                self.groundings.put(grounding_id, True)
+            for free_text, grounding_id in grounding_texts:
+                self.texts.put(free_text, grounding_id)
+            self.warmed = True
+
+    def use_snapshot(self, snapshot):
+        """
+        Empties the cache and answers from `snapshot` (which must match the
+        GroundingText table) instead of warming it
+        """
+        with self._lock:
+            self._reset(snapshot)
+            self.warmed = True
+
+    def clear(self):
+        with self._lock:
+            self._reset(None)
+            self.warmed = False
+
+    def stats(self):
+        with self._lock:
+            return {
+                'texts':      len(self.texts),
+                'groundings': len(self.groundings),
+                'snapshot':   0 if self.snapshot is None
+                              else len(self.snapshot),
+                'hits':       self.hits,
+                'misses':     self.misses
+            }
+
+    def _reset(self, snapshot):
+        self.texts.clear()
+        self.groundings.clear()
+        self.snapshot = snapshot
+        self._stale_texts = set()
+        self._stale_groundings = set()
+
+
+# The cache for this process
+cache = GroundingCache()
@@ -0,0 +1,166 @@
+"""
+Process-wide prefix index over every free text in the GroundingText table,
+for autocompleting free texts as annotators type them.
+Free texts are kept in a List sorted by their case-folded form, so that the
+matches for a prefix are a contiguous slice that can be found with bisect.
+The data provider fills the index when it starts, brings it up to date after
+every dictionary reload (only the free texts that were added or removed move
+around), and adds free texts as it creates them.
+The index can also be based on a compiled dictionary snapshot (see
+app.dictionary_snapshot), in which case the sorted List only holds the free
+texts that changed since the snapshot was compiled.
+"""
+
+import bisect
+import threading
+
+# If a reload adds/removes more than this fraction of the indexed free texts,
+# the sorted List is rebuilt from scratch instead of being patched in place
+rebuild_fraction = 0.25
+
+
+def fold(text):
+    """
+    The form of `text` that the index is sorted and searched by
+    """
+    return text.casefold()
+
+
+class PrefixIndex(object):
+    """
+    Sorted (folded free text, free text) pairs, and the grounding ID of each
+    free text.
+    Safe to share between threads.
+    """
+    def __init__(self):
+        self._entries = []
+        self._groundings = {}
+        # Set once the index has been filled from the database
+        self.built = False
+        # Optional app.dictionary_snapshot.DictionarySnapshot under the
+        # sorted List, and the free texts in it that were removed or
+        # changed since
+        self._snapshot = None
+        self._hidden = set()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        if self._snapshot is None:
+            return len(self._entries)
+        return len(self._snapshot) - len(self._hidden) + len(self._entries)
+
+    def search(self, prefix, limit):
+        """
+        Returns up to `limit` (free_text, grounding_id) pairs for the free
+        texts that start with `prefix` (ignoring case), in folded
+        alphabetical order -- an exact match always comes first
+        """
+        key = fold(prefix)
+        with self._lock:
+            entries = self._entries
+            position = bisect.bisect_left(entries, (key,))
+            matches = []
+            while position < len(entries) and len(matches) < limit:
+                folded, free_text = entries[position]
+                if not folded.startswith(key):
+                    break
+                matches.append((folded, free_text,
+                                self._groundings[free_text]))
+                position += 1
+
+            if self._snapshot is not None:
+                found = 0
+                for match in self._snapshot.iter_prefix(prefix):
+                    if found == limit:
+                        break
+                    if match[1] not in self._hidden:
+                        matches.append(match)
+                        found += 1
+                matches = sorted(matches)[:limit]
+            return [(free_text, grounding_id)
+                    for _, free_text, grounding_id in matches]
+
+    def add(self, free_text, grounding_id):
+        """
+        Indexes `free_text` (or updates its grounding ID)
+        """
+        with self._lock:
+            if self._snapshot is not None and free_text not in self._groundings:
+                snapshot_id = self._snapshot.grounding_id_for(free_text)
+                if snapshot_id == grounding_id:
+                    self._hidden.discard(free_text)
+                    return
+                if snapshot_id is not None:
+                    self._hidden.add(free_text)
+            if free_text not in self._groundings:
+                bisect.insort(self._entries, (fold(free_text), free_text))
+            self._groundings[free_text] = grounding_id
+
+    def discard(self, free_text):
+        with self._lock:
+            self._remove(free_text)
+            if self._snapshot is not None and \
+                    self._snapshot.grounding_id_for(free_text) is not None:
+                self._hidden.add(free_text)
+
+    def update(self, grounding_texts):
+        """
+        Brings the index in line with `grounding_texts`, an iterable of every
+        (free_text, grounding_id) pair that should be indexed.
+        Returns the number of free texts that were added and removed.
+        """
+        groundings = dict(grounding_texts)
+        with self._lock:
+            added = [free_text for free_text in groundings
+                     if free_text not in self._groundings]
+            removed = [free_text for free_text in self._groundings
+                       if free_text not in groundings]
+
+            changes = len(added) + len(removed)
+            if not self.built or self._snapshot is not None or \
+                    changes > rebuild_fraction * len(self._entries):
+                self._entries = sorted((fold(free_text), free_text)
+                                       for free_text in groundings)
+            else:
+                for free_text in removed:
+                    self._remove(free_text)
+                for free_text in added:
+                    bisect.insort(self._entries, (fold(free_text), free_text))
+
+            self._groundings = groundings
+            self._snapshot = None
+            self._hidden = set()
+            self.built = True
+            return len(added), len(removed)
+
+    def use_snapshot(self, snapshot):
+        """
+        Empties the index and searches `snapshot` (which must match the
+        GroundingText table) instead of filling it
+        """
+        with self._lock:
+            self._entries = []
+            self._groundings = {}
+            self._snapshot = snapshot
+            self._hidden = set()
+            self.built = True
+
+    def clear(self):
+        with self._lock:
+            self._entries = []
+            self._groundings = {}
+            self._snapshot = None
+            self._hidden = set()
+            self.built = False
+
+    def _remove(self, free_text):
+        if self._groundings.pop(free_text, None) is None:
+            return
+        entry = (fold(free_text), free_text)
+        position = bisect.bisect_left(self._entries, entry)
+        if position < len(self._entries) and self._entries[position] == entry:
+            del self._entries[position]
+
+
+# The index for this process
+index = PrefixIndex()
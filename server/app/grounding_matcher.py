@@ -0,0 +1,311 @@
+"""
+Process-wide matcher that finds the dictionary grounding for near-miss
+variants of the free texts in the GroundingText table, so that
+create_context() does not have to mint a new `manual:` grounding ID for
+every difference in case, hyphenation, plurals or whitespace.
+Every free text is reduced to a normalised key (see normalise()); a free text
+whose key belongs to a single grounding ID is matched to it (see match()).
+That is the only match that is ever used to ground a free text
+automatically: Similar names often belong to distinct entities (e.g.,
+"fibroblast growth factor receptor 2" and "... receptor 3").  The free texts
+whose keys are closest by character trigrams (Dice coefficient) are only
+offered as suggestions (see suggest()), and only if their numbers, Greek
+letters and roman numerals are the same (see markers()).
+Like app.grounding_index, the matcher is filled by the data provider when it
+starts and kept up to date incrementally.  When the provider starts from a
+compiled dictionary snapshot, filling the matcher is deferred until the first
+match is needed.
+"""
+
+import collections
+import re
+import threading
+
+import app.config
+
+# Hyphen-like characters that dictionaries and papers use interchangeably
+DASHES = "\u2010\u2011\u2012\u2013\u2014\u2015\u2212\ufe63\uff0d"
+_separators = re.compile("[\\s\\-_{}]+".format(DASHES))
+
+# Results of a failed match
+NO_MATCH = (None, None, 0.0)
+
+# Words that tell apart otherwise similar names (See markers())
+GREEK_LETTERS = frozenset([
+    "alpha", "beta", "gamma", "delta", "epsilon", "zeta", "eta", "theta",
+    "iota", "kappa", "lambda", "mu", "nu", "xi", "omicron", "pi", "rho",
+    "sigma", "tau", "upsilon", "phi", "chi", "psi", "omega"])
+ROMAN_NUMERALS = frozenset([
+    "i", "ii", "iii", "iv", "v", "vi", "vii", "viii", "ix", "x", "xi", "xii",
+    "xiii", "xiv", "xv", "xvi", "xvii", "xviii", "xix", "xx"])
+_marks = re.compile("[0-9]+|[\u03b1-\u03c9]")
+
+
+def singular(word):
+    """
+    Strips regular English plural endings from `word`
+    """
+    if len(word) <= 3 or not word.isalpha():
+        return word
+    if word.endswith("ies") and len(word) > 4:
+        return word[:-3] + "y"
+    if word.endswith(("sses", "xes", "zes", "ches", "shes")):
+        return word[:-2]
+    if word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        return word[:-1]
+    return word
+
+
+def normalise(free_text):
+    """
+    Returns the normalised key of a free text: Case-folded, with hyphens,
+    dashes, underscores and runs of whitespace turned into single spaces, and
+    with each word made singular
+    """
+    words = _separators.split(free_text.casefold())
+    return " ".join(singular(word) for word in words if word)
+
+
+def markers(key):
+    """
+    Returns the numbers, Greek letters and roman numerals in a normalised
+    key, in order (e.g., ('2',) for "fibroblast growth factor receptor 2")
+    """
+    found = []
+    for word in key.split(" "):
+        if word in GREEK_LETTERS or word in ROMAN_NUMERALS:
+            found.append(word)
+        else:
+            found.extend(_marks.findall(word))
+    return tuple(found)
+
+
+def trigrams(key):
+    padded = " {} ".format(key)
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class GroundingMatcher(object):
+    """
+    Normalised keys and a trigram index over them.
+    Safe to share between threads.
+    """
+    def __init__(self):
+        # free_text -> grounding_id
+        self._texts = {}
+        # key -> {free_text: grounding_id}
+        self._keys = {}
+        # trigram -> Set of keys
+        self._grams = collections.defaultdict(set)
+        self._key_grams = {}
+        # Set once the matcher has been filled from the database
+        self.built = False
+        # See defer()
+        self._loader = None
+        self._queued = []
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._keys)
+
+    def match(self, free_text):
+        """
+        Returns (grounding_id, matched_free_text, 1.0) for a known free text
+        with the same normalised key as `free_text`, or NO_MATCH if there is
+        none (or if the known free texts with that key disagree on the
+        grounding ID)
+        """
+        key = normalise(free_text)
+        if not key:
+            return NO_MATCH
+
+        if self._loader is not None:
+            self._load_deferred()
+        with self._lock:
+            if key in self._keys:
+                return self._unique(self._keys[key], 1.0)
+            return NO_MATCH
+
+    def match_all(self, free_texts):
+        """
+        Batch version of match(): Returns a Dictionary mapping each of the
+        given free texts to its (grounding_id, matched_free_text, score)
+        """
+        matches = {}
+        for free_text in free_texts:
+            if free_text not in matches:
+                matches[free_text] = self.match(free_text)
+        return matches
+
+    def suggest(self, free_text, limit, threshold=None):
+        """
+        Returns up to `limit` (free_text, grounding_id, score) suggestions
+        for `free_text`, best first: Known free texts whose keys are at least
+        `threshold` similar to its key by character trigrams (default:
+        app.config.grounding_match_threshold; None disables suggestions), and
+        have the same markers().  One free text is suggested per key and
+        grounding ID.
+        Suggestions are for users to pick from; they are never used to
+        ground a free text automatically.
+        """
+        if threshold is None:
+            threshold = app.config.grounding_match_threshold
+        key = normalise(free_text)
+        if not key or threshold is None or limit <= 0:
+            return []
+
+        if self._loader is not None:
+            self._load_deferred()
+        with self._lock:
+            grams = trigrams(key)
+            shared = collections.Counter()
+            for gram in grams:
+                shared.update(self._grams.get(gram, ()))
+
+            key_markers = markers(key)
+            scored = []
+            for candidate, count in shared.items():
+                score = 2.0 * count / (len(grams) +
+                                       len(self._key_grams[candidate]))
+                if score >= threshold and markers(candidate) == key_markers:
+                    scored.append((-score, candidate))
+            scored.sort()
+
+            suggestions = []
+            for score, candidate in scored:
+                texts = {}
+                for text, grounding_id in sorted(
+                        self._keys[candidate].items()):
+                    texts.setdefault(grounding_id, text)
+                for grounding_id, text in sorted(texts.items()):
+                    suggestions.append((text, grounding_id, -score))
+                if len(suggestions) >= limit:
+                    break
+            return suggestions[:limit]
+
+    def add(self, free_text, grounding_id):
+        with self._lock:
+            if self._loader is not None:
+                self._queued.append((free_text, grounding_id))
+                return
+            if self._texts.get(free_text) == grounding_id:
+                return
+            self._remove(free_text)
+            self._add(free_text, grounding_id)
+
+    def discard(self, free_text):
+        with self._lock:
+            if self._loader is not None:
+                self._queued.append((free_text, None))
+                return
+            self._remove(free_text)
+
+    def update(self, grounding_texts):
+        """
+        Brings the matcher in line with `grounding_texts`, an iterable of
+        every (free_text, grounding_id) pair in the GroundingText table
+        """
+        groundings = dict(grounding_texts)
+        with self._lock:
+            self._loader = None
+            self._queued = []
+            for free_text in [free_text for free_text in self._texts
+                              if free_text not in groundings]:
+                self._remove(free_text)
+            for free_text, grounding_id in groundings.items():
+                if self._texts.get(free_text) != grounding_id:
+                    self._remove(free_text)
+                    self._add(free_text, grounding_id)
+            self.built = True
+
+    def defer(self, loader):
+        """
+        Empties the matcher and fills it from `loader()`, an iterable of
+        every (free_text, grounding_id) pair in the GroundingText table, the
+        first time that a match is needed.  Changes made until then are
+        queued.
+        """
+        with self._lock:
+            self._reset()
+            self._loader = loader
+            self._queued = []
+            self.built = True
+
+    def clear(self):
+        with self._lock:
+            self._reset()
+            self._loader = None
+            self._queued = []
+            self.built = False
+
+    def _load_deferred(self):
+        with self._lock:
+            loader = self._loader
+        if loader is None:
+            return
+        # Build outside the lock so that add()/discard() do not wait for it
+        loaded = GroundingMatcher()
+        loaded.update(loader())
+        with self._lock:
+            if self._loader is not loader:
+                # Superseded by update(), defer() or clear() in the meantime
+                return
+            self._texts = loaded._texts
+            self._keys = loaded._keys
+            self._grams = loaded._grams
+            self._key_grams = loaded._key_grams
+            for free_text, grounding_id in self._queued:
+                self._remove(free_text)
+                if grounding_id is not None:
+                    self._add(free_text, grounding_id)
+            self._loader = None
+            self._queued = []
+
+    def _reset(self):
+        self._texts = {}
+        self._keys = {}
+        self._grams = collections.defaultdict(set)
+        self._key_grams = {}
+
+    @staticmethod
+    def _unique(texts, score):
+        """
+        (grounding_id, free_text, score) for the matched free texts in
+        `texts`, if they all share the same grounding ID
+        """
+        if len(set(texts.values())) != 1:
+            return NO_MATCH
+        free_text = min(texts)
+        return texts[free_text], free_text, score
+
+    def _add(self, free_text, grounding_id):
+        self._texts[free_text] = grounding_id
+        key = normalise(free_text)
+        if not key:
+            return
+        if key not in self._keys:
+            self._keys[key] = {}
+            grams = self._key_grams[key] = trigrams(key)
+            for gram in grams:
+                self._grams[gram].add(key)
+        self._keys[key][free_text] = grounding_id
+
+    def _remove(self, free_text):
+        if self._texts.pop(free_text, None) is None:
+            return
+        key = normalise(free_text)
+        texts = self._keys.get(key)
+        if texts is None:
+            return
+        texts.pop(free_text, None)
+        if len(texts) > 0:
+            return
+        del self._keys[key]
+        for gram in self._key_grams.pop(key):
+            self._grams[gram].discard(key)
+            if len(self._grams[gram]) == 0:
+                del self._grams[gram]
+
+
+# The matcher for this process
+matcher = GroundingMatcher()
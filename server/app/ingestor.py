@@ -0,0 +1,224 @@
+"""
+Background paper ingestion
+Watches `papers_path` for new and changed papers while the server is running,
+and loads them into the database without blocking the main event loop.
+"""
+
+import asyncio
+import collections
+import concurrent.futures
+import timeit
+
+import app.config
+import app.logger
+import app.paper_sources
+
+logger = app.logger.getLogger(__name__)
+
+
+class PaperIngestor:
+    """
+    Polls `papers_path` every `paper_watch_interval` seconds, comparing the
+    mtimes and sizes of the papers' files against those seen in the last
+    poll (see app.paper_sources.paper_signatures()).
+    A paper is handed to the ingestion thread once its signature has stayed
+    the same for a whole poll (so that papers which are still being copied
+    in are left alone), and is then brought up to date with the provider's
+    _sync_paper().
+    The signature of every synced paper is recorded in the database, and
+    those are what the first poll compares against, so that papers which
+    have not changed since the last run are not read (or hashed) again.
+    Scanning and loading both happen on a single worker thread with its own
+    data provider (i.e., its own database connection), so the event loop
+    keeps serving clients while a batch of papers loads.
+    """
+
+    def __init__(self, provider, interval=None):
+        if interval is None:
+            interval = app.config.paper_watch_interval
+
+        self.provider_class = provider.__class__
+        self.connection_string = provider.connection_string
+        self.papers_path = app.config.papers_path
+        self.interval = interval
+
+        # Created on the worker thread, on first use
+        self.provider = None
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+
+        # Paper ID -> Signature, for papers that have been synced
+        self.signatures = {}
+        # Paper ID -> Signature, for new/changed papers waiting to settle
+        self.pending = {}
+
+        # Progress of the current (or last) batch
+        self.progress = {
+            'state':   "idle",
+            'current': None,
+            'done':    0,
+            'total':   0,
+            'results': collections.Counter()
+        }
+
+    @asyncio.coroutine
+    def run(self):
+        """
+        Polls `papers_path` until cancelled
+        """
+        logger.info("Watching for new papers in: {} (every {}s)"
+                    "".format(self.papers_path, self.interval))
+        try:
+            self.signatures = yield from asyncio.get_event_loop() \
+                .run_in_executor(self.executor, self._stored_signatures)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Every paper is synced (and hashed) once, then
+            logger.error(repr(e))
+        while True:
+            try:
+                yield from self.poll()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(repr(e))
+                self.progress['state'] = "idle"
+            yield from asyncio.sleep(self.interval)
+
+    @asyncio.coroutine
+    def poll(self):
+        """
+        Scans `papers_path` once, and syncs every paper that has settled
+        since the last scan
+        """
+        loop = asyncio.get_event_loop()
+        try:
+            yield from self._poll(loop)
+        finally:
+            # The worker thread's archives are opened again on the next poll
+            yield from loop.run_in_executor(self.executor,
+                                            app.paper_sources.close_archives)
+
+    @asyncio.coroutine
+    def _poll(self, loop):
+        """
+        poll() helper: Scans `papers_path` and syncs the papers that are
+        ready
+        """
+        self.progress['state'] = "scanning"
+        signatures = yield from loop.run_in_executor(
+            self.executor, app.paper_sources.paper_signatures,
+            self.papers_path)
+
+        ready = []
+        pending = {}
+        for paper_id, signature in signatures.items():
+            if self.signatures.get(paper_id) == signature:
+                continue
+            if self.pending.get(paper_id) == signature:
+                ready.append(paper_id)
+            else:
+                pending[paper_id] = signature
+        self.pending = pending
+
+        # Forget papers that were removed, so that they are synced again if
+        # they ever come back
+        for paper_id in list(self.signatures):
+            if paper_id not in signatures:
+                del self.signatures[paper_id]
+
+        if len(ready) == 0:
+            self.progress['state'] = "idle"
+            return
+
+        logger.info("Ingesting {} new/changed paper(s) from {}."
+                    "".format(len(ready), self.papers_path))
+        start_time = timeit.default_timer()
+        self.progress.update({
+            'state':   "loading",
+            'done':    0,
+            'total':   len(ready),
+            'results': collections.Counter()
+        })
+        for paper_id in ready:
+            self.progress['current'] = paper_id
+            result = yield from loop.run_in_executor(self.executor,
+                                                     self._sync_paper,
+                                                     paper_id,
+                                                     signatures[paper_id])
+            # Failed papers are not retried until their files change again
+            self.signatures[paper_id] = signatures[paper_id]
+            self.progress['done'] += 1
+            self.progress['results'][result] += 1
+            logger.info("[{}/{}] {}: {}".format(self.progress['done'],
+                                                self.progress['total'],
+                                                paper_id, result))
+
+        results = self.progress['results']
+        logger.info("Ingested {} paper(s) in {:.03f}s: {} unchanged, "
+                    "{} updated, {} loaded, {} failed."
+                    "".format(len(ready), timeit.default_timer() - start_time,
+                              results["unchanged"], results["updated"],
+                              results["loaded"], results["failed"]))
+        self.progress['state'] = "idle"
+        self.progress['current'] = None
+
+    def _get_provider(self):
+        """
+        Runs on the worker thread: Returns the worker's own provider
+        """
+        if self.provider is None:
+            self.provider = self.provider_class(self.connection_string)
+        return self.provider
+
+    def _stored_signatures(self):
+        """
+        Runs on the worker thread: Returns the signatures recorded for the
+        papers that were synced before
+        """
+        return self._get_provider()._paper_signatures()
+
+    def _sync_paper(self, paper_id, signature):
+        """
+        Runs on the worker thread: Syncs the given paper with the worker's
+        own provider, records its signature (unless it failed), and returns
+        the result (or 'failed')
+        """
+        self._get_provider()
+        try:
+            result = self.provider._sync_paper(paper_id)
+            if result != "failed":
+                self.provider._save_paper_signature(paper_id, signature)
+            return result
+        except Exception as e:
+            self.provider.session.rollback()
+            logger.error("{}: {}".format(paper_id, repr(e)))
+            return "failed"
+
+    def get_status(self):
+        """
+        Returns the progress of the current (or last) batch of papers, for
+        clients
+        """
+        return {
+            'state':   self.progress['state'],
+            'current': self.progress['current'],
+            'done':    self.progress['done'],
+            'total':   self.progress['total'],
+            'results': dict(self.progress['results']),
+            'pending': len(self.pending),
+            'watched': len(self.signatures)
+        }
+
+    def shutdown(self):
+        """
+        Waits for the paper being loaded (if any), then closes the worker's
+        provider
+        """
+        def close_provider():
+            if self.provider is not None:
+                self.provider.shutdown()
+                self.provider = None
+
+        self.executor.submit(close_provider)
+        self.executor.shutdown(wait=True)
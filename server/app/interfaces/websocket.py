@@ -8,10 +8,12 @@ import websockets
 from websockets.server import WebSocketServerProtocol
 
 # Messages to the client will be JSON-ified, compressed, and base64 encoded
+# (Cacheable responses are re-sent from app.frame_cache)
 import base64
 import json
 import zlib
 
+import app.frame_cache
 import app.logger
 
 logger = app.logger.getLogger(__name__)
@@ -216,9 +218,9 @@ class WebsocketClient(ClientInterface):
         try:
             while True:
                 msg = yield from self.output_queue.get()
-                msg = json.dumps(msg)
-                msg_preview = msg[0:80]
-                msg = base64.b64encode(zlib.compress(msg.encode())).decode()
+                msg_preview = '{{"id": {}, "command": {}'.format(
+                    json.dumps(msg['id']), json.dumps(msg['command']))
+                msg = app.frame_cache.cache.encode(msg)
 
                 if not self.websocket.open:
                     logger.error(
@@ -0,0 +1,133 @@
+"""
+Process-wide cache of get_paper_data() responses, so that opening or
+refreshing a paper that has not changed does not rebuild its payload.
+Every entry is stored with a version stamp of the paper (its row in the Paper
+table, whose version and last_modified columns the database bumps on every
+change to the paper's sentences, contexts, events and comments); an entry is
+only used while the stamp still matches, and the data provider also drops a
+paper's entry whenever it changes the paper itself.
+The cache is bounded both in papers (`paper_cache_max_papers`) and in the
+approximate size of the cached payloads (`paper_cache_max_bytes`), and evicts
+the least recently used papers first.
+"""
+
+import collections
+import threading
+
+import app.config
+
+# Rough size of one context/event in a payload, on top of its free text
+_RECORD_SIZE = 150
+
+
+def payload_size(data):
+    """
+    Approximate size of a get_paper_data() payload, in bytes
+    (Its contexts and events may also be app.columnar tables.)
+    """
+    paper = data['paper']
+    size = sum(len(sentence) for sentence in paper['sentences'])
+    size += len(paper['title'] or "") + len(paper['sections'] or "")
+    for key in ('contexts_reach', 'contexts_manual'):
+        contexts = data[key]
+        if isinstance(contexts, dict):
+            free_texts = contexts['columns']['free_text']
+        else:
+            free_texts = [context['free_text'] for context in contexts]
+        size += sum(_RECORD_SIZE + len(free_text or "")
+                    for free_text in free_texts)
+    events = data['events']
+    if isinstance(events, dict):
+        size += _RECORD_SIZE * events['length']
+    else:
+        size += _RECORD_SIZE * len(events)
+    return size
+
+
+class PaperCache(object):
+    """
+    paper_id -> (stamp, payload) LRU cache.
+    (Responses in other formats are cached under (paper_id, format).)
+    Cached payloads are shared, and must not be modified.
+    Safe to share between threads.
+    """
+    def __init__(self, max_papers=None, max_bytes=None):
+        if max_papers is None:
+            max_papers = app.config.paper_cache_max_papers
+        if max_bytes is None:
+            max_bytes = app.config.paper_cache_max_bytes
+
+        self.max_papers = max_papers
+        self.max_bytes = max_bytes
+        # paper_id -> (stamp, payload, size)
+        self._entries = collections.OrderedDict()
+        self.size = 0
+        # Bumped whenever the whole cache is cleared, for caches built on
+        # this one (e.g., app.frame_cache) to tell stale entries apart
+        self.generation = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, paper_id, stamp):
+        """
+        Returns the cached payload for the given paper if it was cached with
+        the same stamp, or None
+        """
+        with self._lock:
+            entry = self._entries.get(paper_id)
+            if entry is None or entry[0] != stamp:
+                if entry is not None:
+                    self._remove(paper_id)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(paper_id)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, paper_id, stamp, data):
+        size = payload_size(data)
+        with self._lock:
+            self._remove(paper_id)
+            if self.max_papers <= 0 or size > self.max_bytes:
+                return
+            self._entries[paper_id] = (stamp, data, size)
+            self.size += size
+            while len(self._entries) > self.max_papers or \
+                    self.size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def discard(self, paper_id):
+        with self._lock:
+            self._remove(paper_id)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+            self.generation += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'papers':    len(self._entries),
+                'bytes':     self.size,
+                'hits':      self.hits,
+                'misses':    self.misses,
+                'evictions': self.evictions
+            }
+
+    def _remove(self, paper_id):
+        entry = self._entries.pop(paper_id, None)
+        if entry is not None:
+            self.size -= entry[2]
+
+
+# The cache for this process
+cache = PaperCache()
@@ -0,0 +1,418 @@
+"""
+Locates the files of the papers in `papers_path`, which may hold paper
+folders, archives of paper folders (.tar, .tar.gz/.tgz, .tar.bz2, .tar.xz,
+.zip) or both; `papers_path` may also be a single archive.
+Any file in a paper folder (on disk or in an archive) may also be gzipped
+individually (e.g., 'sentences.txt.gz').
+Archive members are read directly, without being extracted to disk: All the
+files of an archived paper are read in a single forward pass through the
+archive, and kept in memory until another paper is read (See
+ArchivePaper.open()).
+"""
+
+import collections
+import gzip
+import io
+import os
+import tarfile
+import threading
+import zipfile
+
+import app.config
+import app.logger
+
+logger = app.logger.getLogger(__name__)
+
+ARCHIVE_SUFFIXES = ('.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz',
+                    '.txz', '.zip')
+
+
+def is_archive(path):
+    """
+    Returns True if the given path looks like a paper archive
+    """
+    return path.lower().endswith(ARCHIVE_SUFFIXES) and os.path.isfile(path)
+
+
+class PaperFiles(object):
+    """
+    The input files of a single paper, wherever they are stored.
+    File names are always the plain ones (e.g., 'sentences.txt'); gzipped
+    copies are found and decompressed transparently.
+    """
+    def __init__(self, paper_id, location):
+        self.paper_id = paper_id
+        # Folder or archive path, for log messages
+        self.location = location
+
+    def exists(self, file_name):
+        raise NotImplementedError
+
+    def open(self, file_name):
+        """
+        Returns a binary file object with the (decompressed) contents of the
+        given file
+        """
+        raise NotImplementedError
+
+    def local_path(self, file_name):
+        """
+        Returns the path of the given file if it is an uncompressed file on
+        disk (which can be memory-mapped), or None
+        """
+        return None
+
+    def lines(self, file_name):
+        """
+        Yields the lines of the given file (without their line endings)
+        """
+        path = self.local_path(file_name)
+        if path is not None:
+            for line in iter_lines(path):
+                yield line
+            return
+
+        with self.open(file_name) as f:
+            for line in io.TextIOWrapper(f, encoding='utf8', newline="\n"):
+                yield _strip_line_ending(line)
+
+
+class DirectoryPaper(PaperFiles):
+    """
+    A paper folder on disk
+    """
+    def _path(self, file_name):
+        path = os.path.join(self.location, file_name)
+        if os.path.isfile(path):
+            return path, False
+        if os.path.isfile(path + ".gz"):
+            return path + ".gz", True
+        return None, False
+
+    def exists(self, file_name):
+        return self._path(file_name)[0] is not None
+
+    def open(self, file_name):
+        path, gzipped = self._path(file_name)
+        if path is None:
+            raise FileNotFoundError(os.path.join(self.location, file_name))
+        if gzipped:
+            return gzip.open(path, 'rb')
+        return open(path, 'rb')
+
+    def local_path(self, file_name):
+        path, gzipped = self._path(file_name)
+        if gzipped:
+            return None
+        return path
+
+
+class ArchivePaper(PaperFiles):
+    """
+    A paper folder in a tar or zip archive.
+    `members` maps file names to (member, gzipped) pairs, where `member` is a
+    TarInfo or ZipInfo, as of the archive's (mtime, size) `stamp`.
+    Opening any of its files reads all of them (See _read_members()), so
+    parsing and fingerprinting a paper only goes through the archive once.
+    """
+    def __init__(self, paper_id, location, members, stamp=None):
+        super().__init__(paper_id, location)
+        self.members = members
+        self.stamp = stamp
+
+    def exists(self, file_name):
+        return file_name in self.members
+
+    def open(self, file_name):
+        if file_name not in self.members:
+            raise FileNotFoundError("{}:{}/{}".format(self.location,
+                                                      self.paper_id,
+                                                      file_name))
+        member, gzipped = self.members[file_name]
+        f = io.BytesIO(_read_members(self)[file_name])
+        if gzipped:
+            return gzip.GzipFile(fileobj=f, mode='rb')
+        return f
+
+
+# Archive path -> (mtime, size, OrderedDict of paper ID -> ArchivePaper),
+# shared with worker processes when they are forked
+_archive_indices = {}
+# Open archive handles, per thread (extracting members moves the position of
+# the underlying file)
+_archive_handles = threading.local()
+# The files of the archived paper read last, per thread (See _read_members())
+_paper_buffers = threading.local()
+
+
+def _open_archive(path):
+    """
+    Returns the archive's current (mtime, size) stamp and an open
+    TarFile/ZipFile for it, reusing the one this thread already has open
+    unless the archive has changed since (in which case the old one is
+    closed).  Going back in a compressed tar archive means decompressing it
+    again from the start, so papers should be read in the order that
+    list_papers() returns them (each paper's files are then read with a
+    single forward pass).
+    """
+    handles = getattr(_archive_handles, 'handles', None)
+    if handles is None:
+        handles = _archive_handles.handles = {}
+    stat = os.stat(path)
+    stamp = (stat.st_mtime, stat.st_size)
+    # File handles don't survive a fork
+    key = (path, os.getpid())
+    handle = handles.get(key)
+    if handle is not None and handle[0] != stamp:
+        handle[1].close()
+        handle = None
+    if handle is None:
+        if path.lower().endswith('.zip'):
+            handle = (stamp, zipfile.ZipFile(path))
+        else:
+            handle = (stamp, tarfile.open(path, 'r:*'))
+        handles[key] = handle
+    return handle
+
+
+def _read_members(paper):
+    """
+    Returns a Dictionary mapping the names of the given ArchivePaper's files
+    to their contents (still gzipped, for gzipped files), read in archive
+    order.  The last paper read on each thread is kept, so that its files
+    can be opened again (and in any order) without going back in the
+    archive.
+    """
+    key = (paper.location, paper.stamp, paper.paper_id)
+    buffered = getattr(_paper_buffers, 'paper', None)
+    if buffered is not None and buffered[0] == key:
+        return buffered[1]
+    # Only one paper is held at a time
+    _paper_buffers.paper = None
+
+    stamp, archive = _open_archive(paper.location)
+    if paper.stamp is not None and stamp != paper.stamp:
+        # The members' offsets are those of an older copy of the archive
+        raise FileNotFoundError("{} has changed since it was indexed."
+                                "".format(paper.location))
+
+    is_zip = isinstance(archive, zipfile.ZipFile)
+    members = sorted(paper.members.items(),
+                     key=lambda item: item[1][0].header_offset if is_zip
+                     else item[1][0].offset_data)
+    contents = {}
+    for file_name, (member, gzipped) in members:
+        if is_zip:
+            contents[file_name] = archive.read(member)
+        else:
+            contents[file_name] = archive.extractfile(member).read()
+
+    _paper_buffers.paper = (key, contents)
+    return contents
+
+
+def close_archives():
+    """
+    Closes the archives that this thread has open, and drops its buffered
+    paper (for once a batch of papers has been read)
+    """
+    handles = getattr(_archive_handles, 'handles', None) or {}
+    for stamp, handle in handles.values():
+        handle.close()
+    _archive_handles.handles = {}
+    _paper_buffers.paper = None
+
+
+def archive_index(path):
+    """
+    Returns an OrderedDict of paper ID -> ArchivePaper for every paper folder
+    in the given archive, in archive order.
+    Paper folders are the parents of the archive's files, so they may be
+    nested at any depth; those that end with `paper_disabled_suffix` are
+    skipped.  The index is cached until the archive changes.
+    """
+    stat = os.stat(path)
+    cached = _archive_indices.get(path)
+    if cached is not None and cached[:2] == (stat.st_mtime, stat.st_size):
+        return cached[2]
+
+    # Indexed through a handle on the archive as it is now
+    stamp, archive = _open_archive(path)
+    if path.lower().endswith('.zip'):
+        members = [(info.filename, info)
+                   for info in archive.infolist()
+                   if not info.is_dir()]
+    else:
+        members = [(info.name, info)
+                   for info in archive.getmembers()
+                   if info.isfile()]
+
+    papers = collections.OrderedDict()
+    for name, member in members:
+        parts = name.replace("\\", "/").split("/")
+        if len(parts) < 2:
+            continue
+        paper_id, file_name = parts[-2], parts[-1]
+        if paper_id.endswith(app.config.paper_disabled_suffix):
+            continue
+
+        gzipped = file_name.endswith(".gz")
+        if gzipped:
+            file_name = file_name[:-len(".gz")]
+
+        if paper_id not in papers:
+            papers[paper_id] = ArchivePaper(paper_id, path, {}, stamp)
+        # A plain copy of a file wins over a gzipped one
+        if not gzipped or file_name not in papers[paper_id].members:
+            papers[paper_id].members[file_name] = (member, gzipped)
+
+    _archive_indices[path] = stamp + (papers,)
+    return papers
+
+
+def list_archives(papers_path):
+    """
+    Returns the paper archives in `papers_path` (or `papers_path` itself, if
+    it is an archive)
+    """
+    if is_archive(papers_path):
+        return [papers_path]
+    if not os.path.isdir(papers_path):
+        return []
+    return [os.path.join(papers_path, name)
+            for name in sorted(os.listdir(papers_path))
+            if is_archive(os.path.join(papers_path, name))]
+
+
+def list_papers(papers_path):
+    """
+    Returns the IDs of all the enabled papers in `papers_path`: Paper folders
+    first (sorted), then the papers in each archive (in archive order).
+    A paper found in more than one place is only listed once.
+    """
+    paper_ids = []
+    if os.path.isdir(papers_path):
+        for directory in sorted(os.listdir(papers_path)):
+            if not os.path.isdir(os.path.join(papers_path, directory)):
+                continue
+            if directory.endswith(app.config.paper_disabled_suffix):
+                logger.debug("Paper directory is marked as disabled: {}. "
+                             "Skipping.".format(directory))
+                continue
+            paper_ids.append(directory)
+
+    seen = set(paper_ids)
+    for archive in list_archives(papers_path):
+        for paper_id in archive_index(archive):
+            if paper_id not in seen:
+                seen.add(paper_id)
+                paper_ids.append(paper_id)
+
+    return paper_ids
+
+
+def find_paper(paper_id, papers_path):
+    """
+    Returns the PaperFiles for the given paper, or None if it is in neither a
+    folder nor an archive in `papers_path`.
+    Paper folders on disk take precedence over archives.
+    """
+    base = os.path.join(papers_path, paper_id)
+    if os.path.isdir(base):
+        return DirectoryPaper(paper_id, base)
+
+    for archive in list_archives(papers_path):
+        paper = archive_index(archive).get(paper_id)
+        if paper is not None:
+            return paper
+
+    return None
+
+
+def paper_signatures(papers_path):
+    """
+    Returns a Dictionary mapping the ID of every paper that list_papers()
+    would return to a cheap signature of its files, for spotting new and
+    changed papers without reading them: For paper folders, the names,
+    mtimes and sizes of the files in the folder; for archived papers, the
+    mtime and size of the archive.
+    """
+    signatures = {}
+    for paper_id in list_papers(papers_path):
+        base = os.path.join(papers_path, paper_id)
+        if os.path.isdir(base):
+            files = []
+            for entry in os.scandir(base):
+                if entry.is_file():
+                    stat = entry.stat()
+                    files.append((entry.name, stat.st_mtime_ns,
+                                  stat.st_size))
+            signatures[paper_id] = tuple(sorted(files))
+            continue
+
+        paper = find_paper(paper_id, papers_path)
+        stat = os.stat(paper.location)
+        signatures[paper_id] = ((paper.location, stat.st_mtime_ns,
+                                 stat.st_size),)
+
+    return signatures
+
+
+def _strip_line_ending(line):
+    """
+    Removes a trailing "\n" or "\r\n" from the given line
+    """
+    if line.endswith("\n"):
+        line = line[:-1]
+    if line.endswith("\r"):
+        line = line[:-1]
+    return line
+
+
+def iter_lines(path):
+    """
+    Yields the lines of the given UTF-8 text file (without their line
+    endings; lines end at every "\n", and a "\r" before it is dropped).
+    Files of at least `paper_mmap_threshold` bytes are memory-mapped and
+    decoded one window of that many bytes at a time, rather than read
+    through a buffered file object; where the platform allows it, each
+    window's pages are released once it has been read, so that they don't
+    count towards our resident memory.
+    """
+    import mmap
+
+    size = os.path.getsize(path)
+    window = app.config.paper_mmap_threshold
+    if size == 0 or size < window:
+        with open(path, encoding='utf8', newline="\n") as f:
+            for line in f:
+                yield _strip_line_ending(line)
+        return
+
+    # mmap.madvise() is new in Python 3.8
+    can_release = hasattr(mmap.mmap, 'madvise') and \
+        hasattr(mmap, 'MADV_DONTNEED')
+    with open(path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            position = 0
+            released = 0
+            while position < size:
+                # Windows always end on a line break
+                end = mapped.rfind(b"\n", position, position + window)
+                if end == -1:
+                    end = mapped.find(b"\n", position + window)
+                if end == -1:
+                    end = size - 1
+                lines = mapped[position:end + 1].decode().split("\n")
+                if lines[-1] == "":
+                    lines.pop()
+                for line in lines:
+                    yield line[:-1] if line.endswith("\r") else line
+                position = end + 1
+
+                if can_release:
+                    page_end = position - position % mmap.PAGESIZE
+                    if page_end > released:
+                        mapped.madvise(mmap.MADV_DONTNEED, released,
+                                       page_end - released)
+                        released = page_end
@@ -0,0 +1,394 @@
+"""
+Reads the Reach output and curated annotations for the papers in
+`papers_path` into plain Python objects, ready to be written to the database
+by a data provider.
+Everything here is kept at module level (and free of database state) so that
+papers can be parsed in worker processes.
+"""
+
+import collections
+import csv
+import os
+
+import app.config
+import app.logger
+import app.paper_sources
+import app.reach_parser
+
+logger = app.logger.getLogger(__name__)
+
+# -- Parsed paper model
+# Line numbers and intervals are ints throughout.  Sentences, contexts and
+# groundings are immutable, so they are plain (hashable) tuples; events get
+# their groundings filled in from the curated TSV, so they are slotted
+# objects instead.  Every record type supports the namedtuple-style `_fields`
+# and `_asdict()`.
+Sentence = collections.namedtuple("Sentence", ["paper_id",
+                                               "line_num",
+                                               "sentence"])
+
+Context = collections.namedtuple("Context", ["paper_id",
+                                             "line_num",
+                                             "interval_start",
+                                             "interval_end",
+                                             "type",
+                                             "free_text",
+                                             "grounding_id"])
+
+Grounding = collections.namedtuple("Grounding", ["id"])
+
+
+class Event(object):
+    """
+    A Reach event; `groundings` is a set of Groundings
+    """
+    __slots__ = _fields = ("paper_id", "line_num", "interval_start",
+                           "interval_end", "type", "groundings")
+
+    def __init__(self, paper_id, line_num, interval_start, interval_end,
+                 type, groundings=None):
+        self.paper_id = paper_id
+        self.line_num = line_num
+        self.interval_start = interval_start
+        self.interval_end = interval_end
+        self.type = type
+        self.groundings = set() if groundings is None else groundings
+
+    def _asdict(self):
+        return collections.OrderedDict((field, getattr(self, field))
+                                       for field in self._fields)
+
+    def __repr__(self):
+        return "Event({})".format(", ".join("{}={!r}".format(key, value)
+                                            for key, value in
+                                            self._asdict().items()))
+
+
+class Paper(object):
+    """
+    A parsed paper, as returned by read_paper().
+    `events_by_line` maps each line number to the list of events on it.
+    """
+    __slots__ = _fields = ("id", "title", "sections", "sentences",
+                           "contexts", "events", "events_by_line")
+
+    def __init__(self, id):
+        self.id = id
+        self.title = None
+        self.sections = None
+        self.sentences = set()
+        self.contexts = set()
+        self.events = set()
+        self.events_by_line = {}
+
+    def _asdict(self):
+        return collections.OrderedDict((field, getattr(self, field))
+                                       for field in self._fields)
+
+
+def read_paper(paper_id, papers_path=None):
+    """
+    Reads the base annotation data for the given paper from its directory
+    under `papers_path` (defaults to app.config.papers_path) into a Paper.
+    Returns False if the directory could not be found.
+    """
+    records = iter_paper(paper_id, papers_path)
+    paper = next(records, None)
+    if paper is None:
+        return False
+
+    record_sets = {
+        Sentence: paper.sentences,
+        Context:  paper.contexts,
+        Event:    paper.events
+    }
+    for record in records:
+        record_sets[type(record)].add(record)
+        if type(record) is Event:
+            # For looking up the events on a given line
+            paper.events_by_line.setdefault(record.line_num, []) \
+                .append(record)
+
+    return paper
+
+
+def iter_paper(paper_id, papers_path=None):
+    """
+    Generator version of read_paper(): Parses the given paper's files as it
+    goes, and yields
+    - a Paper with its title and sections (but no sentences, contexts or
+      events), then
+    - every Sentence, then every Context, then every Event, one at a time.
+    Only the curated TSV is read up front (to attach its context
+    associations to the events), so memory use does not depend on the size
+    of the paper.
+    Yields nothing if the paper could not be found.
+    """
+    files = locate_paper(paper_id, papers_path)
+    if files is None:
+        return
+
+    # -- Paper
+    paper = Paper(paper_id)
+
+    # -- Title
+    line_num = 0
+    for line in files.lines('titles.txt'):
+        if line.startswith("true"):
+            break
+        line_num += 1
+    for title_line_num, sentence in enumerate(
+            iter_sentences(files.lines('sentences.txt'))):
+        if title_line_num == line_num:
+            paper.title = sentence
+            break
+    else:
+        raise IndexError("Title line out of range for paper: {} ({})"
+                         "".format(paper_id, line_num))
+
+    # -- Sections
+    curr_section = None
+    line_num = 0
+    section_list = []
+    for line in files.lines('sections.txt'):
+        if line != curr_section:
+            section_list.append(str(line_num))
+            curr_section = line
+        line_num += 1
+    paper.sections = ",".join(section_list)
+
+    # -- Xia's base context associations
+    if not files.exists(paper_id + ".tsv"):
+        logger.debug("No manual annotations for {}."
+                     "".format(paper_id))
+        associations = {}
+    else:
+        associations = read_curated_associations(
+            paper_id, files.lines(paper_id + ".tsv"))
+
+    yield paper
+
+    # -- Sentences
+    for line_num, sentence in enumerate(
+            iter_sentences(files.lines('sentences.txt'))):
+        yield Sentence(paper_id, line_num, sentence)
+
+    # -- Reach contexts
+    parser = app.reach_parser.get_mention_parser()
+    for line in files.lines('mention_intervals.txt'):
+        for mention in parser.parse_line(line):
+            yield Context(paper_id,
+                          mention.line_num,
+                          mention.interval_start,
+                          mention.interval_end,
+                          "reach",
+                          mention.free_text,
+                          mention.grounding_id)
+
+    # -- Reach events
+    intervals = app.reach_parser.iter_event_intervals(
+        files.lines('event_intervals.txt'))
+    for interval in intervals:
+        yield Event(paper_id,
+                    interval.line_num,
+                    interval.interval_start,
+                    interval.interval_end,
+                    "reach",
+                    set(associations.get(interval.line_num, ())))
+
+
+def paper_records(paper):
+    """
+    Yields a Paper (from read_paper()) followed by all of its records, in
+    the same order as iter_paper()
+    """
+    yield paper
+    for records in [paper.sentences, paper.contexts, paper.events]:
+        for record in records:
+            yield record
+
+
+def locate_paper(paper_id, papers_path=None):
+    """
+    Returns the app.paper_sources.PaperFiles for the given paper in
+    `papers_path` (defaults to app.config.papers_path), or None (after
+    logging the reason) if it could not be found
+    """
+    if papers_path is None:
+        papers_path = app.config.papers_path
+
+    files = app.paper_sources.find_paper(paper_id, papers_path)
+    if files is None:
+        # Two possibilities: There is no such paper, or it was disabled
+        disabled_check = os.path.join(papers_path,
+                                      paper_id +
+                                      app.config.paper_disabled_suffix)
+        if os.path.isdir(disabled_check):
+            logger.error("Paper directory is marked as disabled: {}"
+                         "".format(disabled_check))
+        else:
+            logger.error("Could not find paper: {} (in {})"
+                         "".format(paper_id, papers_path))
+        return None
+
+    return files
+
+
+def iter_sentences(lines):
+    """
+    Yields the sentences on the given lines of a 'sentences.txt' file
+    """
+    for line in lines:
+        # Stripping out extraneous whitespace to prevent problems with
+        # intervals
+        yield ' '.join(line.split())
+
+
+def read_curated_associations(paper_id, lines, errors=None):
+    """
+    Reads the curated context associations for the given paper from the lines
+    of its TSV file.
+    Returns a Dictionary mapping (int) line numbers to the (frozen) set of
+    Groundings associated with the events on that line.  Lines with the same
+    groundings share a single set.
+    The TSV is read in a single pass: Grounding labels are collected as they
+    come (they may be defined on a later line than the one that uses them),
+    and associations are resolved at the end.
+    If the TSV cannot be read, the error is logged (and appended to the
+    `errors` List, if given) and the associations read so far are returned.
+    """
+    # Grounding labels start with S|T|C -- Basically, [^E]
+    annotation_labels = {}
+    # (line_num, label) for every association, in file order
+    associations = []
+    # Line number -> Groundings
+    groundings = {}
+    # Shared Grounding objects and sets of Groundings
+    grounding_cache = {}
+    set_cache = {}
+
+    line_num = None
+    try:
+        for row in csv.reader(lines, delimiter='\t'):
+            line_num = row[0]
+            row_groundings = row[1]
+            grounding_labels = row[3]
+            row_associations = row[4]
+
+            if row_groundings != "":
+                # There are contexts identified on this line
+                row_groundings = row_groundings.split(",")
+                for grounding_label in grounding_labels.lower().split(","):
+                    grounding_label = grounding_label.strip()
+                    if not grounding_label.startswith("e"):
+                        annotation_labels[grounding_label] = \
+                            row_groundings.pop(0).strip()
+                if len(row_groundings) > 0:
+                    logger.debug("Did not identify labels for all "
+                                 "groundings on line {}. "
+                                 "Remaining "
+                                 "labels: {}"
+                                 "".format(line_num, row_groundings))
+
+            if row_associations != "":
+                # There are associations on this line
+                associations.extend(
+                    (line_num, association.strip())
+                    for association in
+                    row_associations.lower().split(","))
+
+        # Associate lines with their contexts
+        for line_num, association in associations:
+            grounding_id = annotation_labels[association]
+            grounding = grounding_cache.get(grounding_id)
+            if grounding is None:
+                grounding = grounding_cache[grounding_id] = \
+                    Grounding(grounding_id)
+            line_groundings = groundings.get(int(line_num), frozenset())
+            if grounding not in line_groundings:
+                line_groundings = line_groundings | {grounding}
+                line_groundings = set_cache.setdefault(line_groundings,
+                                                       line_groundings)
+                groundings[int(line_num)] = line_groundings
+
+    except Exception as e:
+        error_msg = ("Error reading curated TSV for paper: {}.\n"
+                     "Last line was {}.\n"
+                     "{}".format(paper_id, line_num, repr(e)))
+        logger.error(error_msg)
+        if errors is not None:
+            errors.append(error_msg)
+
+    return groundings
+
+
+def list_papers(papers_path=None):
+    """
+    Returns the IDs of all the papers in `papers_path` (defaults to
+    app.config.papers_path), whether in folders or archives, skipping those
+    that end with `paper_disabled_suffix`
+    (See app.paper_sources.list_papers())
+    """
+    if papers_path is None:
+        papers_path = app.config.papers_path
+
+    return app.paper_sources.list_papers(papers_path)
+
+
+def close_archives():
+    """
+    Closes the paper archives that this thread has open, once a batch of
+    papers has been read (See app.paper_sources.close_archives())
+    """
+    app.paper_sources.close_archives()
+
+
+def paper_files(paper_id):
+    """
+    Returns the names of the files in a paper directory that read_paper()
+    reads (any of which may also be gzipped)
+    """
+    return ['sentences.txt', 'titles.txt', 'sections.txt',
+            'mention_intervals.txt', 'event_intervals.txt',
+            paper_id + '.tsv']
+
+
+def paper_fingerprint(paper_id, papers_path=None):
+    """
+    Returns a Dictionary mapping each of the given paper's input files (see
+    paper_files()) to the SHA-1 hex digest of its (decompressed) contents,
+    or to None if the file does not exist
+    """
+    import hashlib
+
+    if papers_path is None:
+        papers_path = app.config.papers_path
+
+    files = app.paper_sources.find_paper(paper_id, papers_path)
+    fingerprint = {}
+    for file_name in paper_files(paper_id):
+        if files is None or not files.exists(file_name):
+            fingerprint[file_name] = None
+            continue
+
+        digest = hashlib.sha1()
+        with files.open(file_name) as f:
+            for chunk in iter(lambda: f.read(1 << 16), b''):
+                digest.update(chunk)
+        fingerprint[file_name] = digest.hexdigest()
+
+    return fingerprint
+
+
+def timed_read_paper(paper_id, papers_path=None):
+    """
+    Worker entry point for parallel loading: Returns the output of
+    read_paper(), the paper's fingerprint (taken before it is read, so that
+    later changes to the files are never missed) and the time taken, in
+    seconds
+    """
+    import timeit
+    start_time = timeit.default_timer()
+    fingerprint = paper_fingerprint(paper_id, papers_path)
+    paper = read_paper(paper_id, papers_path)
+    return paper, fingerprint, timeit.default_timer() - start_time
@@ -12,9 +12,19 @@ import sqlalchemy.orm.exc
 import sqlalchemy.exc
 import sqlalchemy.dialects
 
+import app.columnar
 import app.config
+import app.dictionary_snapshot
+import app.frame_cache
 import app.exceptions
+import app.grounding_cache
+import app.grounding_index
+import app.grounding_matcher
+import app.paper_cache
+import app.papers
+import app.synthetic_corpus
 import app.util
+import app.validation
 import app.logger
 from app.providers.template import DataProvider
 from app.providers.util import SQLAlchemyORM
@@ -25,6 +35,7 @@ Sentence = SQLAlchemyORM.Sentence
 Context = SQLAlchemyORM.Context
 Grounding = SQLAlchemyORM.Grounding
 GroundingText = SQLAlchemyORM.GroundingText
+GroundingDictionary = SQLAlchemyORM.GroundingDictionary
 Event = SQLAlchemyORM.Event
 Comment = SQLAlchemyORM.Comment
 
@@ -54,6 +65,13 @@ class PostgresProvider(DataProvider):
 
         # ... and the ORM session
         self.session = sqlalchemy.orm.sessionmaker(bind=self.engine)()
+
+        # The grounding cache, prefix index and matcher are shared by every
+        # provider in this process
+        if not app.grounding_cache.cache.warmed or \
+                not app.grounding_index.index.built or \
+                not app.grounding_matcher.matcher.built:
+            self._warm_grounding_lookups()
         logger.info(
             "PostgreSQL data provider initialised. ({0})".format(
                 self.connection_string)
@@ -64,6 +82,20 @@ class PostgresProvider(DataProvider):
         self.session.close()
         logger.info("PostgreSQL data provider shut down.")
 
+    def finish_request(self):
+        """
+        Ends the transaction that the ORM session implicitly began for the
+        last command, so that idle sessions do not hold locks (which would
+        block _swap_grounding_tables(), for one).
+        Commands commit whatever they write (including rows that they create
+        on the fly, like get_comments()'s empty Comment), so whatever is left
+        (reads, or the remains of a command that failed) is rolled back.
+        """
+        try:
+            self.session.rollback()
+        except Exception as e:
+            logger.error(repr(e))
+
     def execute_literal(self, query):
         """
         Executes a literal sql query on the DB.
@@ -159,7 +191,16 @@ class PostgresProvider(DataProvider):
                 query[index] = row
 
             response['data'] = query
-            return response
+            # The same page of the same list can be re-sent while none of its
+            # rows have changed
+            return app.frame_cache.CacheableResponse(
+                response,
+                (search_str,
+                 tuple((multi_index['column'], multi_index['dir'])
+                       for multi_index in request['order']),
+                 slice_start, slice_length),
+                (response['recordsTotal'], [tuple(row) for row in query]),
+                echo=('draw',))
         except Exception as e:
             logger.error(repr(e))
             return {
@@ -172,58 +213,74 @@ class PostgresProvider(DataProvider):
         # the client
         try:
             paper_id = request['paperID']
-            paper_model = self.get_paper_by_id(paper_id)
-
-            return_data = {}
+            # The paper's own columns double as the stamp of its cached
+            # response: last_modified is bumped by the database whenever its
+            # sentences, contexts or events change
+            paper_model = self.session.query(
+                Paper.id, Paper.title, Paper.sections, Paper.locked,
+                Paper.annotation_pass, Paper.last_modified, Paper.version,
+                Paper.text_version
+            ).filter(Paper.id == paper_id).one()
+
+            columnar = app.columnar.requested(request)
+
+            # A client that already has a version of the paper only needs
+            # what has changed since (unless its text has changed too)
+            known_version = request.get('knownVersion')
+            if known_version is not None:
+                known_version = int(known_version)
+                if known_version == paper_model.version:
+                    return {
+                        'paper':        {'id':      paper_model.id,
+                                         'version': paper_model.version},
+                        'not_modified': True
+                    }
+                if paper_model.text_version <= known_version < \
+                        paper_model.version:
+                    return self._paper_delta(paper_model, known_version,
+                                             columnar)
+
+            stamp = tuple(paper_model)
+            cache_key = (paper_id, app.columnar.FORMAT) if columnar \
+                else paper_id
+            paper_cache = app.paper_cache.cache
+            return_data = paper_cache.get(cache_key, stamp)
+            if return_data is not None:
+                return return_data
+
+            # Its encoded frame can be re-sent until the paper changes (or
+            # the grounding dictionaries are reloaded)
+            return_data = app.frame_cache.CacheableResponse(
+                {}, cache_key, (paper_cache.generation, stamp))
             return_data['paper'] = {}
             return_data['paper']['id'] = paper_model.id
             return_data['paper']['title'] = paper_model.title
             return_data['paper']['sections'] = paper_model.sections
-            # The following query returns a list of 1-tuples as its result
-            sentences = self.session.query(Sentence.sentence) \
-                            .filter(Sentence.paper == paper_model) \
-                            .order_by(Sentence.line_num)[:]
-            return_data['paper']['sentences'] = [x[0] for x in sentences]
+            return_data['paper']['sentences'] = \
+                self._paper_sentences(paper_model.id)
             return_data['paper']['locked'] = paper_model.locked
             return_data['paper']['annotation_pass'] = \
                 paper_model.annotation_pass
+            return_data['paper']['version'] = paper_model.version
 
-            # "xia" type contexts are from the curated TSVs, but should not
-            # be deleteable like "manual" ones.
-            contexts_reach = self.session.query(Context) \
-                                 .filter(Context.paper == paper_model) \
-                                 .filter(
-                sqlalchemy.or_(Context.type == "reach",
-                               Context.type == "xia")
-            ) \
-                                 .order_by(Context.id)[:]
-            return_data['contexts_reach'] = [x.dictionary for x in
-                                             contexts_reach]
-
-            contexts_manual = self.session.query(Context) \
-                                  .filter(Context.paper == paper_model) \
-                                  .filter(Context.type == "manual") \
-                                  .order_by(Context.id)[:]
-            return_data['contexts_manual'] = [x.dictionary for x in
-                                              contexts_manual]
+            # Contexts and events are read with one query each, with their
+            # grounding IDs joined in, rather than through the lazy-loading
+            # relationships behind their .dictionary properties
+            records = self._paper_records(paper_model.id, columnar=columnar)
+            return_data['contexts_reach'] = records['contexts_reach']
+            return_data['contexts_manual'] = records['contexts_manual']
 
             # Context category hierarchy
             # [ ( <description>, [ <prefix>, ... ] ) ]
             return_data['context_categories'] = \
                 app.config.context_categories
 
-            # Events are ordered by line_num, then by interval_start
-            events = self.session.query(Event) \
-                .filter(Event.paper == paper_model)
-
             # If we are in annotation pass 1, we will not send Reach events.
             # if paper_model.annotation_pass == 1:
             #     events = events.filter(Event.type != "reach")
+            return_data['events'] = records['events']
 
-            events = events.order_by(Event.line_num) \
-                         .order_by(Event.interval_start)[:]
-            return_data['events'] = [x.dictionary for x in events]
-
+            paper_cache.put(cache_key, stamp, return_data)
             return return_data
 
         except Exception as e:
@@ -235,6 +292,254 @@ class PostgresProvider(DataProvider):
                            "available papers."
             }
 
+    def get_paper_skeleton(self, request):
+        """
+        Returns the requested paper's metadata and number of lines, without
+        its sentences, contexts or events, so that the client can fetch those
+        a window at a time (See get_paper_window())
+        """
+        try:
+            paper_id = request['paperID']
+            paper_model = self.session.query(
+                Paper.id, Paper.title, Paper.sections, Paper.locked,
+                Paper.annotation_pass, Paper.version
+            ).filter(Paper.id == paper_id).one()
+            # Sentences are numbered from 0; reading the last line number
+            # off the (paper_id, line_num) index takes one probe, however
+            # long the paper is
+            last_line = self.session.query(Sentence.line_num) \
+                .filter(Sentence.paper_id == paper_id) \
+                .filter(Sentence.line_num.isnot(None)) \
+                .order_by(Sentence.line_num.desc()).first()
+            line_count = last_line[0] + 1 if last_line is not None else 0
+
+            return {
+                'paper':              {
+                    'id':              paper_model.id,
+                    'title':           paper_model.title,
+                    'sections':        paper_model.sections,
+                    'locked':          paper_model.locked,
+                    'annotation_pass': paper_model.annotation_pass,
+                    'version':         paper_model.version,
+                    'line_count':      line_count
+                },
+                'context_categories': app.config.context_categories
+            }
+        except Exception as e:
+            logger.error(repr(e))
+            return {
+                "error":   True,
+                "message": "Could not load the requested paper.<br>"
+                           "Please select another one from the list of "
+                           "available papers."
+            }
+
+    def get_paper_window(self, request):
+        """
+        Returns the sentences, contexts and events of part of the requested
+        paper: either the lines in `request['lines']` ([start, end), with an
+        end of None for the rest of the paper) or the sections in
+        `request['sections']` ([first, last), as indices into Paper.sections;
+        likewise with None).
+        The paper's version is read after the window, so a client that gets
+        the same version with every window (and the skeleton) knows that none
+        of them includes a later change.
+        """
+        try:
+            paper_id = request['paperID']
+            if 'sections' in request:
+                sections = self.session.query(Paper.sections) \
+                    .filter(Paper.id == paper_id).one()[0]
+                start, end = self._section_lines(sections,
+                                                 *request['sections'])
+            else:
+                start, end = request['lines']
+                start = int(start)
+                end = int(end) if end is not None else None
+            if start < 0 or (end is not None and end < start):
+                raise ValueError("Invalid window: {}-{}".format(start, end))
+
+            window = {
+                'paper':     {'id': paper_id},
+                'lines':     [start, end],
+                'sentences': self._paper_sentences(paper_id, (start, end))
+            }
+            window.update(self._paper_records(
+                paper_id, lines=(start, end),
+                columnar=app.columnar.requested(request)))
+            window['paper']['version'] = self.session.query(Paper.version) \
+                .filter(Paper.id == paper_id).one()[0]
+            return window
+        except Exception as e:
+            logger.error(repr(e))
+            return {
+                "error":   True,
+                "message": repr(e)
+            }
+
+    @staticmethod
+    def _section_lines(sections, first, last):
+        """
+        Returns the [start, end) line range of sections [first, last) of a
+        paper with the given Paper.sections
+        (An end of None stands for the end of the paper.)
+        """
+        starts = [int(x) for x in (sections or "0").split(",")]
+        first = int(first)
+        last = len(starts) if last is None else int(last)
+        if not 0 <= first < last <= len(starts):
+            raise ValueError("Invalid sections: {}-{}".format(first, last))
+        return starts[first], starts[last] if last < len(starts) else None
+
+    @staticmethod
+    def _filter_lines(query, column, lines):
+        """
+        Restricts `query` to the rows whose `column` (a line number) is in
+        the [start, end) range `lines`, if given
+        """
+        if lines is None:
+            return query
+        start, end = lines
+        query = query.filter(column >= start)
+        if end is not None:
+            query = query.filter(column < end)
+        return query
+
+    def _paper_sentences(self, paper_id, lines=None):
+        """
+        Returns the given paper's sentences in order (Only those in the
+        [start, end) line range `lines`, if given.)
+        """
+        # The following query returns a list of 1-tuples as its result
+        sentences = self.session.query(Sentence.sentence) \
+            .filter(Sentence.paper_id == paper_id)
+        sentences = self._filter_lines(sentences, Sentence.line_num, lines) \
+            .order_by(Sentence.line_num)[:]
+        return [x[0] for x in sentences]
+
+    def _paper_delta(self, paper_model, since, columnar=False):
+        """
+        Returns what has changed in the given paper (a row of
+        get_paper_data()'s paper query) since version `since`: its own
+        fields, the contexts and events that were added or changed, the IDs
+        of those that were deleted, and its comments if they changed
+        """
+        paper_id = paper_model.id
+        records = self._paper_records(paper_id, since, columnar=columnar)
+
+        deleted = SQLAlchemyORM.deleted_annotation
+        deletions = self.session.query(deleted.c.table_name,
+                                       deleted.c.row_id) \
+            .filter(deleted.c.paper_id == paper_id) \
+            .filter(deleted.c.version > since)[:]
+
+        delta = {
+            'paper':            {
+                'id':              paper_id,
+                'title':           paper_model.title,
+                'sections':        paper_model.sections,
+                'locked':          paper_model.locked,
+                'annotation_pass': paper_model.annotation_pass,
+                'version':         paper_model.version
+            },
+            'since':            since,
+            'contexts_reach':   records['contexts_reach'],
+            'contexts_manual':  records['contexts_manual'],
+            'events':           records['events'],
+            'deleted_contexts': [row_id for table, row_id in deletions
+                                 if table == Context.__tablename__],
+            'deleted_events':   [row_id for table, row_id in deletions
+                                 if table == Event.__tablename__]
+        }
+
+        comment = self.session.query(Comment.comment) \
+            .filter(Comment.paper_id == paper_id) \
+            .filter(Comment.version > since).first()
+        if comment is not None:
+            delta['comments'] = comment[0]
+        return delta
+
+    def _paper_records(self, paper_id, since=None, lines=None,
+                       columnar=False):
+        """
+        Returns the given paper's contexts (as 'contexts_reach' and
+        'contexts_manual') and 'events', as lists of what their .dictionary
+        properties would return or, if `columnar`, as app.columnar tables
+        (Only those changed after paper version `since` and in the
+        [start, end) line range `lines`, if given.)
+        """
+        context_names, contexts = self._paper_context_rows(paper_id, since,
+                                                           lines)
+        event_names, events = self._paper_event_rows(paper_id, since, lines)
+
+        # "xia" type contexts are from the curated TSVs, but should not
+        # be deleteable like "manual" ones.
+        type_index = context_names.index('type')
+        contexts_reach = [row for row in contexts
+                          if row[type_index] in ("reach", "xia")]
+        contexts_manual = [row for row in contexts
+                           if row[type_index] == "manual"]
+
+        if columnar:
+            encode = app.columnar.encode_rows
+        else:
+            def encode(names, rows):
+                return [dict(zip(names, row)) for row in rows]
+        return {
+            'contexts_reach':  encode(context_names, contexts_reach),
+            'contexts_manual': encode(context_names, contexts_manual),
+            'events':          encode(event_names, events)
+        }
+
+    def _paper_context_rows(self, paper_id, since=None, lines=None):
+        """
+        Returns the field names and rows of the given paper's contexts, with
+        the fields of their .dictionary properties, ordered by ID, in a single
+        query
+        (Only those changed after paper version `since` and in the
+        [start, end) line range `lines`, if given.)
+        """
+        columns = list(Context.__table__.columns)
+        rows = self.session.query(*columns, GroundingText.grounding_id) \
+            .outerjoin(GroundingText,
+                       GroundingText.free_text == Context.free_text) \
+            .filter(Context.paper_id == paper_id)
+        if since is not None:
+            rows = rows.filter(Context.version > since)
+        rows = self._filter_lines(rows, Context.line_num, lines) \
+            .order_by(Context.id)
+        names = [column.name for column in columns] + ['grounding_id']
+        # Plain result rows are quicker to fetch than the ORM's named tuples
+        return names, self.session.execute(rows.statement).fetchall()
+
+    def _paper_event_rows(self, paper_id, since=None, lines=None):
+        """
+        Returns the field names and rows of the given paper's events, with
+        the fields of their .dictionary properties, ordered by line number
+        and then by interval start, in a single query
+        (The grounding IDs of each event are sorted.  Only the events changed
+        after paper version `since` and in the [start, end) line range
+        `lines` are returned, if they are given.)
+        """
+        columns = list(Event.__table__.columns)
+        association = SQLAlchemyORM.event_grounding
+        groundings = sqlalchemy.func.coalesce(
+            sqlalchemy.func.array_agg(
+                sqlalchemy.dialects.postgresql.aggregate_order_by(
+                    association.c.grounding_id, association.c.grounding_id)
+            ).filter(association.c.grounding_id.isnot(None)),
+            sqlalchemy.literal_column("'{}'::text[]"))
+        rows = self.session.query(*columns, groundings) \
+            .outerjoin(association, association.c.event_id == Event.id) \
+            .filter(Event.paper_id == paper_id)
+        if since is not None:
+            rows = rows.filter(Event.version > since)
+        rows = self._filter_lines(rows, Event.line_num, lines) \
+            .group_by(Event.id) \
+            .order_by(Event.line_num, Event.interval_start, Event.id)
+        names = [column.name for column in columns] + ['groundings']
+        return names, self.session.execute(rows.statement).fetchall()
+
     def get_comments(self, paper_id):
         """
         Returns the given paper's current comments as a String
@@ -247,6 +552,7 @@ class PostgresProvider(DataProvider):
 
             if not comment_get[1]:
                 comment.comment = ""
+                self.session.commit()
                 logger.debug("Created empty comment string for paper (ID: {})"
                              "".format(paper_id))
 
@@ -264,6 +570,39 @@ class PostgresProvider(DataProvider):
                            "".format(paper_id)
             }
 
+    def complete_free_text(self, prefix, limit=None):
+        """
+        Returns up to `limit` (default: app.config.autocomplete_limit) free
+        texts from the GroundingText table that start with `prefix`
+        (ignoring case), with their grounding IDs.
+        Served from the in-memory prefix index (app.grounding_index).
+        If there are fewer than `limit` of them, known free texts that are
+        similar to `prefix` are added as `suggestions` (with their grounding
+        IDs and similarity scores), for the user to pick from
+        (See app.grounding_matcher.GroundingMatcher.suggest()).
+        """
+        if limit is None:
+            limit = app.config.autocomplete_limit
+        limit = max(0, min(int(limit), app.config.autocomplete_max_limit))
+
+        matches = app.grounding_index.index.search(prefix, limit)
+        matched = set(free_text for free_text, _ in matches)
+        suggestions = [
+            suggestion for suggestion in
+            app.grounding_matcher.matcher.suggest(prefix,
+                                                  limit - len(matches))
+            if suggestion[0] not in matched]
+        return app.frame_cache.CacheableResponse({
+            'prefix':      prefix,
+            'matches':     [{'free_text': free_text,
+                             'grounding_id': grounding_id}
+                            for free_text, grounding_id in matches],
+            'suggestions': [{'free_text': free_text,
+                             'grounding_id': grounding_id,
+                             'score': round(score, 3)}
+                            for free_text, grounding_id, score in suggestions]
+        }, (prefix, limit), (matches, suggestions))
+
     def get_paper_diff(self, request):
         """
         Returns information about the difference between the current
@@ -275,14 +614,14 @@ class PostgresProvider(DataProvider):
         1) Simple attributes on the main Paper object are compared and marked
            either 'unchanged' or 'updated'.
         2) Set attributes ('.contexts', '.events', etc.) are turned into Lists
-           for dumping to JSON later.  Each set element should be a Namespace
-           object.
-        3) Namespace objects within these sets are matched based on their
-           simple attributes (line_num, interval_start, etc.).  If there are
+           for dumping to JSON later.  Each set element should be one of the
+           record types in app.papers.
+        3) Records within these sets are matched based on their simple
+           attributes (line_num, interval_start, etc.).  If there are
            no matches, the objects are saved as 'created' or 'deleted'
            accordingly.
         4) For objects that do match, any set attributes they have (e.g.,
-           the 'groundings' property for the events Namespace) are further
+           the 'groundings' property for the event records) are further
            compared (again, based on simple attributes), and marked as either
            'created', 'deleted', or 'unchanged' accordingly.
 
@@ -361,160 +700,52 @@ class PostgresProvider(DataProvider):
             return_data['added'] = {}
             return_data['removed'] = {}
 
-            def iterate_diff(attribute_path, iterable):
-                """
-                Iterates over the given (sub-)object from self._read_paper(),
-                pushing values that are different to 'diff' and values that
-                are the same to 'same' in return_data
-                """
-                # Namespace and Dictionary objects
-                if (isinstance(iterable, app.util.Namespace) or
-                        isinstance(iterable, dict)):
-
-                    try:
-                        dictionary = vars(iterable)
-                    except TypeError:
-                        # Dictionary objects don't allow vars(), strangely
-                        # enough
-                        dictionary = iterable
-
-                    for key, base_item in dictionary.items():
-                        if (isinstance(base_item, app.util.Namespace) or
-                                isinstance(base_item, dict) or
-                                isinstance(base_item, set)):
-                            # Recurse
-                            iterate_diff(attribute_path + [key], base_item)
-                        else:
-                            # Simple attribute; find the current value and
-                            # compare it
-                            current_item = current_paper
-                            for path in attribute_path:
-                                current_item = getattr(current_item, path)
-                            current_item = getattr(current_item, key)
-
-                            if current_item == base_item:
-                                diff_item = return_data['same']
-                            else:
-                                diff_item = return_data['diff']
-
-                            for path in attribute_path:
-                                if path not in diff_item:
-                                    diff_item[path] = {}
-
-                                diff_item = diff_item[path]
-
-                            diff_item[key] = current_item
-
-                            logger.info('Handling simple attribute: {}, {}'
-                                        ''.format(key,
-                                                  current_item))
-
-                elif isinstance(iterable, set):
-                    # There isn't an easy way to compare sets; we'll have to
-                    # iterate repeatedly :(
-
-                    # Cast to Lists for our return data (sets cannot be
-                    # dumped as JSON)
-                    same_set = return_data['same']
-                    for path in attribute_path[:-1]:
-                        same_set = same_set[path]
-                    same_set[attribute_path[-1]] = []
-                    same_set = same_set[attribute_path[-1]]
-
-                    diff_set = return_data['diff']
-                    for path in attribute_path[:-1]:
-                        diff_set = diff_set[path]
-                    diff_set[attribute_path[-1]] = []
-                    diff_set = diff_set[attribute_path[-1]]
-
-                    # Get the current data for this set from the database
-                    current_set = current_paper
-                    for path in attribute_path:
-                        current_set = getattr(current_set, path)
-
-                    # Perform the comparison
-                    for current_item in current_set:
-                        found_same = False
-                        # Uses the custom .dictionary property we put on our
-                        # ORM objects
-                        current_vars = current_item.dictionary
-
-                        for base_item in iterable:
-                            assert (isinstance(base_item, app.util.Namespace))
-                            is_same = True
-                            base_vars = vars(base_item)
-
-                            # if attribute_path == ['contexts']:
-                            #     print("====")
-                            #     print(current_vars)
-                            #     print("----")
-                            #     print(base_vars)
-
-                            for key, item in base_vars.items():
-                                if isinstance(item, set):
-                                    # An embedded set
-                                    current_vars[key] = list(current_vars[key])
-                                    if not set_same(item, current_vars[key]):
-                                        is_same = False
-
-                                # Cast everything to strings for the comparison
-                                # (_read_paper returns strings, the ORM
-                                # objects cast to int per the DB schema)
-                                elif str(current_vars[key]) != str(item):
-                                    is_same = False
-
-                            if is_same:
-                                # Found a member in current_set that matches
-                                found_same = True
-                                break
-
-                        if found_same:
-                            same_set.append(current_vars)
-                        else:
-                            diff_set.append(current_vars)
-
-            def set_same(base_set, current_set):
-                """
-                Recursively checks a set of Namespaces from base_paper to
-                see if they hold the same values as a set from current_paper
-                (This simpler check is used for embedded sets, since we won't
-                have to push these embedded sets to "same"/"diff")
-                """
-                # Base cases: When the length of the subsets are different,
-                # or when both are empty
-                if len(base_set) != len(current_set):
-                    return False
-
-                if len(base_set) == 0 and len(current_set) == 0:
-                    return True
-
-                # If the number of items is the same, make sure that the
-                # items are the same as well
-                for base_item in base_set:
-                    assert (isinstance(base_item, app.util.Namespace))
-                    found_same = False
-                    base_vars = vars(base_item)
-
-                    for current_item in current_set:
-                        is_same = True
-                        current_vars = current_item.dictionary
-
-                        for key, item in base_vars.items():
-                            if isinstance(item, set):
-                                current_vars[key] = list(current_vars[key])
-                                if not set_same(item, current_vars[key]):
-                                    is_same = False
-                            elif str(current_vars[key]) != str(item):
-                                is_same = False
-
-                        if is_same:
-                            found_same = True
-                            break
-
-                    if not found_same:
-                        return False
+            # Simple attributes
+            for key in ['id', 'title', 'sections']:
+                current_item = getattr(current_paper, key)
+                if current_item == getattr(base_paper, key):
+                    return_data['same'][key] = current_item
+                else:
+                    return_data['diff'][key] = current_item
+
+            # Set attributes: Every base record is reduced to a hashable key
+            # (its simple fields, cast to strings since the ORM objects cast
+            # to int per the DB schema, plus the IDs in its embedded
+            # `groundings` set, if any), so that each item in the database
+            # can be matched with a single lookup.
+            record_types = [('sentences', app.papers.Sentence),
+                            ('contexts', app.papers.Context),
+                            ('events', app.papers.Event)]
+            for key, record_type in record_types:
+                fields = record_type._fields
+
+                base_keys = set()
+                for base_item in getattr(base_paper, key):
+                    base_keys.add(tuple(
+                        frozenset(grounding.id for grounding in
+                                  base_item.groundings)
+                        if field == 'groundings'
+                        else str(getattr(base_item, field))
+                        for field in fields
+                    ))
+
+                same_list = return_data['same'][key] = []
+                diff_list = return_data['diff'][key] = []
+                for current_item in getattr(current_paper, key):
+                    # Uses the custom .dictionary property we put on our
+                    # ORM objects
+                    current_vars = current_item.dictionary
+                    current_key = tuple(
+                        frozenset(current_vars[field])
+                        if field == 'groundings'
+                        else str(current_vars[field])
+                        for field in fields
+                    )
 
-            iterate_diff([], base_paper)
+                    if current_key in base_keys:
+                        same_list.append(current_vars)
+                    else:
+                        diff_list.append(current_vars)
 
             return return_data
 
@@ -603,8 +834,11 @@ class PostgresProvider(DataProvider):
         be found.
         """
         try:
-            return self.session.query(GroundingText) \
-                .filter_by(free_text=free_text).one()
+            # Checks the session's identity map before querying
+            grounding_text = self.session.query(GroundingText).get(free_text)
+            if grounding_text is None:
+                return False
+            return grounding_text
         except Exception as e:
             logger.debug(
                 "Error when attempting to look up GroundingText (Text: {})."
@@ -612,6 +846,42 @@ class PostgresProvider(DataProvider):
             logger.debug(repr(e))
             return False
 
+    def resolve_free_texts(self, free_texts):
+        """
+        Batch lookup for the grounding IDs of many free texts (e.g., all the
+        mentions in a paper) in one pass: Free texts are looked up in the
+        grounding cache, then in a single query on the GroundingText table,
+        and finally with the grounding matcher.
+        Returns a Dictionary mapping each free text to its grounding ID, or
+        to None if create_context() would generate a manual one.
+        Nothing is written to the database.
+        """
+        cache = app.grounding_cache.cache
+        resolved = {}
+        missing = set()
+        for free_text in free_texts:
+            if free_text in resolved or free_text in missing:
+                continue
+            grounding_id = cache.grounding_id_for(free_text)
+            if grounding_id is None:
+                missing.add(free_text)
+            else:
+                resolved[free_text] = grounding_id
+
+        if len(missing) > 0:
+            rows = self.session.query(GroundingText.free_text,
+                                      GroundingText.grounding_id) \
+                .filter(GroundingText.free_text.in_(missing))
+            for free_text, grounding_id in rows:
+                resolved[free_text] = grounding_id
+                missing.discard(free_text)
+                self._remember_grounding_text(free_text, grounding_id)
+
+        matches = app.grounding_matcher.matcher.match_all(missing)
+        for free_text, (grounding_id, _, _) in matches.items():
+            resolved[free_text] = grounding_id
+        return resolved
+
     def get_manual_groundings(self):
         """
         Returns a list of Grounding objects that have an automatically
@@ -650,6 +920,7 @@ class PostgresProvider(DataProvider):
             else:
                 paper.annotation_pass = 2
                 self.session.commit()
+                self._paper_changed(paper_id)
 
                 # Also do some pre-processing: We want Reach events to
                 # inherit the context associations for any manual events they
@@ -737,6 +1008,7 @@ class PostgresProvider(DataProvider):
             else:
                 self.session.add(event_get[0])
                 self.session.commit()
+                self._paper_changed(paper_id)
 
             return event_get[0].dictionary
         except Exception as e:
@@ -755,6 +1027,7 @@ class PostgresProvider(DataProvider):
             event.interval_start = new_start
             event.interval_end = new_end
             self.session.commit()
+            self._paper_changed(event.paper_id)
             return True
         except Exception as e:
             logger.error(repr(e))
@@ -775,6 +1048,7 @@ class PostgresProvider(DataProvider):
                 .one()
             self.session.delete(event)
             self.session.commit()
+            self._paper_changed(paper_id)
             return True
         except Exception as e:
             logger.error(repr(e))
@@ -795,6 +1069,7 @@ class PostgresProvider(DataProvider):
                 .one()
             event.false_positive = not event.false_positive
             self.session.commit()
+            self._paper_changed(paper_id)
             return True
         except Exception as e:
             logger.error(repr(e))
@@ -815,37 +1090,51 @@ class PostgresProvider(DataProvider):
         queried; if no matching entry is found, a novel grounding_id will be
         created.
         """
+        cache = app.grounding_cache.cache
+        # Whether a new free text -> grounding ID mapping is being added.
+        # The grounding caches only learn about it (and its grounding ID)
+        # once it has been committed.
+        remember = False
         try:
             if grounding_id is None:
-                # Try to get a GroundingText
-                grounding_text = self.get_grounding_text_by_text(free_text)
-                if not grounding_text:
-                    # Whoops, couldn't get one.  Generate it.
-                    grounding_text = self._generate_grounding_text(free_text)
-            else:
+                # Try to get a GroundingText (from the cache first)
+                grounding_id = cache.grounding_id_for(free_text)
+                if grounding_id is None:
+                    grounding_text = self.get_grounding_text_by_text(
+                        free_text)
+                    if not grounding_text:
+                        # Try a near-miss variant of a known free text
+                        grounding_text = self._match_grounding_text(free_text)
+                    if not grounding_text:
+                        # Whoops, couldn't get one.  Generate it.
+                        grounding_text = self._generate_grounding_text(
+                            free_text)
+                    grounding_id = grounding_text.grounding_id
+                    remember = True
+            elif cache.grounding_id_for(free_text) != grounding_id:
                 # Grounding ID was specified.  Make sure it exists.
-                grounding_get = self._get_one_or_create(Grounding,
-                                                        id=grounding_id)
-                if not grounding_get[1]:
-                    logger.debug(
-                        "Created grounding ID by user request: {}".format(
-                            grounding_id
+                if not cache.has_grounding(grounding_id):
+                    grounding_get = self._get_one_or_create(Grounding,
+                                                            id=grounding_id)
+                    if not grounding_get[1]:
+                        logger.debug(
+                            "Created grounding ID by user request: {}".format(
+                                grounding_id
+                            )
                         )
-                    )
-                grounding = grounding_get[0]
 
                 # Then make sure the free text is mapped to that ID
                 grounding_text_get = self._get_one_or_create(
                     GroundingText,
                     free_text=free_text,
-                    grounding=grounding
+                    grounding_id=grounding_id
                 )
                 if not grounding_text_get[1]:
                     logger.debug(
                         "Associated text '{}' with grounding ID: {}"
-                        "".format(free_text, grounding.id)
+                        "".format(free_text, grounding_id)
                     )
-                grounding_text = grounding_text_get[0]
+                remember = True
 
             # Finally, create the context
             assert (type == "reach" or type == "manual" or
@@ -856,7 +1145,7 @@ class PostgresProvider(DataProvider):
                                                   interval_end=interval_end,
                                                   type=type,
                                                   paper_id=paper_id,
-                                                  grounding_text=grounding_text)
+                                                  free_text=free_text)
             if context_get[1]:
                 logger.debug(
                     "Asked to create new context ({}:{}:{}-{}), "
@@ -866,10 +1155,20 @@ class PostgresProvider(DataProvider):
                 )
 
             self.session.commit()
-            return context_get[0].dictionary
+            # Only once the mapping is actually in the database (this also
+            # records that the grounding ID exists)
+            if remember:
+                self._remember_grounding_text(free_text, grounding_id)
+            self._paper_changed(paper_id)
+            return context_get[0].dictionary_with_grounding(grounding_id)
 
         except Exception as e:
             logger.error(repr(e))
+            self.session.rollback()
+            # In case the cache (or prefix index, or matcher) was out of date
+            self._forget_grounding_text(free_text)
+            if grounding_id is not None:
+                cache.discard_grounding(grounding_id)
             return {
                 "error":   True,
                 "message": repr(e)
@@ -887,6 +1186,7 @@ class PostgresProvider(DataProvider):
                 .one()
             self.session.delete(context)
             self.session.commit()
+            self._paper_changed(paper_id)
             return True
         except Exception as e:
             logger.error(repr(e))
@@ -902,6 +1202,7 @@ class PostgresProvider(DataProvider):
         try:
             event.groundings.add(grounding)
             self.session.commit()
+            self._paper_changed(event.paper_id)
         except Exception as e:
             logger.error(repr(e))
             raise e
@@ -918,6 +1219,7 @@ class PostgresProvider(DataProvider):
                 grounding = self.get_grounding_by_id(grounding_id)
                 event.groundings.add(grounding)
             self.session.commit()
+            self._paper_changed(event.paper_id)
             return True
         except Exception as e:
             logger.error(repr(e))
@@ -932,8 +1234,10 @@ class PostgresProvider(DataProvider):
         """
         try:
             paper = self.get_paper_by_id(paper_id)
-            # paper.comment is an ORM Comment object
-            paper.comment.comment = comments
+            # The paper's ORM Comment object (created if the client never
+            # asked for the paper's comments)
+            comment = self._get_one_or_create(Comment, paper=paper)[0]
+            comment.comment = comments
             self.session.commit()
             return True
         except Exception as e:
@@ -943,6 +1247,43 @@ class PostgresProvider(DataProvider):
                 "message": repr(e)
             }
 
+    def toy_load(self):
+        """
+        Loads the hand-annotated toy paper in app.toy_data into the database
+        (written out as a paper folder by app.synthetic_corpus first)
+        """
+        import shutil
+        import tempfile
+        from app.toy_data import ToyData
+
+        path = tempfile.mkdtemp()
+        try:
+            app.synthetic_corpus.write_paper(path, ToyData.id)
+            paper = app.papers.read_paper(ToyData.id, path)
+            if self._new_paper(paper) is False:
+                return {
+                    "error":   True,
+                    "message": "Paper already exists in the database: {}"
+                               "".format(ToyData.id)
+                }
+            return True
+        except app.exceptions.CustomError as e:
+            # Loaded, but some contexts/events could not be created
+            logger.error(str(e))
+            return {
+                "error":   True,
+                "message": str(e)
+            }
+        except Exception as e:
+            self.session.rollback()
+            logger.error(repr(e))
+            return {
+                "error":   True,
+                "message": repr(e)
+            }
+        finally:
+            shutil.rmtree(path)
+
     ###################
     # Private helpers #
     ###################
@@ -968,12 +1309,14 @@ class PostgresProvider(DataProvider):
         statements.append(db_schema["postgres_schema"])
         statements.append(db_schema["grounding_table"])
         statements.append(db_schema["grounding_text_table"])
+        statements.append(db_schema["dictionary_table"])
         statements.append(db_schema["paper_table"])
         statements.append(db_schema["context_table"])
         statements.append(db_schema["event_table"])
         statements.append(db_schema["sentence_table"])
         statements.append(db_schema["association_table"])
         statements.append(db_schema["comment_table"])
+        statements.append(db_schema["deletion_table"])
 
         # Audit logs
         statements.append(db_schema["hstore_setup"])
@@ -997,6 +1340,21 @@ class PostgresProvider(DataProvider):
             logger.debug(repr(e))
             raise e
 
+    def _upgrade_tables(self):
+        """
+        Brings the tables of a database that was set up by an earlier
+        version of _create_tables() up to date.  Safe to run repeatedly.
+        """
+        from app.providers.postgresql_schema import db_schema
+
+        try:
+            self.execute_literal(db_schema["upgrades"])
+            self.execute_literal(db_schema["modified_setup"])
+            self.execute_literal(db_schema["modified_triggers"])
+        except Exception as e:
+            logger.debug(repr(e))
+            raise e
+
     def _get_one_or_create(self, model,
                            create_method='',
                            create_method_kwargs=None,
@@ -1029,12 +1387,38 @@ class PostgresProvider(DataProvider):
                     logger.error(repr(e))
                     raise e
 
+    def _match_grounding_text(self, free_text):
+        """
+        The database has no grounding ID associated with the given free_text.
+        If it only differs from a known free text in case, hyphenation,
+        plurals or whitespace (see app.grounding_matcher), map it to the same
+        grounding ID and return the new GroundingText; otherwise, return
+        False.  (Free texts that are merely similar are never matched, since
+        they often name distinct entities.)
+        Does not commit, or record the new mapping in the grounding caches
+        (See create_context()).
+        """
+        grounding_id, matched_text, score = \
+            app.grounding_matcher.matcher.match(free_text)
+        if grounding_id is None:
+            return False
+
+        grounding_text_get = self._get_one_or_create(GroundingText,
+                                                     free_text=free_text,
+                                                     grounding_id=grounding_id)
+        logger.debug("Associated text '{}' with grounding ID {} (matched "
+                     "'{}', score {:.02f})."
+                     "".format(free_text, grounding_id, matched_text, score))
+        return grounding_text_get[0]
+
     def _generate_grounding_text(self, free_text):
         """
         The database has no grounding ID associated with the given free_text.
         Manually generate a GroundingText and save it.
+        Does not commit, or record the new mapping in the grounding caches
+        (See create_context()).
         """
-        manual_grounding = "manual:{}".format(free_text.replace(" ", "-"))
+        manual_grounding = self._manual_grounding_id(free_text)
         grounding_get = self._get_one_or_create(Grounding, id=manual_grounding)
         logger.debug(
             "Created manual grounding ID: {}".format(manual_grounding))
@@ -1048,6 +1432,45 @@ class PostgresProvider(DataProvider):
                      )
         return grounding_text_get[0]
 
+    @staticmethod
+    def _manual_grounding_id(free_text):
+        """
+        Returns the automatically generated grounding ID for free text that
+        has no entry in the GroundingText table
+        """
+        return "manual:{}".format(free_text.replace(" ", "-"))
+
+    @staticmethod
+    def _copy_rows(cursor, table, columns, rows):
+        """
+        Streams `rows` (an iterable of tuples matching `columns`) into the
+        given table using COPY ... FROM STDIN on the given DBAPI cursor.
+        """
+        import io
+
+        def escape(value):
+            # COPY text format: \N for NULL, and backslash escapes for the
+            # delimiter/line terminator characters
+            if value is None:
+                return "\\N"
+            if isinstance(value, bool):
+                return "t" if value else "f"
+            return str(value).replace("\\", "\\\\") \
+                .replace("\t", "\\t") \
+                .replace("\n", "\\n") \
+                .replace("\r", "\\r")
+
+        buffer = io.StringIO()
+        for row in rows:
+            buffer.write("\t".join(escape(value) for value in row))
+            buffer.write("\n")
+        buffer.seek(0)
+
+        cursor.copy_expert(
+            "COPY {} ({}) FROM STDIN;".format(table, ", ".join(columns)),
+            buffer
+        )
+
     @contextlib.contextmanager
     def _app_name(self, app_name):
         """
@@ -1060,244 +1483,248 @@ class PostgresProvider(DataProvider):
         yield
         self.execute_literal("SET application_name TO '{}'".format(old_name))
 
+    def _warm_grounding_lookups(self):
+        """
+        (Re-)fills the process-wide grounding cache (app.grounding_cache)
+        and brings the free text prefix index (app.grounding_index) and
+        matcher (app.grounding_matcher) up to date, from the GroundingText and
+        Grounding tables.
+        If the compiled dictionary snapshot is up to date, the lookups are
+        based on it instead; otherwise it is recompiled for next time.
+        """
+        import timeit
+        start_time = timeit.default_timer()
+
+        cache = app.grounding_cache.cache
+        index = app.grounding_index.index
+        matcher = app.grounding_matcher.matcher
+        # Cached papers may have contexts whose free texts were remapped
+        app.paper_cache.cache.clear()
+        try:
+            snapshot = self._open_compiled_snapshot()
+            if snapshot is not None:
+                cache.use_snapshot(snapshot)
+                index.use_snapshot(snapshot)
+                matcher.defer(snapshot.items)
+                logger.debug("Grounding lookups based on the compiled "
+                             "snapshot of {} free text(s) in {:.03f}s."
+                             "".format(len(snapshot),
+                                       timeit.default_timer() - start_time))
+                return
+
+            # The index needs every free text; the cache keeps the ones it
+            # has room for
+            rows = self.execute_literal(
+                "SELECT free_text, grounding_id, {} FROM {};"
+                "".format(self._grounding_text_hash,
+                          GroundingText.__tablename__))
+            grounding_ids = self.execute_literal(
+                "SELECT id FROM {} LIMIT {};"
+                "".format(Grounding.__tablename__, cache.groundings.max_size))
+        except Exception as e:
+            # e.g., the tables have not been created yet
+            logger.debug("Could not warm the grounding cache: {}"
+                         "".format(repr(e)))
+            cache.clear()
+            index.clear()
+            matcher.clear()
+            return
+
+        grounding_texts = [(row[0], row[1]) for row in rows]
+        cache.warm(grounding_texts, (row[0] for row in grounding_ids))
+        added, removed = index.update(grounding_texts)
+        matcher.update(grounding_texts)
+        logger.debug("Grounding lookups warmed with {} free text(s) "
+                     "({} added to and {} removed from the index) in "
+                     "{:.03f}s.".format(len(grounding_texts), added, removed,
+                                        timeit.default_timer() - start_time))
+
+        if app.config.compiled_dictionary_snapshot:
+            try:
+                app.dictionary_snapshot.write_snapshot(
+                    app.config.compiled_dictionary_snapshot, grounding_texts,
+                    sum(row[2] for row in rows))
+            except Exception as e:
+                logger.error("Could not compile the dictionary snapshot: {}"
+                             "".format(repr(e)))
+
+    # Per-row hash whose sum identifies the contents of the GroundingText
+    # table (See _open_compiled_snapshot())
+    _grounding_text_hash = "hashtext(free_text || E'\\t' || grounding_id)"
+
+    def _open_compiled_snapshot(self):
+        """
+        Returns the compiled dictionary snapshot if it exists and matches the
+        GroundingText table (it has the same number of free texts and the same
+        sum of _grounding_text_hash), or None
+        """
+        path = app.config.compiled_dictionary_snapshot
+        if not path:
+            return None
+        try:
+            snapshot = app.dictionary_snapshot.DictionarySnapshot(path)
+        except (OSError, ValueError) as e:
+            logger.debug("Not using the compiled dictionary snapshot: {}"
+                         "".format(repr(e)))
+            return None
+
+        count, checksum = self.execute_literal(
+            "SELECT count(*), coalesce(sum({}), 0) FROM {};"
+            "".format(self._grounding_text_hash,
+                      GroundingText.__tablename__))[0]
+        if count != len(snapshot) or checksum != snapshot.checksum:
+            logger.debug("The compiled dictionary snapshot is out of date.")
+            snapshot.close()
+            return None
+        return snapshot
+
+    def _remember_grounding_text(self, free_text, grounding_id):
+        """
+        Records a free text -> grounding ID mapping that is in the database
+        (or about to be committed) in the grounding cache, prefix index and
+        matcher
+        """
+        app.grounding_cache.cache.add_text(free_text, grounding_id)
+        app.grounding_index.index.add(free_text, grounding_id)
+        app.grounding_matcher.matcher.add(free_text, grounding_id)
+
+    def _forget_grounding_text(self, free_text):
+        app.grounding_cache.cache.discard_text(free_text)
+        app.grounding_index.index.discard(free_text)
+        app.grounding_matcher.matcher.discard(free_text)
+
+    @staticmethod
+    def _paper_changed(paper_id):
+        """
+        Drops the given paper's cached get_paper_data() responses
+        """
+        app.paper_cache.cache.discard(paper_id)
+        app.paper_cache.cache.discard((paper_id, app.columnar.FORMAT))
+
     ################################
     # Data Loading and Maintenance #
     ################################
     def _load_paper(self, paper_id):
         """
         Attempts to read the paper data for the given paper ID
-        """
-        paper_data = self._read_paper(paper_id)
+        With bulk ingestion, the paper is streamed from its files straight
+        into the database (See app.papers.iter_paper()).
+        Returns True if the paper was loaded, False if it could not be read
+        or added; raises a CustomError if it was loaded with errors.
+        """
+        fingerprint = app.papers.paper_fingerprint(paper_id)
+        if app.config.bulk_paper_ingestion:
+            if app.papers.locate_paper(paper_id) is None:
+                paper_data = False
+            else:
+                paper_data = app.papers.iter_paper(paper_id)
+        else:
+            paper_data = self._read_paper(paper_id)
         if not paper_data:
             logger.error("Could not load paper.")
-            return
+            return False
+
+        try:
+            if self._new_paper(paper_data) is False:
+                return False
+        except app.exceptions.CustomError:
+            # Loaded, but with errors
+            self._save_paper_fingerprint(paper_id, fingerprint)
+            raise
+        self._save_paper_fingerprint(paper_id, fingerprint)
+        return True
+
+    def _save_paper_fingerprint(self, paper_id, fingerprint):
+        """
+        Records the fingerprint of the files the given paper was loaded from
+        (See app.papers.paper_fingerprint())
+        """
+        import json
+
+        paper = self.get_paper_by_id(paper_id)
+        paper.fingerprint = json.dumps(fingerprint, sort_keys=True)
+        self.session.commit()
+
+    def _save_paper_signature(self, paper_id, signature):
+        """
+        Records the signature of the given paper's files as of its last sync
+        (See app.paper_sources.paper_signatures())
+        """
+        import json
+
+        paper = self.get_paper_by_id(paper_id)
+        paper.signature = json.dumps(signature)
+        self.session.commit()
+
+    def _paper_signatures(self):
+        """
+        Returns a Dictionary mapping the ID of every paper with a recorded
+        signature to that signature, in the same form as
+        app.paper_sources.paper_signatures()
+        """
+        import json
 
-        self._new_paper(paper_data)
+        signatures = {}
+        for paper_id, signature in self.session.query(Paper.id,
+                                                      Paper.signature) \
+                .filter(Paper.signature.isnot(None)):
+            signatures[paper_id] = tuple(tuple(entry) for entry in
+                                         json.loads(signature))
+        # Not holding the transaction open (See finish_request())
+        self.session.rollback()
+        return signatures
 
     def _read_paper(self, paper_id):
         """
         Reads the base annotation data for the given paper
+        (See app.papers.read_paper())
         """
-        import csv
-        import os
-        import re
-
-        base = os.path.join(app.config.papers_path, paper_id)
-        if not os.path.isdir(base):
-            # Two possibilities: There is no such directory, or it was
-            # disabled
-            disabled_check = os.path.join(app.config.papers_path,
-                                          paper_id +
-                                          app.config.paper_disabled_suffix)
-            if os.path.isdir(disabled_check):
-                logger.error("Paper directory is marked as disabled: {}"
-                             "".format(disabled_check))
-            else:
-                logger.error("Could not find paper directory: {}"
-                             "".format(base))
-            return False
+        return app.papers.read_paper(paper_id)
 
-        # -- Paper
-        paper = app.util.Namespace()
-        paper.id = paper_id
-
-        # -- Sentences
-        paper.sentences = set()
-        with open(os.path.join(base, 'sentences.txt')) as f:
-            # Stripping out extraneous whitespace to prevent problems with
-            # intervals
-            raw_sentences = [' '.join(line.strip().split()) for line in f]
-        for line_num, sentence in enumerate(raw_sentences):
-            line = app.util.Namespace()
-            line.line_num = line_num
-            line.sentence = sentence
-            line.paper_id = paper_id
-            paper.sentences.add(line)
-
-        # -- Title
-        with open(os.path.join(base, 'titles.txt')) as f:
-            line_num = 0
-            for line in f:
-                if line.startswith("true"):
-                    break
-                line_num += 1
-        paper.title = raw_sentences[line_num]
-
-        # -- Sections
-        with open(os.path.join(base, 'sections.txt')) as f:
-            curr_section = None
-            line_num = 0
-            section_list = []
-            for line in f:
-                if line != curr_section:
-                    section_list.append(str(line_num))
-                    curr_section = line
-                line_num += 1
-        paper.sections = ",".join(section_list)
-
-        # -- Reach contexts
-        paper.contexts = set()
-
-        # The text+grounding part of interval mentions can look like:
-        # T-cell[-%]tissuelist:TS-1001
-        reach_matcher = re.compile(r"(.+)" +
-                                   app.config.mention_intervals_delimiter +
-                                   "((" +
-                                   app.config.paper_grounding_prefixes +
-                                   r"):.+)")
-        with open(os.path.join(base, 'mention_intervals.txt')) as f:
-            for line in f:
-                line = line.strip()
-                mentions = line.split()
-                if len(mentions) > 1:
-                    # There are mentions for this line
-                    line_num = mentions[0]
-                    for mention in mentions[1:]:
-                        # Split into three guaranteed parts: Start index,
-                        # end index and free text + grounding ID
-                        # (Just in case the free text/grounding ID contains
-                        # the delimiter character)
-                        intervals = mention.split(
-                            app.config.mention_intervals_delimiter,
-                            maxsplit=2)
-                        interval_start = intervals[0]
-                        interval_end = intervals[1]
-                        m = reach_matcher.match(intervals[2])
-
-                        m = reach_matcher.match("astrocytes_.%cl:CL:0000127")
-                        m = reach_matcher.match("stem_cell%cl:CL:0000034")
-                        m = reach_matcher.match("Stem_Cell_Hypothesis%cl:CL:0000034")
-                        m = reach_matcher.match("Preadipocyte_Factor%cl:CL:0002334")
-                        m = reach_matcher.match("Keratinocyte_Signaling%tissuelist:TS-0500")
-                        m = reach_matcher.match("Human_Embryonic%taxonomy:9606")
-                        m = reach_matcher.match("THYROID_TUMORS%tissuelist:TS-1047")
-                        m = reach_matcher.match("adult_subventricular_zone_astrocytes%uberon:UBERON:0004922")
-                        m = reach_matcher.match("glioblastoma_initiating%tissuelist:TS-0417")
-                        m = reach_matcher.match("colorectal_cancer_.%tissuelist:TS-0160")
-                        m = reach_matcher.match("human_keratinocytes%cellosaurus:CVCL_9T09")
-                        m = reach_matcher.match("Adipose_Derived%tissuelist:TS-0013")
-
-                        #m = reach_matcher.match("mammary_epithelial_cells%cl:CL:0002327")
-                        #m = reach_matcher.match("breast_carcinoma%tissuelist:TS-0592")
-                        # Let's be more aggressive about catching errors here
-                        try:
-                            assert m
-                        except AssertionError:
-                            logger.debug("Could not find Regex match on "
-                                         "interval mention: {}"
-                                         "".format(intervals[2]))
-                            raise
-
-                        # if not m:
-                        #     logger.debug("Could not find Regex match on "
-                        #                  "interval mention: {}"
-                        #                  "".format(intervals[2]))
-                        #     continue
-
-                        free_text = m.group(1).replace("_", " ")
-                        grounding_id = m.group(2)
-
-                        # Create the context
-                        context = app.util.Namespace()
-                        context.paper_id = paper_id
-                        context.line_num = line_num
-                        context.interval_start = interval_start
-                        context.interval_end = interval_end
-                        context.type = "reach"
-                        context.free_text = free_text
-                        context.grounding_id = grounding_id
-
-                        paper.contexts.add(context)
-
-        # -- Reach events
-        paper.events = set()
-
-        with open(os.path.join(base, 'event_intervals.txt')) as f:
-            for line in f:
-                line = line.strip()
-                events = line.split()
-                if len(events) > 1:
-                    # There are events on this line
-                    line_num = events[0]
-                    for event in events[1:]:
-                        interval_start, interval_end = event.split("-")
-
-                        # Create the event
-                        event = app.util.Namespace()
-                        event.paper_id = paper_id
-                        event.line_num = line_num
-                        event.interval_start = interval_start
-                        event.interval_end = interval_end
-                        event.type = "reach"
-                        event.groundings = set()
-
-                        paper.events.add(event)
-
-        # -- Xia's base context associations
-        manual_annotation_path = os.path.join(base, paper_id + ".tsv")
-        if not (os.path.exists(manual_annotation_path)):
-            logger.debug("No manual annotations for {}."
-                         "".format(paper_id))
-        else:
-            with open(os.path.join(base, paper_id + ".tsv"), newline='') as f:
-                try:
-                    tsv = csv.reader(f, delimiter='\t')
-                    # Pass 1: Get all grounding labels
-                    # Grounding labels start with S|T|C -- Basically, [^E]
-                    annotation_labels = {}
-                    for row in tsv:
-                        line_num = row[0]
-                        groundings = row[1]
-                        grounding_labels = row[3]
-
-                        if groundings != "":
-                            # There are contexts identified on this line
-                            groundings = groundings.split(",")
-                            grounding_labels = \
-                                grounding_labels.lower().split(",")
-                            for grounding_label in grounding_labels:
-                                grounding_label = \
-                                    grounding_label.strip()
-                                if not grounding_label.startswith("e"):
-                                    annotation_labels[grounding_label] = \
-                                        groundings.pop(0).strip()
-                            if len(groundings) > 0:
-                                logger.debug("Did not identify labels for all "
-                                             "groundings on line {}. "
-                                             "Remaining "
-                                             "labels: {}"
-                                             "".format(line_num, groundings))
-
-                    # Pass 2: Associate events with their contexts by line
-                    f.seek(0)
-                    for row in tsv:
-                        line_num = row[0]
-                        associations = row[4]
-                        if associations != "":
-                            # There are associations on this line
-                            associations = associations.lower().split(",")
-                            for association in associations:
-                                association = association.strip()
-                                grounding_id = annotation_labels[association]
-                                grounding = app.util.Namespace()
-                                grounding.id = grounding_id
-
-                                for event in paper.events:
-                                    if event.line_num == line_num:
-                                        event.groundings.add(grounding)
+    def _new_paper(self, paper, bulk=None):
+        """
+        Given the output of _read_paper (or a stream of records from
+        app.papers.iter_paper()), attempts to create a new paper in the
+        database.
+        If `bulk` is True (defaults to app.config.bulk_paper_ingestion),
+        the paper is streamed in with COPY by _new_paper_bulk(); should that
+        fail, we fall back to creating it row by row with _new_paper_rows().
+        """
+        import itertools
 
-                except Exception as e:
-                    error_msg = ("Error reading curated TSV for paper: {}.\n"
-                                 "Last line was {}.\n"
-                                 "{}".format(paper_id, line_num, repr(e)))
-                    logger.error(error_msg)
+        if bulk is None:
+            bulk = app.config.bulk_paper_ingestion
 
-        return paper
+        # Streams start with the Paper; hold on to it in case we need to
+        # fall back
+        if not isinstance(paper, app.papers.Paper):
+            records = iter(paper)
+            header = next(records)
+            paper = itertools.chain([header], records)
+        else:
+            header = paper
 
-    def _new_paper(self, paper):
-        """
-        Given the output of _read_paper, attempts to create a new paper in
-        the database.
+        if bulk:
+            try:
+                return self._new_paper_bulk(paper)
+            except app.exceptions.CustomError:
+                # The paper was loaded, but with errors -- Nothing to retry
+                raise
+            except Exception as e:
+                logger.warning("Bulk ingestion failed for paper: {}. Falling "
+                               "back to per-row ingestion. ({})"
+                               "".format(header.id, repr(e)))
+                self.session.rollback()
+
+        if not isinstance(paper, app.papers.Paper):
+            # Streams can only be consumed once; read the paper in full
+            paper = self._read_paper(header.id)
+        return self._new_paper_rows(paper)
+
+    def _new_paper_rows(self, paper):
+        """
+        Creates the given paper (from _read_paper) one row at a time via the
+        ORM.  Slow, but does not need COPY privileges on the database.
         """
         # Application name for audit log
         with self._app_name("_new_paper"):
@@ -1316,7 +1743,7 @@ class PostgresProvider(DataProvider):
             # -- Sentences
             for sentence in paper.sentences:
                 line = self._get_one_or_create(Sentence,
-                                               **vars(sentence))[0]
+                                               **sentence._asdict())[0]
                 paper_orm.sentences.add(line)
 
             # -- Title
@@ -1327,7 +1754,7 @@ class PostgresProvider(DataProvider):
 
             # -- Reach contexts
             for context in paper.contexts:
-                results = self.create_context(**vars(context))
+                results = self.create_context(**context._asdict())
 
                 if 'error' in results and results["error"]:
                     # We ran into some trouble here.
@@ -1337,15 +1764,22 @@ class PostgresProvider(DataProvider):
 
             # -- Reach events and Xia's base context annotations
             for event in paper.events:
-                # The `event` namespace has an extra variable,
-                # the `groundings` set, that should not be passed as a
-                # keyword argument to self.create_event().
-                params = vars(event).copy()
+                # The `event` record has an extra field, the `groundings`
+                # set, that should not be passed as a keyword argument to
+                # self.create_event().
+                params = event._asdict()
                 params.pop('groundings')
-                event_orm = self.create_event(**params)
+                event_dict = self.create_event(**params)
+                if 'error' in event_dict and event_dict["error"]:
+                    errors.append("Error with event: {}:{}-{}"
+                                  "".format(event.line_num,
+                                            event.interval_start,
+                                            event.interval_end))
+                    continue
+                event_orm = self.get_event_by_id(event_dict['id'])
 
                 for grounding in event.groundings:
-                    grounding_orm = self.get_grounding_by_id(grounding)
+                    grounding_orm = self.get_grounding_by_id(grounding.id)
 
                     self.associate_event_grounding(event_orm, grounding_orm)
 
@@ -1355,6 +1789,250 @@ class PostgresProvider(DataProvider):
             if len(errors) > 0:
                 raise app.exceptions.CustomError("\n".join(errors))
 
+    def _new_paper_bulk(self, paper):
+        """
+        Creates the given paper in a single transaction.
+        `paper` may be the output of _read_paper, or a stream of records from
+        app.papers.iter_paper(); either way, records are consumed in chunks
+        of `paper_ingestion_chunk_size` and streamed into the database with
+        COPY, so memory use stays flat no matter how large the paper is.
+        Sentences go straight into their table; contexts and events go
+        through temporary staging tables so that their groundings can be
+        resolved (and duplicates collapsed) with a handful of set-based
+        statements instead of one query per row.
+        Mirrors _new_paper_rows(): Duplicate rows are collapsed, and any
+        contexts/associations that cannot be resolved are skipped and
+        reported in a CustomError once the rest of the paper is committed.
+        """
+        import timeit
+        start_time = timeit.default_timer()
+
+        if isinstance(paper, app.papers.Paper):
+            records = app.papers.paper_records(paper)
+        else:
+            records = iter(paper)
+        paper = next(records)
+
+        # Application name for audit log
+        with self._app_name("_new_paper_bulk"):
+            # Will be populated as we run into errors, and raised at the end
+            errors = []
+
+            # -- Paper
+            if self.session.query(Paper.id) \
+                    .filter_by(id=paper.id).first() is not None:
+                logger.debug("Paper already exists in the database: {}. It "
+                             "must be deleted before it can be loaded again."
+                             "".format(paper.id))
+                return False
+
+            try:
+                # -- Title and Sections
+                self.session.add(Paper(id=paper.id,
+                                       title=paper.title,
+                                       sections=paper.sections))
+                self.session.flush()
+                cursor = self.session.connection().connection.cursor()
+
+                cursor.execute(
+                    "CREATE TEMPORARY TABLE _stage_context ("
+                    "line_num INTEGER, interval_start INTEGER, "
+                    "interval_end INTEGER, type TEXT, free_text TEXT, "
+                    "grounding_id TEXT) ON COMMIT DROP;"
+                )
+                # One row per event-grounding association (or a single row
+                # with a NULL grounding for events without any)
+                cursor.execute(
+                    "CREATE TEMPORARY TABLE _stage_event ("
+                    "line_num INTEGER, interval_start INTEGER, "
+                    "interval_end INTEGER, type TEXT, "
+                    "grounding_id TEXT) ON COMMIT DROP;"
+                )
+
+                # -- Sentences, Reach contexts, Reach events and Xia's base
+                # context annotations
+                targets = {
+                    app.papers.Sentence: (
+                        Sentence.__tablename__,
+                        ["line_num", "sentence", "paper_id"]
+                    ),
+                    app.papers.Context: (
+                        "_stage_context",
+                        ["line_num", "interval_start", "interval_end",
+                         "type", "free_text", "grounding_id"]
+                    ),
+                    app.papers.Event: (
+                        "_stage_event",
+                        ["line_num", "interval_start", "interval_end",
+                         "type", "grounding_id"]
+                    )
+                }
+                chunk_size = app.config.paper_ingestion_chunk_size
+                chunks = dict((record_type, []) for record_type in targets)
+
+                for record in records:
+                    record_type = type(record)
+                    chunk = chunks[record_type]
+                    if record_type is app.papers.Sentence:
+                        chunk.append((record.line_num, record.sentence,
+                                      paper.id))
+                    elif record_type is app.papers.Context:
+                        row = self._stage_context_row(record)
+                        if row is None:
+                            errors.append("Error with context: {} ({})"
+                                          "".format(record.free_text,
+                                                    record.grounding_id))
+                            continue
+                        chunk.append(row)
+                    else:
+                        if record.type not in ("reach", "manual"):
+                            errors.append("Error with event: {}:{}-{}"
+                                          "".format(record.line_num,
+                                                    record.interval_start,
+                                                    record.interval_end))
+                            continue
+                        key = (record.line_num, record.interval_start,
+                               record.interval_end, record.type)
+                        if len(record.groundings) == 0:
+                            chunk.append(key + (None,))
+                        chunk.extend(key + (grounding.id,)
+                                     for grounding in record.groundings)
+
+                    if len(chunk) >= chunk_size:
+                        self._copy_rows(cursor, *targets[record_type],
+                                        rows=chunk)
+                        del chunk[:]
+
+                for record_type, chunk in chunks.items():
+                    if len(chunk) > 0:
+                        self._copy_rows(cursor, *targets[record_type],
+                                        rows=chunk)
+
+                # Make sure every grounding ID and free text exists.  A free
+                # text that is already mapped to some other grounding ID is
+                # left alone, and its contexts are reported as errors (as
+                # in create_context()).
+                cursor.execute(
+                    "INSERT INTO {grounding} (id) "
+                    "SELECT DISTINCT grounding_id FROM _stage_context "
+                    "ON CONFLICT DO NOTHING;"
+                    "".format(grounding=Grounding.__tablename__)
+                )
+                cursor.execute(
+                    "INSERT INTO {grounding_text} (free_text, grounding_id) "
+                    "SELECT DISTINCT ON (free_text) free_text, grounding_id "
+                    "FROM _stage_context ORDER BY free_text, grounding_id "
+                    "ON CONFLICT DO NOTHING "
+                    "RETURNING free_text, grounding_id;"
+                    "".format(grounding_text=GroundingText.__tablename__)
+                )
+                new_grounding_texts = cursor.fetchall()
+                cursor.execute(
+                    "SELECT DISTINCT s.free_text, s.grounding_id "
+                    "FROM _stage_context s JOIN {grounding_text} g "
+                    "ON g.free_text = s.free_text "
+                    "WHERE g.grounding_id <> s.grounding_id;"
+                    "".format(grounding_text=GroundingText.__tablename__)
+                )
+                for free_text, grounding_id in cursor.fetchall():
+                    errors.append("Error with context: {} ({})"
+                                  "".format(free_text, grounding_id))
+
+                cursor.execute(
+                    "INSERT INTO {context} (line_num, interval_start, "
+                    "interval_end, type, paper_id, free_text) "
+                    "SELECT DISTINCT s.line_num, s.interval_start, "
+                    "s.interval_end, s.type, %s, s.free_text "
+                    "FROM _stage_context s JOIN {grounding_text} g "
+                    "ON g.free_text = s.free_text "
+                    "AND g.grounding_id = s.grounding_id;"
+                    "".format(context=Context.__tablename__,
+                              grounding_text=GroundingText.__tablename__),
+                    (paper.id,)
+                )
+
+                # Curated grounding IDs must already exist
+                # (cf. get_grounding_by_id())
+                cursor.execute(
+                    "SELECT DISTINCT s.grounding_id "
+                    "FROM _stage_event s LEFT JOIN {grounding} g "
+                    "ON g.id = s.grounding_id "
+                    "WHERE s.grounding_id IS NOT NULL AND g.id IS NULL;"
+                    "".format(grounding=Grounding.__tablename__)
+                )
+                for grounding_id, in cursor.fetchall():
+                    errors.append("Error with event association: Unknown "
+                                  "grounding ID ({})".format(grounding_id))
+
+                # Collapse duplicate events (as _get_one_or_create() would),
+                # and associate the new events with their groundings
+                cursor.execute(
+                    "WITH new_event AS ("
+                    "INSERT INTO {event} (line_num, interval_start, "
+                    "interval_end, type, paper_id, false_positive) "
+                    "SELECT DISTINCT line_num, interval_start, interval_end, "
+                    "type, %s, FALSE FROM _stage_event "
+                    "RETURNING id, line_num, interval_start, interval_end, "
+                    "type) "
+                    "INSERT INTO {association} (event_id, grounding_id) "
+                    "SELECT DISTINCT e.id, s.grounding_id "
+                    "FROM new_event e JOIN _stage_event s "
+                    "USING (line_num, interval_start, interval_end, type) "
+                    "JOIN {grounding} g ON g.id = s.grounding_id;"
+                    "".format(event=Event.__tablename__,
+                              association=SQLAlchemyORM.event_grounding.name,
+                              grounding=Grounding.__tablename__),
+                    (paper.id,)
+                )
+
+                # -- Done
+                self.session.commit()
+            except Exception as e:
+                logger.error(repr(e))
+                self.session.rollback()
+                raise e
+
+            for free_text, grounding_id in new_grounding_texts:
+                self._remember_grounding_text(free_text, grounding_id)
+
+            logger.debug("Done loading paper: {} (Bulk, {:.03f}s)."
+                         "".format(paper.id,
+                                   timeit.default_timer() - start_time))
+            if len(errors) > 0:
+                raise app.exceptions.CustomError("\n".join(errors))
+
+    def _stage_context_row(self, context):
+        """
+        _new_paper_bulk() helper: Returns the row to stage for the given
+        context, resolving its grounding ID if it has none, or None if the
+        context cannot be created
+        """
+        if context.type not in ("reach", "manual", "xia"):
+            return None
+
+        grounding_id = context.grounding_id
+        if grounding_id is None:
+            # Same lookup as create_context()
+            cache = app.grounding_cache.cache
+            grounding_id = cache.grounding_id_for(context.free_text)
+            if grounding_id is None:
+                grounding_text = self.get_grounding_text_by_text(
+                    context.free_text)
+                if grounding_text:
+                    grounding_id = grounding_text.grounding_id
+                    self._remember_grounding_text(context.free_text,
+                                                  grounding_id)
+                else:
+                    grounding_id = app.grounding_matcher.matcher.match(
+                        context.free_text)[0]
+                if grounding_id is None:
+                    grounding_id = self._manual_grounding_id(
+                        context.free_text)
+
+        return (context.line_num, context.interval_start,
+                context.interval_end, context.type, context.free_text,
+                grounding_id)
+
     def _delete_paper(self, paper_id):
         """
         Deletes all references to the given paper from the database
@@ -1384,35 +2062,417 @@ class PostgresProvider(DataProvider):
 
             # -- Paper
             self.session.delete(paper)
+            self.session.flush()
+
+            # -- Records of the deleted annotations (See _paper_delta())
+            deleted = SQLAlchemyORM.deleted_annotation
+            self.session.execute(
+                deleted.delete().where(deleted.c.paper_id == paper_id))
 
             self.session.commit()
+            self._paper_changed(paper_id)
+
+    def _prune_deleted_annotations(self):
+        """
+        Deletes the records of deleted annotations that no client can ask
+        for any more (See _paper_delta()): Those of papers that no longer
+        exist, and those no newer than their paper's text_version (deltas
+        are only sent to clients whose version of the paper has its current
+        text).  The database already does this as papers' texts change;
+        this cleans up after earlier versions of the schema.
+        Returns the number of records deleted.
+        """
+        deleted = SQLAlchemyORM.deleted_annotation
+        current = self.session.query(Paper.id) \
+            .filter(Paper.id == deleted.c.paper_id) \
+            .filter(Paper.text_version < deleted.c.version)
+        result = self.session.execute(
+            deleted.delete().where(~current.exists()))
+        self.session.commit()
+        logger.info("Pruned {} deleted annotation record(s)."
+                    "".format(result.rowcount))
+        return result.rowcount
 
-    def _load_all_papers(self):
+    def _load_all_papers(self, workers=None, writers=None):
         """
         Loops through `papers_path` (as defined in config.py), loading every
-        paper folder that does not end with `paper_disabled_suffix`
-        """
-        import os
+        paper folder that does not end with `paper_disabled_suffix`.
+        Papers are parsed by a pool of `workers` processes, and written to the
+        database by `writers` connections as soon as they are parsed
+        (Defaults: app.config.paper_loader_workers/paper_loader_writers).
+        Returns a List of per-paper reports (Dictionaries with the keys
+        'paper_id', 'status', 'parse_time', 'write_time' and 'error'),
+        which are also summarised in the log.
+        'status' is one of 'loaded', 'partial' (loaded with errors),
+        'skipped' (already in the database) or 'failed'.
+        """
+        import collections
+        import concurrent.futures
+        import queue
+        import threading
+        import timeit
 
-        path = app.config.papers_path
-        errors = []
-        for root, dirs, files in os.walk(path):
-            for directory in dirs:
-                directory_path = os.path.join(root, directory)
-                if directory_path.endswith(app.config.paper_disabled_suffix):
-                    logger.debug("Paper directory is marked as disabled: {}. "
-                                 "Skipping.".format(directory_path))
-                    continue
+        if workers is None:
+            workers = app.config.paper_loader_workers
+        if writers is None:
+            writers = app.config.paper_loader_writers
+
+        start_time = timeit.default_timer()
+        papers_path = app.config.papers_path
+        paper_ids = app.papers.list_papers(papers_path)
+
+        reports = collections.OrderedDict()
+        for paper_id in paper_ids:
+            reports[paper_id] = {
+                'paper_id':   paper_id,
+                'status':     "failed",
+                'parse_time': None,
+                'write_time': None,
+                'error':      None
+            }
+
+        # Parsed papers are queued up for the writers; the queue is bounded
+        # so that fast parsing doesn't pile up papers in memory.
+        write_queue = queue.Queue(maxsize=2 * writers)
+        done_count = [0]
+        done_lock = threading.Lock()
 
+        def write_papers(provider):
+            while True:
+                item = write_queue.get()
+                if item is None:
+                    break
+
+                paper, fingerprint = item
+                report = reports[paper.id]
+                paper_start = timeit.default_timer()
+                try:
+                    if provider._new_paper(paper) is False:
+                        report['status'] = "skipped"
+                        report['error'] = "Paper already exists in the " \
+                                          "database."
+                    else:
+                        report['status'] = "loaded"
+                        provider._save_paper_fingerprint(paper.id,
+                                                         fingerprint)
+                except app.exceptions.CustomError as e:
+                    # Loaded, but some contexts/events could not be created
+                    report['status'] = "partial"
+                    report['error'] = str(e)
+                    provider._save_paper_fingerprint(paper.id, fingerprint)
+                except Exception as e:
+                    provider.session.rollback()
+                    report['error'] = repr(e)
+                report['write_time'] = timeit.default_timer() - paper_start
+
+                with done_lock:
+                    done_count[0] += 1
+                    logger.info("[{}/{}] {}: {} (parse: {:.03f}s, "
+                                "write: {:.03f}s)"
+                                "".format(done_count[0], len(paper_ids),
+                                          paper.id, report['status'],
+                                          report['parse_time'],
+                                          report['write_time']))
+
+        # Each writer needs its own connection/session
+        writer_providers = [self] + [self.__class__(self.connection_string)
+                                     for _ in range(writers - 1)]
+        writer_threads = [threading.Thread(target=write_papers,
+                                           args=(provider,))
+                          for provider in writer_providers]
+
+        try:
+            with app.util.parallel_executor(workers) as executor:
+                futures = {}
+                for paper_id in paper_ids:
+                    future = executor.submit(app.papers.timed_read_paper,
+                                             paper_id, papers_path)
+                    futures[future] = paper_id
+
+                # Only start the writers once the worker processes have been
+                # forked
+                for thread in writer_threads:
+                    thread.start()
+
+                for future in concurrent.futures.as_completed(futures):
+                    report = reports[futures[future]]
+                    try:
+                        paper, fingerprint, report['parse_time'] = \
+                            future.result()
+                    except Exception as e:
+                        report['error'] = repr(e)
+                        continue
+
+                    if not paper:
+                        report['error'] = "Could not read paper directory."
+                        continue
+
+                    write_queue.put((paper, fingerprint))
+        finally:
+            # One stop marker per writer; any writer may pick up any marker
+            alive_threads = [thread for thread in writer_threads
+                             if thread.is_alive()]
+            for _ in alive_threads:
+                write_queue.put(None)
+            for thread in alive_threads:
+                thread.join()
+            for provider in writer_providers[1:]:
+                provider.shutdown()
+            app.papers.close_archives()
+
+        # Summary
+        elapsed = timeit.default_timer() - start_time
+        counts = collections.Counter(report['status']
+                                     for report in reports.values())
+        logger.info("Loaded {} of {} paper(s) in {:.03f}s ({:.02f} papers/s). "
+                    "{} loaded with errors, {} skipped, {} failed."
+                    "".format(counts["loaded"] + counts["partial"],
+                              len(reports), elapsed,
+                              len(reports) / elapsed if elapsed else 0,
+                              counts["partial"], counts["skipped"],
+                              counts["failed"]))
+        for report in reports.values():
+            if report['status'] == "failed":
+                logger.error("{}: {}".format(report['paper_id'],
+                                             report['error']))
+            elif report['status'] == "partial":
+                logger.warning("{}: {}".format(report['paper_id'],
+                                               report['error']))
+
+        return list(reports.values())
+
+    def _validate_all_papers(self, workers=None):
+        """
+        Dry run for _load_all_papers(): Checks every paper folder in
+        `papers_path` in parallel (see app.validation.validate_papers()),
+        against the grounding IDs already in the database, and returns the
+        per-paper reports.
+        Only reads from the database.
+        """
+        known_groundings = set(row[0] for row in
+                               self.session.query(Grounding.id))
+        existing_papers = set(row[0] for row in self.session.query(Paper.id))
+        # Don't hold the read transaction open while the papers are checked
+        self.session.rollback()
+
+        return app.validation.validate_papers(known_groundings,
+                                              existing_papers,
+                                              workers)
+
+    def _sync_all_papers(self):
+        """
+        Runs _sync_paper() on every paper folder in `papers_path` that does
+        not end with `paper_disabled_suffix`, and returns a Dictionary of
+        paper IDs -> results.
+        """
+        import collections
+        import timeit
+
+        start_time = timeit.default_timer()
+        results = collections.OrderedDict()
+        try:
+            for paper_id in app.papers.list_papers():
                 try:
-                    self._load_paper(directory)
+                    results[paper_id] = self._sync_paper(paper_id)
                 except Exception as e:
-                    errors.append((directory, repr(e)))
+                    self.session.rollback()
+                    logger.error("{}: {}".format(paper_id, repr(e)))
+                    results[paper_id] = "failed"
+        finally:
+            app.papers.close_archives()
+
+        counts = collections.Counter(results.values())
+        logger.info("Synced {} paper(s) in {:.03f}s: {} unchanged, {} updated, "
+                    "{} loaded, {} failed."
+                    "".format(len(results),
+                              timeit.default_timer() - start_time,
+                              counts["unchanged"], counts["updated"],
+                              counts["loaded"], counts["failed"]))
+        return results
+
+    def _sync_paper(self, paper_id):
+        """
+        Brings the given paper up to date with its directory in
+        `papers_path` without reloading it from scratch:
+        - If the paper is not in the database yet, it is loaded.
+        - If the fingerprint of its files matches the stored one, nothing
+          happens.
+        - Otherwise, only the parts backed by the changed files are
+          compared against the database, and only the rows that differ are
+          updated.  Manual events/contexts are never touched, and Reach
+          events that are still present keep their false positive flags and
+          context associations (curated associations from the TSV are only
+          ever added).
+        Returns one of 'loaded', 'unchanged', 'updated' or 'failed' (if the
+        paper was not in the database and could not be loaded).
+        """
+        import json
+
+        fingerprint = app.papers.paper_fingerprint(paper_id)
+        paper_orm = self.session.query(Paper).filter_by(id=paper_id).first()
+        if paper_orm is None:
+            if not self._load_paper(paper_id):
+                return "failed"
+            return "loaded"
+
+        stored = json.loads(paper_orm.fingerprint or "{}")
+        changed = set(file_name for file_name in fingerprint
+                      if fingerprint[file_name] != stored.get(file_name))
+        if len(changed) == 0:
+            logger.debug("Paper unchanged: {}".format(paper_id))
+            return "unchanged"
+
+        paper = self._read_paper(paper_id)
+        if not paper:
+            raise app.exceptions.CustomError(
+                "Could not read paper: {}".format(paper_id))
+
+        # Application name for audit log
+        with self._app_name("_sync_paper"):
+            try:
+                if changed & {'sentences.txt', 'titles.txt'}:
+                    self._sync_sentences(paper_orm, paper)
+                    paper_orm.title = paper.title
+                if 'sections.txt' in changed:
+                    paper_orm.sections = paper.sections
+                if 'mention_intervals.txt' in changed:
+                    self._sync_contexts(paper_orm, paper)
+                if changed & {'event_intervals.txt', paper_id + '.tsv'}:
+                    self._sync_events(paper_orm, paper)
+
+                paper_orm.fingerprint = json.dumps(fingerprint,
+                                                   sort_keys=True)
+                self.session.commit()
+                self._paper_changed(paper_id)
+            except Exception as e:
+                self.session.rollback()
+                raise e
 
-        if len(errors) > 0:
-            logger.debug("Errors encountered while loading paper. Listing:")
-            for error in errors:
-                logger.debug("{}: {}".format(error[0], error[1]))
+        logger.debug("Synced paper: {} (Changed: {})"
+                     "".format(paper_id, ", ".join(sorted(changed))))
+        return "updated"
+
+    def _sync_sentences(self, paper_orm, paper):
+        """
+        _sync_paper() helper: Updates, adds and removes sentences by line
+        number.  Does not commit.
+        """
+        new_sentences = dict((int(sentence.line_num), sentence.sentence)
+                             for sentence in paper.sentences)
+        for sentence in list(paper_orm.sentences):
+            if sentence.line_num not in new_sentences:
+                self.session.delete(sentence)
+                continue
+            text = new_sentences.pop(sentence.line_num)
+            if sentence.sentence != text:
+                sentence.sentence = text
+
+        for line_num, text in new_sentences.items():
+            self.session.add(Sentence(line_num=line_num,
+                                      sentence=text,
+                                      paper_id=paper_orm.id))
+
+    def _sync_contexts(self, paper_orm, paper):
+        """
+        _sync_paper() helper: Replaces Reach contexts that are no longer in
+        the paper's mention intervals with the ones that are new.
+        Does not commit.
+        """
+        current = {}
+        for context, grounding_id in self.session.query(
+                Context, GroundingText.grounding_id) \
+                .join(GroundingText) \
+                .filter(Context.paper == paper_orm) \
+                .filter(Context.type == "reach"):
+            key = (context.line_num, context.interval_start,
+                   context.interval_end, context.free_text, grounding_id)
+            current.setdefault(key, []).append(context)
+
+        new = set((int(context.line_num), int(context.interval_start),
+                   int(context.interval_end), context.free_text,
+                   context.grounding_id)
+                  for context in paper.contexts
+                  if context.type == "reach")
+
+        for key in set(current) - new:
+            for context in current[key]:
+                self.session.delete(context)
+
+        cache = app.grounding_cache.cache
+        for line_num, interval_start, interval_end, free_text, grounding_id \
+                in new - set(current):
+            if cache.grounding_id_for(free_text) != grounding_id:
+                self._get_one_or_create(Grounding, id=grounding_id)
+                grounding_text = self.get_grounding_text_by_text(free_text)
+                if not grounding_text:
+                    grounding_text = self._get_one_or_create(
+                        GroundingText,
+                        free_text=free_text,
+                        grounding_id=grounding_id
+                    )[0]
+                elif grounding_text.grounding_id != grounding_id:
+                    logger.error("Cannot create context: {} is already mapped "
+                                 "to {} (not {})."
+                                 "".format(free_text,
+                                           grounding_text.grounding_id,
+                                           grounding_id))
+                    continue
+                self._remember_grounding_text(free_text, grounding_id)
+
+            self.session.add(Context(line_num=line_num,
+                                     interval_start=interval_start,
+                                     interval_end=interval_end,
+                                     type="reach",
+                                     paper_id=paper_orm.id,
+                                     free_text=free_text))
+
+    def _sync_events(self, paper_orm, paper):
+        """
+        _sync_paper() helper: Replaces Reach events that are no longer in the
+        paper's event intervals with the ones that are new, and adds any
+        curated context associations that are missing.
+        Does not commit.
+        """
+        current = {}
+        for event in self.session.query(Event) \
+                .filter(Event.paper == paper_orm) \
+                .filter(Event.type == "reach"):
+            key = (event.line_num, event.interval_start, event.interval_end)
+            current.setdefault(key, []).append(event)
+
+        new = {}
+        for event in paper.events:
+            if event.type != "reach":
+                continue
+            key = (int(event.line_num), int(event.interval_start),
+                   int(event.interval_end))
+            new.setdefault(key, set()).update(grounding.id for grounding
+                                              in event.groundings)
+
+        for key in set(current) - set(new):
+            for event in current[key]:
+                event.groundings = set()
+                self.session.delete(event)
+
+        for key in set(new) - set(current):
+            event = Event(line_num=key[0],
+                          interval_start=key[1],
+                          interval_end=key[2],
+                          type="reach",
+                          paper_id=paper_orm.id)
+            self.session.add(event)
+            current[key] = [event]
+
+        for key, grounding_ids in new.items():
+            for grounding_id in grounding_ids:
+                grounding = self.session.query(Grounding) \
+                    .filter_by(id=grounding_id).first()
+                if grounding is None:
+                    logger.error("Unknown grounding ID for curated "
+                                 "association: {}".format(grounding_id))
+                    continue
+                for event in current[key]:
+                    event.groundings.add(grounding)
 
     def _delete_all_papers(self):
         """
@@ -1443,113 +2503,916 @@ class PostgresProvider(DataProvider):
         for paper in paper_list:
             self._delete_paper(paper.id)
 
-    def _load_grounding_dictionaries(self, overwrite=False):
+    def _load_grounding_dictionaries(self, overwrite=False, bulk=None,
+                                     delta=None):
         """
         Reads all the .tsv.gz dictionary files at the path specified in
         app.config.grounding_dictionaries_path, and primes the Grounding and
         GroundingText tables with their entries.
 
         If overwrite is true, we will delete existing entries on IntegrityError
+
+        If `bulk` is True (defaults to app.config.bulk_dictionary_loading),
+        the entries are loaded with _load_grounding_dictionaries_bulk();
+        should that fail, we fall back to loading them one by one with
+        _load_grounding_dictionaries_rows().
+        If `delta` is also True (defaults to
+        app.config.delta_dictionary_loading), only the entries that changed
+        since the last load are applied, with
+        _load_grounding_dictionaries_delta().
+        Returns a Dictionary with the number of grounding free texts that
+        were 'inserted', 'skipped' (already mapped to the same grounding ID,
+        or to another one without `overwrite`) and 'overwritten', and the
+        number of new 'groundings' (and the number of 'removed' free texts,
+        with `delta`).
+        """
+        if bulk is None:
+            bulk = app.config.bulk_dictionary_loading
+        if delta is None:
+            delta = app.config.delta_dictionary_loading
+
+        counts = None
+        if bulk:
+            try:
+                if delta:
+                    counts = self._load_grounding_dictionaries_delta(
+                        overwrite)
+                else:
+                    counts = self._load_grounding_dictionaries_bulk(
+                        overwrite)
+            except Exception as e:
+                logger.warning("Bulk dictionary loading failed. Falling back "
+                               "to per-row loading. ({})".format(repr(e)))
+                self.session.rollback()
+
+        try:
+            if counts is None:
+                counts = self._load_grounding_dictionaries_rows(overwrite)
+        finally:
+            # Existing free texts may have been overwritten or removed
+            if counts is None or counts['inserted'] > 0 or \
+                    counts['overwritten'] > 0 or counts['removed'] > 0:
+                self._warm_grounding_lookups()
+        return counts
+
+    @staticmethod
+    def _grounding_dictionary_files(path=None, prefixes=None):
+        """
+        Yields (path, grounding prefix) for every .gz dictionary file at
+        `path` (default: app.config.grounding_dictionaries_path), with the
+        prefixes listed in the file at `prefixes` (default:
+        app.config.grounding_dictionary_prefixes)
         """
         import csv
-        import gzip
         import os
 
+        if path is None:
+            path = app.config.grounding_dictionaries_path
+        if prefixes is None:
+            prefixes = app.config.grounding_dictionary_prefixes
+
+        # Read grounding prefixes
+        grounding_prefixes = {}
+        with open(prefixes, 'r', newline='') as fp:
+            tsv = csv.reader(fp, delimiter='\t')
+            for filename, prefix in tsv:
+                grounding_prefixes[filename] = prefix
+
+        for root, dirs, files in os.walk(path):
+            for file in files:
+                file_path = os.path.join(root, file)
+                if not file_path.endswith(".gz"):
+                    continue
+                yield file_path, grounding_prefixes[file]
+
+    @staticmethod
+    def _read_grounding_dictionary(file_path, prefix):
+        """
+        Yields (free_text, grounding_id) for every entry in the given .gz
+        dictionary file, with `prefix` added to the grounding IDs
+        (Malformed entries are skipped, and not counted anywhere)
+        """
+        import csv
+        import gzip
+
+        with gzip.open(file_path, 'rt', encoding='utf8', newline='') as fp:
+            logger.debug("Processing file: {}".format(file_path))
+            tsv = csv.reader(fp, delimiter='\t')
+            line_n = 0
+            for row in tsv:
+                line_n += 1
+                # Some dictionaries (e.g., Cellosaurus) have extra columns
+                # after the grounding ID
+                if len(row) < 2:
+                    logger.debug("Skipping malformed entry on {}:{}."
+                                 "".format(file_path, line_n))
+                    continue
+                free_text, grounding_id = row[0], row[1]
+
+                # For debugging -- En-dashes should be replaced with
+                # hyphens
+                if "\u2013" in free_text:
+                    logger.debug("En-dash on {}:{} ({})."
+                                 "".format(file_path, line_n, free_text))
+
+                # Add the appropriate prefix
+                yield free_text, "{}:{}".format(prefix, grounding_id)
+
+    @staticmethod
+    def _parse_grounding_dictionary(file_path, prefix):
+        """
+        Worker entry point: Returns the List of entries in the given
+        dictionary file (See _read_grounding_dictionary())
+        """
+        return list(PostgresProvider._read_grounding_dictionary(file_path,
+                                                                prefix))
+
+    def _iter_grounding_dictionaries(self, files=None, workers=None):
+        """
+        Yields (path, grounding prefix, List of entries) for the given
+        (path, grounding prefix) dictionary files (default: all of them; see
+        _grounding_dictionary_files()), in order.
+        The files are decompressed and parsed concurrently by a pool of
+        `workers` processes (default: app.config.dictionary_loader_workers),
+        so the caller can write the entries of one file to the database while
+        the others are still being parsed.
+        """
+        if files is None:
+            files = list(self._grounding_dictionary_files())
+        if workers is None:
+            workers = app.config.dictionary_loader_workers
+        if len(files) == 0:
+            return
+
+        with app.util.parallel_executor(workers) as executor:
+            parsed = executor.map(self._parse_grounding_dictionary,
+                                  [file_path for file_path, _ in files],
+                                  [prefix for _, prefix in files])
+            for (file_path, prefix), entries in zip(files, parsed):
+                yield file_path, prefix, entries
+
+    def _load_grounding_dictionaries_rows(self, overwrite=False):
+        """
+        Loads the grounding dictionaries one entry (and one commit) at a time
+        through the ORM.  Slow, but does not need COPY privileges on the
+        database.
+        (See _load_grounding_dictionaries())
+        """
+        import collections
+
+        counts = collections.Counter()
+
         # Set the application name for the audit log
         with self._app_name("_load_grounding_dictionaries"):
+            for _, _, entries in self._iter_grounding_dictionaries():
+                for free_text, grounding_id in entries:
+                    # Make sure the grounding ID exists
+                    grounding_get = \
+                        self._get_one_or_create(Grounding, id=grounding_id)
+                    grounding = grounding_get[0]
+                    if not grounding_get[1]:
+                        counts['groundings'] += 1
+
+                    # Then make sure the free text of the mention is mapped
+                    # to that ID (or skip it, if there is a conflict and
+                    # `overwrite` is off)
+                    result = "skipped"
+                    overwriting = False
+                    done = False
+                    while not done:
+                        try:
+                            grounding_text_get = self._get_one_or_create(
+                                GroundingText,
+                                free_text=free_text,
+                                grounding=grounding)
+                            if not grounding_text_get[1]:
+                                result = "overwritten" if overwriting \
+                                    else "inserted"
+                            done = True
+                        except app.exceptions.CustomError as e:
+                            if e.message == "DBCreateFailed":
+                                # Probably a unique key violation.
+                                # Should we overwrite the existing entry?
+                                if overwrite:
+                                    # Delete the existing free_text mention,
+                                    # and overwrite it on the next iteration
+                                    old = self.get_grounding_text_by_text(
+                                        free_text
+                                    )
+                                    logger.debug(
+                                        "Overwriting existing grounding ID "
+                                        "for {}. Was '{}', changing to '{}'."
+                                        "".format(free_text,
+                                                  old.grounding.id,
+                                                  grounding_id)
+                                    )
+                                    self.session.delete(old)
+                                    self.session.commit()
+                                    overwriting = True
+                                else:
+                                    # Skip it
+                                    done = True
+                            else:
+                                # Some other message?
+                                logger.error(repr(e))
+                                done = True
+
+                        except Exception as e:
+                            # Some other error -- Log it and let the user
+                            # deal with it
+                            logger.error(repr(e))
+                            done = True
+
+                    counts[result] += 1
+
+                    # Done
+                    self.session.commit()
+
+        return self._log_dictionary_counts(counts)
+
+    def _load_grounding_dictionaries_bulk(self, overwrite=False):
+        """
+        Loads the grounding dictionaries in a single transaction: Every file
+        is streamed into a temporary staging table with COPY (in chunks of
+        `paper_ingestion_chunk_size` entries), and the Grounding and
+        GroundingText tables are then updated with one set-based
+        INSERT ... ON CONFLICT each.
+        Entries are resolved as if they were loaded one by one, in file
+        order: Without `overwrite`, the first mapping seen for a free text
+        wins (including one already in the database); with `overwrite`, the
+        last one does.  Overwritten free texts are re-pointed at their new
+        grounding ID in place, so contexts that use them stay attached.
+        (See _load_grounding_dictionaries())
+        """
+        import collections
+        import timeit
 
-            # Read grounding prefixes
-            grounding_prefixes = {}
-            with open(app.config.grounding_dictionary_prefixes, 'r',
-                      newline='') as fp:
-                tsv = csv.reader(fp, delimiter='\t')
-                for filename, prefix in tsv:
-                    grounding_prefixes[filename] = prefix
+        start_time = timeit.default_timer()
+        counts = collections.Counter()
 
-            # Read actual dictionaries
-            path = app.config.grounding_dictionaries_path
-            for root, dirs, files in os.walk(path):
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    if not file_path.endswith(".gz"):
+        with self._app_name("_load_grounding_dictionaries_bulk"):
+            try:
+                cursor = self.session.connection().connection.cursor()
+                cursor.execute(
+                    "CREATE TEMPORARY TABLE _stage_dictionary ("
+                    "seq BIGINT, free_text TEXT, grounding_id TEXT) "
+                    "ON COMMIT DROP;"
+                )
+
+                # -- Staging
+                seq = 0
+                for _, _, entries in self._iter_grounding_dictionaries():
+                    seq = self._stage_dictionary_entries(cursor, entries,
+                                                         seq)
+
+                # -- Groundings and free texts
+                self._apply_staged_dictionary(cursor, overwrite, counts)
+                counts['skipped'] = \
+                    seq - counts['inserted'] - counts['overwritten']
+
+                self.session.commit()
+            except Exception as e:
+                logger.error(repr(e))
+                self.session.rollback()
+                raise e
+
+        logger.debug("Done loading dictionaries (Bulk, {:.03f}s)."
+                     "".format(timeit.default_timer() - start_time))
+        return self._log_dictionary_counts(counts)
+
+    def _load_grounding_dictionaries_delta(self, overwrite=False):
+        """
+        Loads only what changed in the grounding dictionaries since they were
+        last loaded, in a single transaction.
+        Files whose digest matches the one recorded in the
+        GroundingDictionary table are skipped without being parsed.  Every
+        other file is compared to the snapshot of its last load (see
+        _read_dictionary_snapshot()), and only the difference is applied:
+          - Added entries go through the same upsert as in
+            _load_grounding_dictionaries_bulk() (so `overwrite` works the same
+            way).  Files without a snapshot are loaded in full.
+          - Remapped free texts (removed with one grounding ID and added with
+            another) are re-pointed at their new ID in place, if they still
+            have their old one -- Regardless of `overwrite`, since the old
+            mapping came from the same file.
+          - Removed entries are deleted, unless contexts still use the free
+            text or another file (re-)adds it.  Files that still have the
+            free text re-add it from their snapshots, as a full load would.
+            Grounding IDs are never deleted.
+          - Files that were loaded before but are no longer there have all
+            the entries of their snapshot removed, and their
+            GroundingDictionary rows deleted.
+        (See _load_grounding_dictionaries())
+        """
+        import collections
+        import datetime
+        import os
+        import timeit
+
+        start_time = timeit.default_timer()
+        counts = collections.Counter()
+        dictionaries_path = app.config.grounding_dictionaries_path
+
+        with self._app_name("_load_grounding_dictionaries_delta"):
+            try:
+                stored = dict(self.session.query(GroundingDictionary.file_name,
+                                                 GroundingDictionary.digest))
+
+                cursor = self.session.connection().connection.cursor()
+                cursor.execute(
+                    "CREATE TEMPORARY TABLE _stage_dictionary ("
+                    "seq BIGINT, free_text TEXT, grounding_id TEXT) "
+                    "ON COMMIT DROP;"
+                    "CREATE TEMPORARY TABLE _stage_removed ("
+                    "free_text TEXT, grounding_id TEXT) ON COMMIT DROP;"
+                )
+
+                # -- Changed files
+                changed = []
+                digests = {}
+                # Digests of the files that are there, in file order
+                present = collections.OrderedDict()
+                for file_path, prefix in self._grounding_dictionary_files():
+                    file_name = os.path.relpath(file_path, dictionaries_path)
+                    digest = self._dictionary_digest(file_path, prefix)
+                    present[file_name] = digest
+                    if stored.get(file_name) == digest:
+                        counts['unchanged'] += 1
                         continue
-                    with gzip.open(file_path, 'rt', encoding='utf8',
-                                   newline='') as fp:
-                        logger.debug("Processing file: {}".format(file_path))
-                        tsv = csv.reader(fp, delimiter='\t')
-                        line_n = 0
-                        for free_text, grounding_id in tsv:
-                            line_n += 1
-                            # For debugging -- En-dashes should be replaced
-                            # with
-                            # hyphens
-                            if "\u2013" in free_text:
-                                logger.debug("En-dash on {}:{} ({})."
-                                             "".format(file_path,
-                                                       line_n,
-                                                       free_text))
-
-                            # Add the appropriate prefix
-                            grounding_id = \
-                                "{}:{}".format(grounding_prefixes[file],
-                                               grounding_id)
-
-                            # Make sure the grounding ID exists
-                            grounding_get = \
-                                self._get_one_or_create(Grounding,
-                                                        id=grounding_id)
-                            grounding = grounding_get[0]
-
-                            # Then make sure the free text of the mention is
-                            # mapped to that ID (or skip it, if there is a
-                            # conflict and `overwrite` is off)
-                            done = False
-                            while not done:
-                                try:
-                                    self._get_one_or_create(
-                                        GroundingText,
-                                        free_text=free_text,
-                                        grounding=grounding)
-                                    done = True
-                                except app.exceptions.CustomError as e:
-                                    if e.message == "DBCreateFailed":
-                                        # Probably a unique key violation.
-                                        # Should we overwrite the existing
-                                        # entry?
-                                        if overwrite:
-                                            # Delete the existing free_text
-                                            # mention, and overwrite it on
-                                            # the next iteration
-                                            old = \
-                                                self.get_grounding_text_by_text(
-                                                    free_text
-                                                )
-                                            logger.debug(
-                                                "Overwriting existing "
-                                                "grounding ID for {}. Was "
-                                                "'{}', changing to '{}'."
-                                                "".format(free_text,
-                                                          old.grounding.id,
-                                                          grounding_id)
-                                            )
-                                            self.session.delete(old)
-                                            self.session.commit()
-                                        else:
-                                            # Skip it
-                                            done = True
-                                    else:
-                                        # Some other message?
-                                        logger.error(repr(e))
-                                        done = True
-
-                                except Exception as e:
-                                    # Some other error -- Log it and let the
-                                    # user deal with it
-                                    logger.error(repr(e))
-                                    done = True
+                    changed.append((file_path, prefix))
+                    digests[file_path] = file_name, digest
+
+                # -- Staging: Differences against each file's snapshot
+                seq = 0
+                loaded = []
+                removed_texts = set()
+                for file_path, prefix, entries in \
+                        self._iter_grounding_dictionaries(changed):
+                    file_name, digest = digests[file_path]
+                    old_entries = self._read_dictionary_snapshot(
+                        stored.get(file_name))
+                    new_entries = set(entries)
+
+                    # Added entries keep their file order, so that duplicate
+                    # free texts resolve as they would in a full load
+                    seq = self._stage_dictionary_entries(
+                        cursor,
+                        (entry for entry in entries
+                         if entry not in old_entries),
+                        seq)
+                    removed = old_entries - new_entries
+                    removed_texts.update(text for text, _ in removed)
+                    self._copy_rows(cursor, "_stage_removed",
+                                    ["free_text", "grounding_id"],
+                                    sorted(removed))
+
+                    self._write_dictionary_snapshot(digest, new_entries)
+                    loaded.append((file_name, digest, len(new_entries)))
+                    logger.debug("{}: {} entries, {} removed since the last "
+                                 "load.".format(file_name, len(new_entries),
+                                                len(removed)))
+
+                # -- Staging: Files that are gone
+                gone = sorted(set(stored) - set(present))
+                for file_name in gone:
+                    removed = self._read_dictionary_snapshot(stored[file_name])
+                    if len(removed) == 0:
+                        logger.warning("No snapshot of the removed dictionary "
+                                       "file {}; its entries are kept until "
+                                       "the dictionaries are reloaded in "
+                                       "full.".format(file_name))
+                    removed_texts.update(text for text, _ in removed)
+                    self._copy_rows(cursor, "_stage_removed",
+                                    ["free_text", "grounding_id"],
+                                    sorted(removed))
+                    logger.debug("{}: Removed, with its {} entries."
+                                 "".format(file_name, len(removed)))
+
+                # -- Staging: Removed free texts that files still have (with
+                # the snapshots of changed files written above)
+                if len(removed_texts) > 0:
+                    for digest in present.values():
+                        seq = self._stage_dictionary_entries(
+                            cursor,
+                            sorted(entry for entry in
+                                   self._read_dictionary_snapshot(digest)
+                                   if entry[0] in removed_texts),
+                            seq)
+
+                # -- Remapped free texts
+                cursor.execute(
+                    "INSERT INTO {grounding} (id) "
+                    "SELECT DISTINCT grounding_id FROM _stage_dictionary "
+                    "ON CONFLICT DO NOTHING;"
+                    "".format(grounding=Grounding.__tablename__)
+                )
+                counts['groundings'] = cursor.rowcount
+                cursor.execute(
+                    "UPDATE {grounding_text} g SET grounding_id = a.grounding_id "
+                    "FROM _stage_removed r JOIN ("
+                    "SELECT DISTINCT ON (free_text) free_text, grounding_id "
+                    "FROM _stage_dictionary ORDER BY free_text, seq {order}"
+                    ") a USING (free_text) "
+                    "WHERE g.free_text = r.free_text "
+                    "AND g.grounding_id = r.grounding_id "
+                    "AND a.grounding_id <> r.grounding_id;"
+                    "".format(grounding_text=GroundingText.__tablename__,
+                              order="DESC" if overwrite else "ASC")
+                )
+                remapped = cursor.rowcount
+
+                # -- Added entries
+                self._apply_staged_dictionary(cursor, overwrite, counts)
+                counts['skipped'] = seq - counts['inserted'] - \
+                    counts['overwritten'] - remapped
+                counts['overwritten'] += remapped
+
+                # -- Removed entries
+                cursor.execute(
+                    "DELETE FROM {grounding_text} g USING _stage_removed r "
+                    "WHERE g.free_text = r.free_text "
+                    "AND g.grounding_id = r.grounding_id "
+                    "AND NOT EXISTS (SELECT 1 FROM _stage_dictionary a "
+                    "WHERE a.free_text = g.free_text) "
+                    "AND NOT EXISTS (SELECT 1 FROM {context} c "
+                    "WHERE c.free_text = g.free_text);"
+                    "".format(grounding_text=GroundingText.__tablename__,
+                              context=Context.__tablename__)
+                )
+                counts['removed'] = cursor.rowcount
+
+                # -- Digests
+                now = datetime.datetime.now(datetime.timezone.utc)
+                for file_name, digest, entry_count in loaded:
+                    self.session.merge(GroundingDictionary(
+                        file_name=file_name, digest=digest,
+                        entries=entry_count, loaded=now))
+                if len(gone) > 0:
+                    self.session.query(GroundingDictionary) \
+                        .filter(GroundingDictionary.file_name.in_(gone)) \
+                        .delete(synchronize_session=False)
+
+                self.session.commit()
+            except Exception as e:
+                logger.error(repr(e))
+                self.session.rollback()
+                raise e
+
+        self._delete_stale_dictionary_snapshots()
+        logger.debug("Done loading dictionaries (Delta, {:.03f}s): {} "
+                     "file(s) changed, {} unchanged, {} removed."
+                     "".format(timeit.default_timer() - start_time,
+                               len(loaded), counts['unchanged'], len(gone)))
+        return self._log_dictionary_counts(counts)
+
+    def _load_grounding_dictionaries_shadow(self, path=None, prefixes=None,
+                                            overwrite=False):
+        """
+        Loads a complete set of grounding dictionaries into shadow copies of
+        the Grounding, GroundingText and GroundingDictionary tables (named
+        with a `_shadow` suffix), without writing to the live tables, so that
+        annotators can keep working while it runs.
+        `path` and `prefixes` select the dictionary set (See
+        _grounding_dictionary_files()), and entries are resolved as in
+        _load_grounding_dictionaries_bulk().  The free texts that contexts
+        use and the grounding IDs that events use are carried over from the
+        live tables, unless the new set maps them itself.
+        Use _swap_grounding_tables() to put the shadow tables live.
+        Returns the counts, as _load_grounding_dictionaries() does.
+        """
+        import collections
+        import datetime
+        import os
+        import timeit
+
+        from app.providers.postgresql_schema import db_schema
+
+        start_time = timeit.default_timer()
+        counts = collections.Counter()
+        suffix = "_shadow"
+        if path is None:
+            path = app.config.grounding_dictionaries_path
+
+        with self._app_name("_load_grounding_dictionaries_shadow"):
+            try:
+                cursor = self.session.connection().connection.cursor()
+                self._drop_grounding_tables(cursor, suffix)
+                cursor.execute(
+                    db_schema["grounding_table_copies"].format(suffix=suffix))
+                cursor.execute(
+                    "CREATE TEMPORARY TABLE _stage_dictionary ("
+                    "seq BIGINT, free_text TEXT, grounding_id TEXT) "
+                    "ON COMMIT DROP;"
+                )
+
+                # -- Staging
+                seq = 0
+                loaded = []
+                files = list(self._grounding_dictionary_files(path, prefixes))
+                for file_path, prefix, entries in \
+                        self._iter_grounding_dictionaries(files):
+                    seq = self._stage_dictionary_entries(cursor, entries,
+                                                         seq)
+                    # Snapshots for later delta loads of this set
+                    digest = self._dictionary_digest(file_path, prefix)
+                    entries = set(entries)
+                    self._write_dictionary_snapshot(digest, entries)
+                    loaded.append((os.path.relpath(file_path, path), digest,
+                                   len(entries)))
+
+                # -- Groundings and free texts
+                self._apply_staged_dictionary(cursor, overwrite, counts,
+                                              suffix)
+                counts['skipped'] = \
+                    seq - counts['inserted'] - counts['overwritten']
+                carried = self._carry_over_groundings(cursor, suffix)
+
+                # -- Digests
+                now = datetime.datetime.now(datetime.timezone.utc)
+                cursor.executemany(
+                    "INSERT INTO {} (file_name, digest, entries, loaded) "
+                    "VALUES (%s, %s, %s, %s);"
+                    "".format(GroundingDictionary.__tablename__ + suffix),
+                    [row + (now,) for row in loaded])
+
+                self._copy_grounding_table_access(cursor, suffix)
+                self.session.commit()
+            except Exception as e:
+                logger.error(repr(e))
+                self.session.rollback()
+                raise e
+
+        logger.debug("Done loading dictionaries (Shadow, {:.03f}s): {} "
+                     "file(s) from {}; {} free text(s) in use carried over."
+                     "".format(timeit.default_timer() - start_time,
+                               len(loaded), path, carried))
+        return self._log_dictionary_counts(counts)
+
+    def _swap_grounding_tables(self, rollback=False):
+        """
+        Puts the shadow tables loaded by _load_grounding_dictionaries_shadow()
+        live, and keeps the replaced tables as the previous dictionary set
+        (with a `_previous` suffix; any older one is dropped).
+        With `rollback`, the live tables are swapped with the previous set
+        instead (so rolling back twice restores the current set).
+        Free texts and grounding IDs that came into use since the incoming
+        set was loaded are carried over to it, contexts whose free texts are
+        grounded differently in it get a new paper version, and the foreign
+        keys of the Context and event_grounding tables are re-pointed at the
+        incoming tables -- All in one transaction that only renames tables
+        (and touches the remapped contexts), and that
+        gives up without changing anything if it cannot lock them within
+        app.config.grounding_swap_lock_timeout seconds.
+        Other server processes keep using their in-memory grounding lookups
+        until they are restarted.
+        Returns True if the tables were swapped.
+        """
+        import timeit
+
+        from app.providers.postgresql_schema import db_schema
+
+        start_time = timeit.default_timer()
+
+        incoming = "_previous" if rollback else "_shadow"
+        live = [table for table, _, _ in self._grounding_table_set()]
 
-                            # Done
-                            self.session.commit()
+        with self._app_name("_swap_grounding_tables"):
+            try:
+                cursor = self.session.connection().connection.cursor()
+                for table in live:
+                    cursor.execute("SELECT to_regclass(%s);",
+                                   (table + incoming,))
+                    if cursor.fetchone()[0] is None:
+                        logger.error("There is no {} table to swap in."
+                                     "".format(table + incoming))
+                        self.session.rollback()
+                        return False
+
+                lock_time = timeit.default_timer()
+                cursor.execute("SET LOCAL lock_timeout = %s;", (
+                    "{}s".format(app.config.grounding_swap_lock_timeout),))
+                locked = live + [table + incoming for table in live] + [
+                    Context.__tablename__, SQLAlchemyORM.event_grounding.name]
+                cursor.execute("LOCK TABLE {} IN ACCESS EXCLUSIVE MODE;"
+                               "".format(", ".join(locked)))
+
+                carried = self._carry_over_groundings(cursor, incoming)
+
+                # Clients need the new grounding IDs of remapped contexts
+                cursor.execute(
+                    "UPDATE {context} c SET version = c.version "
+                    "FROM {grounding_text} g, {grounding_text}{incoming} n "
+                    "WHERE g.free_text = c.free_text "
+                    "AND n.free_text = g.free_text "
+                    "AND n.grounding_id <> g.grounding_id;"
+                    "".format(context=Context.__tablename__,
+                              grounding_text=GroundingText.__tablename__,
+                              incoming=incoming))
+                remapped = cursor.rowcount
+
+                # Foreign keys that other tables have on the live tables
+                cursor.execute(
+                    "SELECT conrelid::regclass::text, conname, "
+                    "pg_get_constraintdef(oid) FROM pg_constraint "
+                    "WHERE contype = 'f' "
+                    "AND confrelid = ANY(%s::regclass[]) "
+                    "AND conrelid <> ALL(%s::regclass[]);",
+                    (live, live))
+                foreign_keys = cursor.fetchall()
+                for table, name, _ in foreign_keys:
+                    cursor.execute("ALTER TABLE {} DROP CONSTRAINT {};"
+                                   "".format(table, name))
+
+                if not rollback:
+                    self._drop_grounding_tables(cursor, "_previous")
+                self._rename_grounding_tables(cursor, "", "_outgoing")
+                self._rename_grounding_tables(cursor, incoming, "")
+                self._rename_grounding_tables(cursor, "_outgoing", "_previous")
+                cursor.execute(db_schema["remap_trigger"])
+
+                # The incoming tables hold every referenced row, so the keys
+                # can be added without checking them under the locks...
+                for table, name, definition in foreign_keys:
+                    cursor.execute("ALTER TABLE {} ADD CONSTRAINT {} {} "
+                                   "NOT VALID;".format(table, name,
+                                                       definition))
+                self.session.commit()
+                lock_time = timeit.default_timer() - lock_time
+            except Exception as e:
+                logger.error(repr(e))
+                self.session.rollback()
+                return False
+
+            # ... and are checked afterwards, without blocking writes
+            for table, name, _ in foreign_keys:
+                self.execute_literal("ALTER TABLE {} VALIDATE CONSTRAINT {};"
+                                     "".format(table, name))
+
+        self._warm_grounding_lookups()
+        logger.info("Swapped in the {} grounding dictionaries ({} free "
+                    "text(s) in use carried over, {} context(s) remapped) in "
+                    "{:.03f}s; the tables were locked for {:.03f}s."
+                    "".format("previous" if rollback else "shadow", carried,
+                              remapped, timeit.default_timer() - start_time,
+                              lock_time))
+        return True
+
+    @staticmethod
+    def _grounding_table_set():
+        """
+        (table, constraint names, index names) for every table in a set of
+        grounding dictionaries, in the order they are created.  Constraint
+        and index names are all prefixed with the table name.
+        """
+        return [
+            (Grounding.__tablename__, ["pkey"], []),
+            (GroundingText.__tablename__, ["pkey", "grounding_id_fkey"],
+             ["grounding_id_idx"]),
+            (GroundingDictionary.__tablename__, ["pkey"], [])
+        ]
+
+    def _rename_grounding_tables(self, cursor, old_suffix, new_suffix):
+        for table, constraints, indexes in self._grounding_table_set():
+            old_name = table + old_suffix
+            new_name = table + new_suffix
+            cursor.execute("ALTER TABLE {} RENAME TO {};"
+                           "".format(old_name, new_name))
+            for constraint in constraints:
+                cursor.execute(
+                    "ALTER TABLE {new_name} RENAME CONSTRAINT "
+                    "{old_name}_{constraint} TO {new_name}_{constraint};"
+                    "".format(new_name=new_name, old_name=old_name,
+                              constraint=constraint))
+            for index in indexes:
+                cursor.execute(
+                    "ALTER INDEX {old_name}_{index} RENAME TO "
+                    "{new_name}_{index};"
+                    "".format(new_name=new_name, old_name=old_name,
+                              index=index))
+
+    def _drop_grounding_tables(self, cursor, suffix):
+        assert suffix, "Refusing to drop the live grounding tables"
+        cursor.execute("DROP TABLE IF EXISTS {};".format(", ".join(
+            table + suffix
+            for table, _, _ in reversed(self._grounding_table_set()))))
+
+    @staticmethod
+    def _carry_over_groundings(cursor, suffix):
+        """
+        Copies the free texts that contexts use, and the grounding IDs that
+        they and events use, from the live grounding tables into the copies
+        with the given suffix, where those do not have them yet.
+        Returns the number of free texts copied.
+        """
+        names = {
+            'grounding':      Grounding.__tablename__,
+            'grounding_text': GroundingText.__tablename__,
+            'context':        Context.__tablename__,
+            'association':    SQLAlchemyORM.event_grounding.name,
+            'suffix':         suffix
+        }
+        cursor.execute(
+            ("CREATE TEMPORARY TABLE _carried_texts ON COMMIT DROP AS "
+             "SELECT t.free_text, t.grounding_id FROM {grounding_text} t "
+             "WHERE EXISTS (SELECT 1 FROM {context} c "
+             "WHERE c.free_text = t.free_text) "
+             "AND NOT EXISTS (SELECT 1 FROM {grounding_text}{suffix} n "
+             "WHERE n.free_text = t.free_text);"
+             "INSERT INTO {grounding}{suffix} (id) "
+             "SELECT grounding_id FROM _carried_texts "
+             "UNION SELECT grounding_id FROM {association} "
+             "ON CONFLICT DO NOTHING;"
+             "INSERT INTO {grounding_text}{suffix} (free_text, grounding_id) "
+             "SELECT free_text, grounding_id FROM _carried_texts;"
+             ).format(**names)
+        )
+        carried = cursor.rowcount
+        cursor.execute("DROP TABLE _carried_texts;")
+        return carried
+
+    @staticmethod
+    def _copy_grounding_table_access(cursor, suffix):
+        """
+        Gives the copies of the grounding tables with the given suffix the
+        same audit triggers as the live tables, and grants the app login
+        role access to them
+        """
+        login = app.config.db_vars["postgres_login"]
+        cursor.execute("SELECT 1 FROM pg_roles WHERE rolname = %s;",
+                       (login,))
+        grant = cursor.fetchone() is not None
+
+        for table, _, _ in PostgresProvider._grounding_table_set():
+            cursor.execute(
+                "SELECT 1 FROM pg_trigger WHERE tgrelid = %s::regclass "
+                "AND tgname = 'audit_trigger_row';", (table,))
+            if cursor.fetchone() is not None:
+                cursor.execute("SELECT audit.audit_table(%s::regclass);",
+                               (table + suffix,))
+            if grant:
+                cursor.execute("GRANT ALL ON {} TO {};"
+                               "".format(table + suffix, login))
+
+    def _stage_dictionary_entries(self, cursor, entries, seq):
+        """
+        Bulk dictionary loader helper: COPYs (free_text, grounding_id)
+        entries into the `_stage_dictionary` table in chunks, numbering them
+        from `seq`.  Returns the next number.
+        """
+        chunk_size = app.config.paper_ingestion_chunk_size
+        columns = ["seq", "free_text", "grounding_id"]
+        chunk = []
+        for free_text, grounding_id in entries:
+            chunk.append((seq, free_text, grounding_id))
+            seq += 1
+            if len(chunk) >= chunk_size:
+                self._copy_rows(cursor, "_stage_dictionary", columns, chunk)
+                del chunk[:]
+        if len(chunk) > 0:
+            self._copy_rows(cursor, "_stage_dictionary", columns, chunk)
+        return seq
+
+    @staticmethod
+    def _apply_staged_dictionary(cursor, overwrite, counts, suffix=""):
+        """
+        Bulk dictionary loader helper: Creates the grounding IDs and upserts
+        the free texts in `_stage_dictionary`, adding the number of new
+        'groundings' and of 'inserted'/'overwritten' free texts to `counts`.
+        `suffix` selects a copy of the tables (See
+        _load_grounding_dictionaries_shadow()).
+        """
+        # -- Groundings
+        cursor.execute(
+            "INSERT INTO {grounding} (id) "
+            "SELECT DISTINCT grounding_id FROM _stage_dictionary "
+            "ON CONFLICT DO NOTHING;"
+            "".format(grounding=Grounding.__tablename__ + suffix)
+        )
+        counts['groundings'] += cursor.rowcount
+
+        # -- Free texts
+        # (xmax is only set on rows that were updated rather than inserted)
+        if overwrite:
+            order = "DESC"
+            conflict = "DO UPDATE SET grounding_id = EXCLUDED.grounding_id " \
+                       "WHERE {grounding_text}.grounding_id <> " \
+                       "EXCLUDED.grounding_id"
+        else:
+            order = "ASC"
+            conflict = "DO NOTHING"
+        cursor.execute(
+            ("WITH upsert AS ("
+             "INSERT INTO {grounding_text} (free_text, grounding_id) "
+             "SELECT DISTINCT ON (free_text) free_text, grounding_id "
+             "FROM _stage_dictionary ORDER BY free_text, seq " + order + " "
+             "ON CONFLICT (free_text) " + conflict + " "
+             "RETURNING xmax = 0 AS inserted) "
+             "SELECT count(*) FILTER (WHERE inserted), "
+             "count(*) FILTER (WHERE NOT inserted) FROM upsert;")
+            .format(grounding_text=GroundingText.__tablename__ + suffix)
+        )
+        inserted, overwritten = cursor.fetchone()
+        counts['inserted'] += inserted
+        counts['overwritten'] += overwritten
+
+    @staticmethod
+    def _dictionary_digest(file_path, prefix):
+        """
+        SHA-1 digest of a dictionary file and the grounding prefix it is
+        loaded with
+        """
+        import hashlib
+
+        digest = hashlib.sha1(prefix.encode('utf8') + b"\0")
+        with open(file_path, 'rb') as fp:
+            for block in iter(lambda: fp.read(1 << 20), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    @staticmethod
+    def _read_dictionary_snapshot(digest):
+        """
+        Returns the Set of (free_text, grounding_id) entries that were loaded
+        from the dictionary file with the given digest, or an empty Set if
+        there is no snapshot for it
+        """
+        import csv
+        import gzip
+        import os
+
+        if digest is None:
+            return set()
+        snapshot_path = os.path.join(app.config.grounding_snapshot_path,
+                                     digest + ".tsv.gz")
+        if not os.path.isfile(snapshot_path):
+            logger.debug("No dictionary snapshot for digest {}; the file "
+                         "will be loaded in full.".format(digest))
+            return set()
+        with gzip.open(snapshot_path, 'rt', encoding='utf8',
+                       newline='') as fp:
+            return set((row[0], row[1])
+                       for row in csv.reader(fp, delimiter='\t'))
+
+    @staticmethod
+    def _write_dictionary_snapshot(digest, entries):
+        """
+        Saves the (sorted) entries loaded from the dictionary file with the
+        given digest, for the next _load_grounding_dictionaries_delta()
+        """
+        import csv
+        import gzip
+        import os
+
+        os.makedirs(app.config.grounding_snapshot_path, exist_ok=True)
+        snapshot_path = os.path.join(app.config.grounding_snapshot_path,
+                                     digest + ".tsv.gz")
+        temp_path = snapshot_path + ".tmp"
+        with gzip.open(temp_path, 'wt', encoding='utf8', newline='') as fp:
+            csv.writer(fp, delimiter='\t').writerows(sorted(entries))
+        os.replace(temp_path, snapshot_path)
+
+    def _delete_stale_dictionary_snapshots(self):
+        """
+        Deletes the snapshots of dictionary file versions that are no longer
+        recorded in the GroundingDictionary table (or its shadow/previous
+        copies; see _swap_grounding_tables())
+        """
+        import os
+
+        path = app.config.grounding_snapshot_path
+        if not os.path.isdir(path):
+            return
+        current = set(digest for digest, in
+                      self.session.query(GroundingDictionary.digest))
+        # ... or in the shadow/previous dictionary sets
+        for suffix in ["_shadow", "_previous"]:
+            table = GroundingDictionary.__tablename__ + suffix
+            if self.execute_literal("SELECT to_regclass('{}');"
+                                    "".format(table))[0][0] is not None:
+                current.update(digest for digest, in self.execute_literal(
+                    "SELECT digest FROM {};".format(table)))
+        for file_name in os.listdir(path):
+            if file_name.endswith(".tsv.gz") and \
+                    file_name[:-len(".tsv.gz")] not in current:
+                os.remove(os.path.join(path, file_name))
+
+    @staticmethod
+    def _log_dictionary_counts(counts):
+        """
+        _load_grounding_dictionaries() helper: Logs and returns the counts
+        """
+        counts = {
+            'inserted':    counts['inserted'],
+            'skipped':     counts['skipped'],
+            'overwritten': counts['overwritten'],
+            'removed':     counts['removed'],
+            'groundings':  counts['groundings']
+        }
+        logger.info("Loaded grounding dictionaries: {inserted} free text(s) "
+                    "inserted, {skipped} skipped, {overwritten} overwritten, "
+                    "{removed} removed; {groundings} new grounding ID(s)."
+                    "".format(**counts))
+        return counts
 
     def _delete_unreferenced_grounding_texts(self):
         """
@@ -1569,6 +3432,7 @@ class PostgresProvider(DataProvider):
             logger.debug("Removing unreferenced GroundingText: {}"
                          "".format(grounding_text.free_text))
             self.session.delete(grounding_text)
+            self._forget_grounding_text(grounding_text.free_text)
 
         self.session.commit()
 
@@ -1594,6 +3458,7 @@ class PostgresProvider(DataProvider):
             logger.debug("Removing unreferenced Grounding: {}"
                          "".format(grounding.id))
             self.session.delete(grounding)
+            app.grounding_cache.cache.discard_grounding(grounding.id)
 
         self.session.commit()
 
@@ -1629,6 +3494,8 @@ class PostgresProvider(DataProvider):
                 logger.debug("Changing grounding ID for text: {}"
                              "".format(grounding_text.free_text))
                 grounding_text.grounding = new_grounding
+                self._remember_grounding_text(grounding_text.free_text,
+                                              new_grounding.id)
 
             # Transfer Events
             logger.debug("Changing events for groundings: {} -> {}"
@@ -1643,6 +3510,8 @@ class PostgresProvider(DataProvider):
             assert (len(old_grounding.events) == 0)
 
             self.session.commit()
+            # Any paper may have referred to the old grounding
+            app.paper_cache.cache.clear()
 
     @staticmethod
     def _fix_encoding(string):
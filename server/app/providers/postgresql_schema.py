@@ -22,8 +22,16 @@ CREATE TABLE {paper_table}
         locked BOOLEAN,
         annotation_pass INTEGER,
         last_modified TIMESTAMP WITH TIME ZONE,
+        fingerprint TEXT,
+        signature TEXT,
+        version BIGINT NOT NULL DEFAULT 0,
+        version_txid BIGINT,
+        text_version BIGINT NOT NULL DEFAULT 0,
         PRIMARY KEY (id)
 );
+-- Paper versions are drawn from one sequence, so that a paper that is deleted
+-- and loaded again never repeats a version of its earlier self
+CREATE SEQUENCE {paper_table}_version_seq;
 """.format(**db_vars)
 
 db_schema["sentence_table"] = """
@@ -36,6 +44,7 @@ CREATE TABLE {sentence_table}
         PRIMARY KEY (id),
         FOREIGN KEY(paper_id) REFERENCES {paper_table} (id)
 );
+CREATE INDEX {sentence_table}_paper_id_line_num_idx ON {sentence_table} (paper_id, line_num);
 """.format(**db_vars)
 
 db_schema["context_table"] = """
@@ -48,11 +57,13 @@ CREATE TABLE {context_table}
         type TEXT,
         paper_id TEXT,
         free_text TEXT,
+        version BIGINT,
         PRIMARY KEY (id),
         FOREIGN KEY(paper_id) REFERENCES {paper_table} (id),
         FOREIGN KEY(free_text) REFERENCES {grounding_text_table} (free_text)
 );
 CREATE INDEX {context_table}_free_text_idx ON {context_table} (free_text);
+CREATE INDEX {context_table}_paper_id_line_num_idx ON {context_table} (paper_id, line_num);
 """.format(**db_vars)
 
 db_schema["event_table"] = """
@@ -65,9 +76,11 @@ CREATE TABLE {event_table}
         type TEXT,
         paper_id TEXT,
         false_positive BOOLEAN,
+        version BIGINT,
         PRIMARY KEY (id),
         FOREIGN KEY(paper_id) REFERENCES {paper_table} (id)
 );
+CREATE INDEX {event_table}_paper_id_line_num_idx ON {event_table} (paper_id, line_num);
 """.format(**db_vars)
 
 db_schema["grounding_table"] = """
@@ -89,12 +102,24 @@ CREATE TABLE {grounding_text_table}
 CREATE INDEX {grounding_text_table}_grounding_id_idx ON {grounding_text_table} (grounding_id);
 """.format(**db_vars)
 
+db_schema["dictionary_table"] = """
+CREATE TABLE {dictionary_table}
+(
+        file_name TEXT NOT NULL,
+        digest TEXT NOT NULL,
+        entries INTEGER,
+        loaded TIMESTAMP WITH TIME ZONE,
+        PRIMARY KEY (file_name)
+);
+""".format(**db_vars)
+
 db_schema["comment_table"] = """
 CREATE TABLE {comment_table}
 (
         id SERIAL NOT NULL,
         comment TEXT,
         paper_id TEXT,
+        version BIGINT,
         PRIMARY KEY (id),
         FOREIGN KEY(paper_id) REFERENCES {paper_table} (id)
 );
@@ -111,6 +136,89 @@ CREATE TABLE {association_table}
 );
 """.format(**db_vars)
 
+# Contexts, events and comments deleted from each paper, with the paper version
+# that they were deleted in (See update_paper_modified())
+db_schema["deletion_table"] = """
+CREATE TABLE {deletion_table}
+(
+        paper_id TEXT NOT NULL,
+        table_name TEXT NOT NULL,
+        row_id INTEGER NOT NULL,
+        version BIGINT NOT NULL
+);
+CREATE INDEX {deletion_table}_paper_id_version_idx ON {deletion_table} (paper_id, version);
+""".format(**db_vars)
+
+# Copies of the grounding dictionary tables that a complete set of dictionaries
+# is loaded into before being swapped in (`suffix` is appended to every name).
+# Constraints and indexes follow PostgreSQL's default names for the originals,
+# so that the copies can be renamed into their place.
+db_schema["grounding_table_copies"] = """
+CREATE TABLE {grounding_table}{{suffix}}
+(
+        id TEXT NOT NULL,
+        CONSTRAINT {grounding_table}{{suffix}}_pkey PRIMARY KEY (id)
+);
+CREATE TABLE {grounding_text_table}{{suffix}}
+(
+        free_text TEXT NOT NULL,
+        grounding_id TEXT NOT NULL,
+        CONSTRAINT {grounding_text_table}{{suffix}}_pkey PRIMARY KEY (free_text),
+        CONSTRAINT {grounding_text_table}{{suffix}}_grounding_id_fkey
+                FOREIGN KEY(grounding_id) REFERENCES {grounding_table}{{suffix}} (id)
+);
+CREATE INDEX {grounding_text_table}{{suffix}}_grounding_id_idx ON {grounding_text_table}{{suffix}} (grounding_id);
+CREATE TABLE {dictionary_table}{{suffix}}
+(
+        file_name TEXT NOT NULL,
+        digest TEXT NOT NULL,
+        entries INTEGER,
+        loaded TIMESTAMP WITH TIME ZONE,
+        CONSTRAINT {dictionary_table}{{suffix}}_pkey PRIMARY KEY (file_name)
+);
+""".format(**db_vars)
+
+# Brings the tables of databases created with an earlier version of this
+# schema up to date.  (Every statement must be safe to re-run.)
+db_schema["upgrades"] = """
+ALTER TABLE {paper_table} ADD COLUMN IF NOT EXISTS fingerprint TEXT;
+ALTER TABLE {paper_table} ADD COLUMN IF NOT EXISTS signature TEXT;
+CREATE TABLE IF NOT EXISTS {dictionary_table}
+(
+        file_name TEXT NOT NULL,
+        digest TEXT NOT NULL,
+        entries INTEGER,
+        loaded TIMESTAMP WITH TIME ZONE,
+        PRIMARY KEY (file_name)
+);
+ALTER TABLE {paper_table} ADD COLUMN IF NOT EXISTS version BIGINT NOT NULL DEFAULT 0;
+ALTER TABLE {paper_table} ADD COLUMN IF NOT EXISTS version_txid BIGINT;
+ALTER TABLE {paper_table} ADD COLUMN IF NOT EXISTS text_version BIGINT NOT NULL DEFAULT 0;
+CREATE SEQUENCE IF NOT EXISTS {paper_table}_version_seq;
+ALTER TABLE {context_table} ADD COLUMN IF NOT EXISTS version BIGINT;
+ALTER TABLE {event_table} ADD COLUMN IF NOT EXISTS version BIGINT;
+ALTER TABLE {comment_table} ADD COLUMN IF NOT EXISTS version BIGINT;
+CREATE TABLE IF NOT EXISTS {deletion_table}
+(
+        paper_id TEXT NOT NULL,
+        table_name TEXT NOT NULL,
+        row_id INTEGER NOT NULL,
+        version BIGINT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS {deletion_table}_paper_id_version_idx ON {deletion_table} (paper_id, version);
+CREATE INDEX IF NOT EXISTS {sentence_table}_paper_id_line_num_idx ON {sentence_table} (paper_id, line_num);
+CREATE INDEX IF NOT EXISTS {context_table}_paper_id_line_num_idx ON {context_table} (paper_id, line_num);
+CREATE INDEX IF NOT EXISTS {event_table}_paper_id_line_num_idx ON {event_table} (paper_id, line_num);
+DO $$
+BEGIN
+  IF EXISTS (SELECT 1 FROM pg_catalog.pg_roles
+             WHERE rolname = '{postgres_login}') THEN
+    GRANT ALL ON {deletion_table} TO {postgres_login};
+    GRANT USAGE, SELECT ON {paper_table}_version_seq TO {postgres_login};
+  END IF;
+END$$;
+""".format(**db_vars)
+
 # Audit log triggers
 # https://github.com/2ndQuadrant/audit-trigger/
 db_schema["hstore_setup"] = """
@@ -403,48 +511,148 @@ GRANT USAGE, SELECT ON ALL SEQUENCES IN SCHEMA audit TO {postgres_login};
 """.format(**db_vars)
 
 # Last modified trigger
+# Every transaction that changes a paper (or its sentences, contexts, events,
+# comments or event groundings) also gives it a new version number; changed
+# contexts, events and comments are stamped with it, and deleted ones are
+# recorded in the deletion table, so that clients can be sent only what has
+# changed since the version they already have.
 # noinspection SqlNoDataSourceInspection
 db_schema["modified_setup"] = """
+CREATE OR REPLACE FUNCTION bump_paper_version(target_paper_id TEXT)
+RETURNS BIGINT AS $$
+DECLARE
+  new_version BIGINT;
+BEGIN
+  -- Only the first change in each transaction needs to touch the paper; the
+  -- version is then remembered (until the end of the transaction), since
+  -- bulk inserts/deletes change many rows of the same paper in a row
+  IF current_setting('paper_version.paper_id', true) = target_paper_id THEN
+    RETURN current_setting('paper_version.version')::BIGINT;
+  END IF;
+
+  UPDATE {paper_table}
+  SET version = nextval('{paper_table}_version_seq'),
+      version_txid = txid_current(),
+      last_modified = now()
+  WHERE id = target_paper_id AND version_txid IS DISTINCT FROM txid_current()
+  RETURNING version INTO new_version;
+  IF NOT FOUND THEN
+    SELECT version INTO new_version FROM {paper_table}
+    WHERE id = target_paper_id;
+  END IF;
+  PERFORM set_config('paper_version.paper_id', target_paper_id, true);
+  PERFORM set_config('paper_version.version', new_version::TEXT, true);
+  RETURN new_version;
+END;
+$$ LANGUAGE 'plpgsql';
+
 CREATE OR REPLACE FUNCTION update_paper_modified()
 RETURNS TRIGGER AS $$
+<<modified>>
 DECLARE
   paper_id TEXT;
-  return_val RECORD;
+  row_version BIGINT;
 BEGIN
   -- Pick up a valid paper_id based on the operation performed
   IF (TG_OP = 'DELETE') THEN
     paper_id = OLD.paper_id;
-    return_val = OLD;
   ELSE
     paper_id = NEW.paper_id;
-    return_val = NEW;
   END IF;
 
-  UPDATE {paper_table} SET last_modified = now() WHERE id = paper_id;
-  RETURN return_val;
+  row_version := bump_paper_version(paper_id);
+  IF (TG_TABLE_NAME = '{sentence_table}') THEN
+    -- Clients need the whole paper again after its text changes
+    IF current_setting('paper_version.text_changed', true)
+        IS DISTINCT FROM paper_id || ' ' || row_version THEN
+      UPDATE {paper_table} SET text_version = row_version
+      WHERE id = paper_id AND text_version IS DISTINCT FROM row_version;
+      PERFORM set_config('paper_version.text_changed',
+                         paper_id || ' ' || row_version, true);
+      -- ...so the paper's deletion records can no longer be asked for
+      DELETE FROM {deletion_table} t
+      WHERE t.paper_id = modified.paper_id
+        AND t.version <= row_version;
+    END IF;
+  ELSIF (TG_OP = 'DELETE') THEN
+    -- (Not needed once the paper's text has changed in this transaction)
+    IF current_setting('paper_version.text_changed', true)
+        IS DISTINCT FROM paper_id || ' ' || row_version THEN
+      INSERT INTO {deletion_table} (paper_id, table_name, row_id, version)
+      VALUES (paper_id, TG_TABLE_NAME, OLD.id, row_version);
+    END IF;
+  ELSE
+    NEW.version := row_version;
+  END IF;
+
+  IF (TG_OP = 'DELETE') THEN
+    RETURN OLD;
+  END IF;
+  RETURN NEW;
 END;
 $$ LANGUAGE 'plpgsql';
 
 CREATE OR REPLACE FUNCTION update_paper_modified_associations()
 RETURNS TRIGGER AS $$
 DECLARE
+  target_event_id INTEGER;
   paper_id TEXT;
-  return_val RECORD;
+  row_version BIGINT;
 BEGIN
   -- Modified version of the trigger for event-grounding associations
   IF (TG_OP = 'DELETE') THEN
-    paper_id := (SELECT t.paper_id FROM {event_table} t WHERE t.id = OLD.event_id);
-    return_val = OLD;
+    target_event_id = OLD.event_id;
   ELSE
-    paper_id := (SELECT t.paper_id FROM {event_table} t WHERE t.id = NEW.event_id);
-    return_val = NEW;
+    target_event_id = NEW.event_id;
+  END IF;
+  paper_id := (SELECT t.paper_id FROM {event_table} t
+               WHERE t.id = target_event_id);
+
+  -- The event's groundings are part of the event, so it gets the new version
+  row_version := bump_paper_version(paper_id);
+  UPDATE {event_table} SET version = row_version
+  WHERE id = target_event_id AND version IS DISTINCT FROM row_version;
+
+  IF (TG_OP = 'DELETE') THEN
+    RETURN OLD;
   END IF;
+  RETURN NEW;
+END;
+$$ LANGUAGE 'plpgsql';
 
-  UPDATE {paper_table} SET last_modified = now() WHERE id = paper_id;
-  RETURN return_val;
+CREATE OR REPLACE FUNCTION update_paper_version()
+RETURNS TRIGGER AS $$
+BEGIN
+  -- The paper's own fields that clients show (but not last_modified, which
+  -- only follows its annotations)
+  IF ((NEW.title, NEW.sections, NEW.locked, NEW.annotation_pass)
+      IS DISTINCT FROM
+      (OLD.title, OLD.sections, OLD.locked, OLD.annotation_pass))
+      AND NEW.version_txid IS DISTINCT FROM txid_current() THEN
+    NEW.version := nextval('{paper_table}_version_seq');
+    NEW.version_txid := txid_current();
+  END IF;
+  RETURN NEW;
+END;
+$$ LANGUAGE 'plpgsql';
+
+CREATE OR REPLACE FUNCTION update_remapped_contexts()
+RETURNS TRIGGER AS $$
+BEGIN
+  -- Contexts whose free text now has a different grounding ID have changed
+  UPDATE {context_table} SET version = version
+  WHERE free_text = NEW.free_text;
+  RETURN NULL;
 END;
 $$ LANGUAGE 'plpgsql';
 """.format(**db_vars)
+db_schema["remap_trigger"] = """
+DROP TRIGGER IF EXISTS remap_trigger ON {grounding_text_table};
+CREATE TRIGGER remap_trigger AFTER UPDATE OF grounding_id
+ON {grounding_text_table} FOR EACH ROW
+WHEN (OLD.grounding_id IS DISTINCT FROM NEW.grounding_id)
+EXECUTE PROCEDURE update_remapped_contexts();
+""".format(**db_vars)
 db_schema["modified_triggers"] = """
 -- Create the triggers on every table with paper_id as a foreign key
 DROP TRIGGER IF EXISTS modified_trigger ON {sentence_table};
@@ -466,4 +674,8 @@ ON {comment_table} FOR EACH ROW EXECUTE PROCEDURE update_paper_modified();
 DROP TRIGGER IF EXISTS modified_trigger ON {association_table};
 CREATE TRIGGER modified_trigger BEFORE INSERT OR UPDATE OR DELETE
 ON {association_table} FOR EACH ROW EXECUTE PROCEDURE update_paper_modified_associations();
-""".format(**db_vars)
+
+DROP TRIGGER IF EXISTS version_trigger ON {paper_table};
+CREATE TRIGGER version_trigger BEFORE UPDATE
+ON {paper_table} FOR EACH ROW EXECUTE PROCEDURE update_paper_version();
+""".format(**db_vars) + db_schema["remap_trigger"]
@@ -38,6 +38,13 @@ class DataProvider:
         """
         pass
 
+    def finish_request(self):
+        """
+        Called after every client command.  Providers that keep a
+        transaction open across commands should end it here.
+        """
+        pass
+
     # Metadata
     @warn_undefined
     def fetch_total(self):
@@ -115,3 +122,11 @@ class DataProvider:
         """
         results = "[Template]"
         return results
+
+    # Debugging
+    @warn_undefined
+    def toy_load(self):
+        """
+        Loads the toy paper in app.toy_data into the corpus
+        """
+        return
@@ -26,6 +26,8 @@ GROUNDING_TABLE = app.config.db_vars["grounding_table"]
 GROUNDING_TEXT_TABLE = app.config.db_vars["grounding_text_table"]
 COMMENT_TABLE = app.config.db_vars["comment_table"]
 ASSOCIATION_TABLE = app.config.db_vars["association_table"]
+DICTIONARY_TABLE = app.config.db_vars["dictionary_table"]
+DELETION_TABLE = app.config.db_vars["deletion_table"]
 
 
 class SQLAlchemyORM:
@@ -58,6 +60,18 @@ class SQLAlchemyORM:
         locked = sqlalchemy.Column(sqlalchemy.Boolean, default=False)
         annotation_pass = sqlalchemy.Column(sqlalchemy.Integer, default=1)
         last_modified = sqlalchemy.Column(sqlalchemy.DateTime)
+        # JSON-encoded SHA-1 digests of the Reach/curated input files the
+        # paper was last loaded from (See app.papers.paper_fingerprint())
+        fingerprint = sqlalchemy.Column(sqlalchemy.Text)
+        # JSON-encoded signature of the paper's files as of the last time the
+        # paper ingestor synced it (See app.paper_sources.paper_signatures())
+        signature = sqlalchemy.Column(sqlalchemy.Text)
+        # Bumped by the database in every transaction that changes the paper
+        # or its annotations; text_version is the version its sentences last
+        # changed in (See db_schema["modified_setup"])
+        version = sqlalchemy.Column(sqlalchemy.BigInteger, server_default="0")
+        text_version = sqlalchemy.Column(sqlalchemy.BigInteger,
+                                         server_default="0")
 
     class Sentence(Base, WithDictionary):
         __tablename__ = SENTENCE_TABLE
@@ -85,17 +99,25 @@ class SQLAlchemyORM:
         free_text = sqlalchemy.Column(sqlalchemy.Text,
                                       sqlalchemy.ForeignKey(
                                           GROUNDING_TEXT_TABLE + '.free_text'))
+        # Version of the paper that the context last changed in (Set by the
+        # database)
+        version = sqlalchemy.Column(sqlalchemy.BigInteger)
 
         @property
         def dictionary(self):
             # Overwrite the default .dictionary property -- For contexts,
             # we want the associated grounding IDs too.
+            return self.dictionary_with_grounding(
+                self.grounding_text.grounding_id)
+
+        def dictionary_with_grounding(self, grounding_id):
+            # .dictionary, for when the grounding ID is already known (so
+            # that the GroundingText doesn't need to be loaded)
             data = dict()
             for col in self.__table__.columns:
                 data[col.name] = getattr(self, col.name)
 
-            data['grounding_id'] = self.grounding_text.grounding.id
-
+            data['grounding_id'] = grounding_id
             return data
 
     class Event(Base, WithDictionary):
@@ -114,6 +136,9 @@ class SQLAlchemyORM:
         paper_id = sqlalchemy.Column(sqlalchemy.Text,
                                      sqlalchemy.ForeignKey(
                                          PAPER_TABLE + '.id'))
+        # Version of the paper that the event (or its groundings) last
+        # changed in (Set by the database)
+        version = sqlalchemy.Column(sqlalchemy.BigInteger)
 
         @property
         def dictionary(self):
@@ -147,6 +172,18 @@ class SQLAlchemyORM:
                                          sqlalchemy.ForeignKey(
                                              GROUNDING_TABLE + '.id'))
 
+    class GroundingDictionary(Base, WithDictionary):
+        __tablename__ = DICTIONARY_TABLE
+
+        # Path of the dictionary file, relative to
+        # app.config.grounding_dictionaries_path
+        file_name = sqlalchemy.Column(sqlalchemy.Text, primary_key=True)
+        # SHA-1 digest of the file (and its grounding prefix) as of its last
+        # load; names its snapshot in app.config.grounding_snapshot_path
+        digest = sqlalchemy.Column(sqlalchemy.Text)
+        entries = sqlalchemy.Column(sqlalchemy.Integer)
+        loaded = sqlalchemy.Column(sqlalchemy.DateTime)
+
     class Comment(Base, WithDictionary):
         __tablename__ = COMMENT_TABLE
 
@@ -156,6 +193,7 @@ class SQLAlchemyORM:
         paper_id = sqlalchemy.Column(sqlalchemy.Text,
                                      sqlalchemy.ForeignKey(
                                          PAPER_TABLE + '.id'))
+        version = sqlalchemy.Column(sqlalchemy.BigInteger)
 
     # Set up SQLAlchemy back-references (Uses class and property names)
     Paper.sentences = sqlalchemy.orm.relationship("Sentence",
@@ -207,6 +245,17 @@ class SQLAlchemyORM:
                               primary_key=True),
         )
 
+    # Contexts, events and comments deleted from each paper, by the paper
+    # version they were deleted in (Written by the database)
+    deleted_annotation = \
+        sqlalchemy.Table(
+            DELETION_TABLE, Base.metadata,
+            sqlalchemy.Column('paper_id', sqlalchemy.Text),
+            sqlalchemy.Column('table_name', sqlalchemy.Text),
+            sqlalchemy.Column('row_id', sqlalchemy.Integer),
+            sqlalchemy.Column('version', sqlalchemy.BigInteger),
+        )
+
     Event.groundings = sqlalchemy.orm.relationship("Grounding",
                                                    secondary=event_grounding,
                                                    back_populates="events",
@@ -0,0 +1,179 @@
+"""
+Parsers for the interval files in the Reach output ('mention_intervals.txt'
+and 'event_intervals.txt').
+Both return lists of typed records, with every index already converted to an
+int.
+"""
+
+import collections
+
+import app.config
+
+# A single context mention
+Mention = collections.namedtuple("Mention", ["line_num",
+                                             "interval_start",
+                                             "interval_end",
+                                             "free_text",
+                                             "grounding_id"])
+
+# Cached "no grounding found" results are None, so lookups need a marker of
+# their own for texts that are not cached at all
+_MISSING = object()
+
+# A single event interval
+EventInterval = collections.namedtuple("EventInterval", ["line_num",
+                                                         "interval_start",
+                                                         "interval_end"])
+
+
+class MentionParser(object):
+    """
+    Parses the lines of 'mention_intervals.txt', which look like:
+    <line_num> <start>%<end>%<free_text>%<grounding_id> ...
+    (with `delimiter` in place of '%').
+    The free text and the grounding ID may themselves contain the delimiter
+    (e.g., "T-cell-tissuelist:TS-1001" with the old "-" delimiter), so the
+    grounding ID is found by scanning the mention from the right for the last
+    delimiter that is followed by one of the known grounding `prefixes`.
+    """
+    # Maximum number of cached split_grounding() results
+    cache_size = 100000
+
+    def __init__(self, prefixes=None, delimiter=None):
+        if prefixes is None:
+            prefixes = app.config.paper_grounding_prefixes
+        if delimiter is None:
+            delimiter = app.config.mention_intervals_delimiter
+
+        self.prefixes = frozenset(prefixes)
+        self.delimiter = delimiter
+
+        # The same few mentions come up over and over again in a corpus, so
+        # split_grounding() results are cached by text
+        self._groundings = {}
+
+    def split_grounding(self, text):
+        """
+        Splits the free text + grounding ID part of a mention.
+        Returns (free_text, grounding_id), with underscores in the free text
+        replaced by spaces, or None if no known grounding prefix was found.
+        """
+        delimiter = self.delimiter
+        end = len(text)
+        while True:
+            index = text.rfind(delimiter, 0, end)
+            if index <= 0:
+                # No delimiter left, or no free text before it
+                return None
+
+            grounding_id = text[index + len(delimiter):]
+            prefix, colon, rest = grounding_id.partition(":")
+            if colon and rest and prefix in self.prefixes:
+                return text[:index].replace("_", " "), grounding_id
+            end = index
+
+    def lookup_grounding(self, text):
+        """
+        Cached version of split_grounding()
+        """
+        grounding = self._groundings.get(text, _MISSING)
+        if grounding is _MISSING:
+            grounding = self.split_grounding(text)
+            if len(self._groundings) >= self.cache_size:
+                self._groundings.clear()
+            self._groundings[text] = grounding
+        return grounding
+
+    def parse_mention(self, line_num, mention):
+        """
+        Returns the Mention for a single mention on the given line.
+        Raises a ValueError if it cannot be parsed.
+        """
+        # Split into three guaranteed parts: Start index, end index and free
+        # text + grounding ID
+        parts = mention.split(self.delimiter, 2)
+        if len(parts) == 3:
+            grounding = self.lookup_grounding(parts[2])
+            if grounding is not None:
+                return Mention(line_num, int(parts[0]), int(parts[1]),
+                               grounding[0], grounding[1])
+
+        raise ValueError("Could not parse interval mention: {}"
+                         "".format(mention))
+
+    def parse_line(self, line):
+        """
+        Returns the Mentions on a single line of 'mention_intervals.txt'
+        """
+        fields = line.split()
+        if len(fields) < 2:
+            # No mentions for this line
+            return []
+
+        line_num = int(fields[0])
+        return [self.parse_mention(line_num, mention)
+                for mention in fields[1:]]
+
+    def parse_file(self, path):
+        """
+        Returns the Mentions in the given 'mention_intervals.txt' file
+        """
+        mentions = []
+        with open(path) as f:
+            for line in f:
+                mentions.extend(self.parse_line(line))
+        return mentions
+
+
+# Parsers for the current configuration, keyed by (prefixes, delimiter)
+_mention_parsers = {}
+
+
+def get_mention_parser():
+    """
+    Returns a MentionParser for the grounding prefixes and delimiter currently
+    set in app.config, creating it on first use
+    """
+    key = (tuple(app.config.paper_grounding_prefixes),
+           app.config.mention_intervals_delimiter)
+    parser = _mention_parsers.get(key)
+    if parser is None:
+        parser = MentionParser(*key)
+        _mention_parsers[key] = parser
+    return parser
+
+
+def parse_mention_intervals(path):
+    """
+    Returns the Mentions in the given 'mention_intervals.txt' file, using the
+    grounding prefixes and delimiter set in app.config
+    """
+    return get_mention_parser().parse_file(path)
+
+
+def parse_event_intervals(path):
+    """
+    Returns the EventIntervals in the given 'event_intervals.txt' file
+    """
+    with open(path) as f:
+        return list(iter_event_intervals(f))
+
+
+def iter_event_intervals(lines):
+    """
+    Yields the EventIntervals on the given lines of an 'event_intervals.txt'
+    file, which look like:
+    <line_num> <start>-<end> ...
+    """
+    for line in lines:
+        fields = line.split()
+        if len(fields) < 2:
+            # No events on this line
+            continue
+
+        line_num = int(fields[0])
+        for event in fields[1:]:
+            interval_start, interval_end = event.split("-")
+            yield EventInterval(line_num,
+                                int(interval_start),
+                                int(interval_end))
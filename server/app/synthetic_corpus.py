@@ -0,0 +1,238 @@
+"""
+Generates synthetic paper folders (in the same layout as the Reach output in
+`papers_path`) from the hand-annotated paper in app.toy_data.
+Every line of a generated paper is a copy of one of ToyData's lines, together
+with its Reach context mentions, its events and their curated context
+associations, so the mention, event and curated TSV densities of the
+generated papers follow ToyData's (which are close to those of the papers in
+data/old_papers: about 0.5 mentions, 0.15-0.2 events and 0.1 curated lines
+per sentence).
+"""
+
+import collections
+import os
+import random
+
+import app.config
+from app.toy_data import ToyData
+
+# The annotations on a single line of ToyData.
+# `mentions` holds (start, end, free_text, grounding_id) tuples, `events`
+# holds (start, end, grounding_ids) tuples and `contexts` holds
+# (kind, free_text, grounding_id) tuples for the curated contexts, where
+# `kind` is the first letter of the curated label (e.g., "C" for "C1").
+ToyLine = collections.namedtuple("ToyLine", ["sentence",
+                                             "mentions",
+                                             "events",
+                                             "contexts"])
+
+# Curated label kinds for groundings without a curated context in ToyData
+grounding_kinds = {
+    "taxonomy":   "S",
+    "tissuelist": "T"
+}
+
+_toy_lines = None
+
+
+def _parse_interval(interval):
+    start, end = interval.split("-")
+    return int(start), int(end)
+
+
+def toy_lines():
+    """
+    Returns the list of ToyLines for every line of ToyData
+    """
+    global _toy_lines
+    if _toy_lines is not None:
+        return _toy_lines
+
+    lines = [ToyLine(sentence, [], [], []) for sentence in ToyData.sentences]
+    for free_text, details in sorted(ToyData.reach_contexts.items()):
+        for line_num, intervals in details.items():
+            if line_num == 'groundingID':
+                continue
+            for interval in intervals:
+                lines[line_num].mentions.append(
+                    _parse_interval(interval) +
+                    (free_text, details['groundingID']))
+
+    for free_text, details in sorted(ToyData.manual_contexts.items()):
+        for line_num in details:
+            if line_num in ('annotationID', 'groundingID'):
+                continue
+            lines[line_num].contexts.append((details['annotationID'][0],
+                                             free_text,
+                                             details['groundingID']))
+
+    for event in ToyData.manual_events:
+        lines[event['lineNum']].events.append(
+            _parse_interval(event['interval']) + (tuple(event['contexts']),))
+
+    for line in lines:
+        line.mentions.sort()
+    _toy_lines = lines
+    return lines
+
+
+def _grounding_text(grounding_id):
+    """
+    Returns a free text for the given grounding ID from ToyData's contexts
+    """
+    for contexts in [ToyData.manual_contexts, ToyData.reach_contexts]:
+        for free_text, details in sorted(contexts.items()):
+            if details['groundingID'] == grounding_id:
+                return free_text
+    return grounding_id
+
+
+def _section_names(line_count):
+    """
+    Returns the section name for each line of a paper with `line_count`
+    lines, with ToyData's sections stretched to fit
+    """
+    toy_count = len(ToyData.sentences)
+    starts = [int(start) for start in ToyData.sections.split(",")]
+    names = []
+    section = 0
+    for line_num in range(line_count):
+        while section + 1 < len(starts) and \
+                line_num * toy_count >= starts[section + 1] * line_count:
+            section += 1
+        if section == 0:
+            names.append("article-title")
+        elif section == 1:
+            names.append("abstract")
+        else:
+            names.append("section-{}".format(section - 1))
+    return names
+
+
+def generate_paper(paper_id, sentences=None, rng=None, delimiter=None):
+    """
+    Returns a Dictionary mapping each file name of a synthetic paper folder to
+    its contents.
+    The first line is always ToyData's title; the other `sentences` - 1 lines
+    are drawn at random (with `rng`, a random.Random) from ToyData's other
+    lines.  If `sentences` is None, ToyData is copied as it is.
+    """
+    if rng is None:
+        rng = random.Random()
+    if delimiter is None:
+        delimiter = app.config.mention_intervals_delimiter
+
+    lines = toy_lines()
+    if sentences is None:
+        sources = list(range(len(lines)))
+    else:
+        sources = [0] + [rng.randrange(1, len(lines))
+                         for _ in range(sentences - 1)]
+
+    # Curated labels, per grounding ID
+    labels = {}
+    label_counts = collections.Counter()
+    event_count = 0
+
+    def label_for(kind, grounding_id):
+        if grounding_id not in labels:
+            label_counts[kind] += 1
+            labels[grounding_id] = "{}{}".format(kind, label_counts[kind])
+        return labels[grounding_id]
+
+    files = collections.OrderedDict()
+    files['sentences.txt'] = []
+    files['titles.txt'] = []
+    files['sections.txt'] = _section_names(len(sources))
+    files['mention_intervals.txt'] = []
+    files['event_intervals.txt'] = []
+    files[paper_id + '.tsv'] = []
+
+    for line_num, source in enumerate(sources):
+        line = lines[source]
+        files['sentences.txt'].append(line.sentence)
+        files['titles.txt'].append("true" if line_num == 0 else "false")
+
+        mentions = ["{1}{0}{2}{0}{3}{0}{4}"
+                    "".format(delimiter, start, end,
+                              free_text.replace(" ", "_"), grounding_id)
+                    for start, end, free_text, grounding_id in line.mentions]
+        files['mention_intervals.txt'].append(
+            " ".join([str(line_num)] + mentions))
+
+        events = ["{}-{}".format(start, end)
+                  for start, end, _ in line.events]
+        files['event_intervals.txt'].append(
+            " ".join([str(line_num)] + events))
+
+        # Curated TSV: Contexts defined on this line, then the line's events
+        # and their associations
+        groundings = []
+        free_texts = []
+        line_labels = []
+        for kind, free_text, grounding_id in line.contexts:
+            if grounding_id in labels:
+                continue
+            groundings.append(grounding_id)
+            free_texts.append(free_text)
+            line_labels.append(label_for(kind, grounding_id))
+
+        associations = []
+        for _, _, grounding_ids in line.events:
+            for grounding_id in grounding_ids:
+                if grounding_id not in labels:
+                    # Not defined yet -- Define it here
+                    kind = grounding_kinds.get(grounding_id.split(":")[0],
+                                               "C")
+                    groundings.append(grounding_id)
+                    free_texts.append(_grounding_text(grounding_id))
+                    line_labels.append(label_for(kind, grounding_id))
+                if labels[grounding_id] not in associations:
+                    associations.append(labels[grounding_id])
+        for _ in line.events:
+            event_count += 1
+            line_labels.append("E{}".format(event_count))
+
+        files[paper_id + '.tsv'].append("\t".join([
+            str(line_num),
+            ",".join(groundings),
+            ",".join(free_texts),
+            ",".join(line_labels),
+            ",".join(associations),
+            "",
+            line.sentence
+        ]))
+
+    return collections.OrderedDict(
+        (file_name, "".join(line + "\n" for line in file_lines))
+        for file_name, file_lines in files.items())
+
+
+def write_paper(path, paper_id, sentences=None, rng=None, delimiter=None):
+    """
+    Writes a synthetic paper folder for `paper_id` under `path` (see
+    generate_paper())
+    """
+    paper_path = os.path.join(path, paper_id)
+    os.makedirs(paper_path, exist_ok=True)
+    for file_name, contents in generate_paper(paper_id, sentences, rng,
+                                              delimiter).items():
+        with open(os.path.join(paper_path, file_name), 'w') as f:
+            f.write(contents)
+
+
+def write_corpus(path, papers, sentences, seed=0, prefix="PMCSYN",
+                 delimiter=None):
+    """
+    Writes `papers` synthetic paper folders with `sentences` lines each under
+    `path`, named `prefix` + a running number, and returns their IDs.
+    The same `seed` always produces the same corpus.
+    """
+    rng = random.Random(seed)
+    width = len(str(papers))
+    paper_ids = []
+    for number in range(1, papers + 1):
+        paper_id = "{}{}".format(prefix, str(number).zfill(width))
+        write_paper(path, paper_id, sentences, rng, delimiter)
+        paper_ids.append(paper_id)
+    return paper_ids
@@ -8,3 +8,22 @@ class Namespace:
     def __repr__(self):
         import pprint
         return pprint.pformat(vars(self), indent=2)
+
+
+def parallel_executor(workers=None):
+    """
+    Returns a concurrent.futures Executor for CPU-bound work (paper parsing
+    and the like) with the given number of workers (default: CPU count).
+    Worker processes are forked where possible; a freshly spawned process
+    would re-run main.py, so on other platforms (i.e., Windows) we fall back
+    to threads.
+    """
+    import concurrent.futures
+    import multiprocessing
+
+    if "fork" in multiprocessing.get_all_start_methods():
+        return concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("fork")
+        )
+    return concurrent.futures.ThreadPoolExecutor(max_workers=workers)
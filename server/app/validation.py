@@ -0,0 +1,289 @@
+"""
+Dry-run validation of the papers in `papers_path`.
+Parses every paper folder the same way app.papers.iter_paper() does, but
+collects every problem that would stop (or quietly corrupt) a load into a
+report, instead of giving up at the first one; nothing is written to the
+database.
+Like app.papers, everything here is free of database state so that papers
+can be checked in worker processes.
+"""
+
+import collections
+import timeit
+
+import app.config
+import app.logger
+import app.papers
+import app.reach_parser
+import app.util
+
+logger = app.logger.getLogger(__name__)
+
+# Files that every paper folder needs (the curated TSV is optional)
+REQUIRED_FILES = ['sentences.txt', 'titles.txt', 'sections.txt',
+                  'mention_intervals.txt', 'event_intervals.txt']
+
+# Maximum number of errors/warnings kept for a single paper
+max_problems = 50
+
+
+class PaperReport(object):
+    """
+    Collects the problems found in a single paper.
+    `context_groundings`/`event_groundings` map each grounding ID used by the
+    paper's contexts/curated associations to the first place it was found,
+    so that they can be checked against the dictionaries afterwards.
+    """
+    def __init__(self, paper_id):
+        self.paper_id = paper_id
+        self.errors = []
+        self.warnings = []
+        self.omitted = 0
+        self.counts = collections.Counter()
+        self.context_groundings = {}
+        self.event_groundings = {}
+
+    def error(self, message):
+        self._add(self.errors, message)
+
+    def warning(self, message):
+        self._add(self.warnings, message)
+
+    def _add(self, problems, message):
+        if len(self.errors) + len(self.warnings) >= max_problems:
+            self.omitted += 1
+        else:
+            problems.append(message)
+
+    def as_dict(self):
+        if len(self.errors) > 0:
+            status = "error"
+        elif len(self.warnings) > 0:
+            status = "warning"
+        else:
+            status = "ok"
+        return {
+            'paper_id': self.paper_id,
+            'status':   status,
+            'errors':   self.errors,
+            'warnings': self.warnings,
+            'omitted':  self.omitted,
+            'counts':   dict(self.counts)
+        }
+
+
+def check_interval(report, location, words, interval_start, interval_end):
+    """
+    Checks that an interval falls within a sentence of `words` words.
+    (The end of a Reach interval may point one past its last word.)
+    """
+    if words is None:
+        report.error("{}: Line is not in 'sentences.txt'".format(location))
+    elif not 0 <= interval_start <= interval_end <= words or \
+            interval_start >= words:
+        report.error("{}: Interval {}-{} is outside the sentence ({} words)"
+                     "".format(location, interval_start, interval_end,
+                               words))
+
+
+def check_paper(paper_id, papers_path=None):
+    """
+    Worker entry point: Checks the files of the given paper, and returns its
+    PaperReport
+    """
+    report = PaperReport(paper_id)
+    try:
+        _check_paper(report, paper_id, papers_path)
+    except Exception as e:
+        report.error("Could not read paper: {}".format(repr(e)))
+    return report
+
+
+def _check_paper(report, paper_id, papers_path):
+    files = app.papers.locate_paper(paper_id, papers_path)
+    if files is None:
+        report.error("Could not find paper directory.")
+        return
+
+    missing = [file_name for file_name in REQUIRED_FILES
+               if not files.exists(file_name)]
+    for file_name in missing:
+        report.error("Missing file: '{}'".format(file_name))
+    if len(missing) > 0:
+        return
+
+    prefixes = app.config.paper_grounding_prefixes
+    parser = app.reach_parser.get_mention_parser()
+
+    # -- Sentences: Word counts per line
+    words = [len(sentence.split(" ")) if sentence else 0
+             for sentence in app.papers.iter_sentences(
+                 files.lines('sentences.txt'))]
+    report.counts['sentences'] = len(words)
+
+    def words_on(line_num):
+        if 0 <= line_num < len(words):
+            return words[line_num]
+        return None
+
+    # -- Title
+    title_line_num = 0
+    for line in files.lines('titles.txt'):
+        if line.startswith("true"):
+            break
+        title_line_num += 1
+    if words_on(title_line_num) is None:
+        report.error("titles.txt: Title line {} is not in 'sentences.txt'"
+                     "".format(title_line_num))
+
+    # -- Reach contexts
+    for file_line, line in enumerate(files.lines('mention_intervals.txt'), 1):
+        fields = line.split()
+        if len(fields) < 2:
+            continue
+        location = "mention_intervals.txt:{}".format(file_line)
+        try:
+            line_num = int(fields[0])
+        except ValueError:
+            report.error("{}: Invalid line number: '{}'"
+                         "".format(location, fields[0]))
+            continue
+
+        for mention in fields[1:]:
+            try:
+                mention = parser.parse_mention(line_num, mention)
+            except ValueError:
+                report.error("{}: {}".format(location,
+                                             _describe_mention(parser,
+                                                               mention)))
+                continue
+            report.counts['contexts'] += 1
+            check_interval(report, location, words_on(line_num),
+                           mention.interval_start, mention.interval_end)
+            report.context_groundings.setdefault(mention.grounding_id,
+                                                 location)
+
+    # -- Reach events
+    event_lines = set()
+    for file_line, line in enumerate(files.lines('event_intervals.txt'), 1):
+        location = "event_intervals.txt:{}".format(file_line)
+        try:
+            intervals = list(app.reach_parser.iter_event_intervals([line]))
+        except ValueError:
+            report.error("{}: Could not parse event intervals: '{}'"
+                         "".format(location, line))
+            continue
+        for interval in intervals:
+            report.counts['events'] += 1
+            event_lines.add(interval.line_num)
+            check_interval(report, location, words_on(interval.line_num),
+                           interval.interval_start, interval.interval_end)
+
+    # -- Xia's base context associations
+    tsv = paper_id + ".tsv"
+    if not files.exists(tsv):
+        return
+
+    tsv_errors = []
+    associations = app.papers.read_curated_associations(
+        paper_id, files.lines(tsv), tsv_errors)
+    for error in tsv_errors:
+        report.error(error)
+    for line_num, groundings in sorted(associations.items()):
+        location = "{}: Line {}".format(tsv, line_num)
+        report.counts['associations'] += len(groundings)
+        if line_num not in event_lines:
+            report.warning("{}: Associations for a line without events "
+                           "will be dropped".format(location))
+        for grounding in groundings:
+            prefix = grounding.id.partition(":")[0]
+            if prefix not in prefixes:
+                report.error("{}: Unknown grounding prefix: '{}' ({})"
+                             "".format(location, prefix, grounding.id))
+            report.event_groundings.setdefault(grounding.id, location)
+
+
+def _describe_mention(parser, mention):
+    """
+    Explains why the given mention could not be parsed
+    """
+    parts = mention.split(parser.delimiter, 2)
+    if len(parts) == 3:
+        try:
+            int(parts[0]), int(parts[1])
+        except ValueError:
+            return "Invalid interval: '{}'".format(mention)
+        candidate = parts[2].rpartition(parser.delimiter)[2]
+        prefix, colon, _ = candidate.partition(":")
+        if colon and prefix not in parser.prefixes:
+            return "Unknown grounding prefix: '{}' ({}); add it to " \
+                   "`paper_grounding_prefixes`".format(prefix, mention)
+    return "Could not parse interval mention: '{}'".format(mention)
+
+
+def validate_papers(known_groundings=None, existing_papers=(), workers=None,
+                    papers_path=None):
+    """
+    Checks every paper in `papers_path` (defaults to app.config.papers_path)
+    with a pool of `workers` processes (default:
+    app.config.paper_loader_workers).
+    Grounding IDs are checked against `known_groundings` (the IDs in the
+    loaded dictionaries), if given: Contexts with unknown groundings only
+    raise a warning (the grounding is created when the paper is loaded), but
+    curated associations must refer to a known grounding or to one of the
+    paper's own contexts.
+    Papers in `existing_papers` are reported as already loaded.
+    Returns a List of per-paper reports (Dictionaries with the keys
+    'paper_id', 'status', 'errors', 'warnings', 'omitted' and 'counts'),
+    which are also summarised in the log.
+    'status' is one of 'ok', 'warning' or 'error'.
+    """
+    if workers is None:
+        workers = app.config.paper_loader_workers
+    if papers_path is None:
+        papers_path = app.config.papers_path
+
+    start_time = timeit.default_timer()
+    paper_ids = app.papers.list_papers(papers_path)
+    existing_papers = set(existing_papers)
+
+    with app.util.parallel_executor(workers) as executor:
+        paper_reports = list(executor.map(check_paper, paper_ids,
+                                          [papers_path] * len(paper_ids)))
+
+    reports = []
+    for report in paper_reports:
+        if known_groundings is not None:
+            for grounding_id, location in sorted(
+                    report.context_groundings.items()):
+                if grounding_id not in known_groundings:
+                    report.warning("{}: Grounding is not in the dictionaries: "
+                                   "{}".format(location, grounding_id))
+            for grounding_id, location in sorted(
+                    report.event_groundings.items()):
+                if grounding_id not in known_groundings and \
+                        grounding_id not in report.context_groundings:
+                    report.error("{}: Unknown grounding: {}"
+                                 "".format(location, grounding_id))
+        if report.paper_id in existing_papers:
+            report.warning("Paper already exists in the database, and will "
+                           "be skipped by _load_all_papers().")
+        reports.append(report.as_dict())
+
+    # Summary
+    elapsed = timeit.default_timer() - start_time
+    counts = collections.Counter(report['status'] for report in reports)
+    logger.info("Validated {} paper(s) in {:.03f}s: {} OK, {} with warnings, "
+                "{} with errors."
+                "".format(len(reports), elapsed, counts["ok"],
+                          counts["warning"], counts["error"]))
+    for report in reports:
+        for message in report['errors']:
+            logger.error("{}: {}".format(report['paper_id'], message))
+        for message in report['warnings']:
+            logger.warning("{}: {}".format(report['paper_id'], message))
+        if report['omitted'] > 0:
+            logger.warning("{}: ... and {} more problem(s)."
+                           "".format(report['paper_id'], report['omitted']))
+
+    return reports
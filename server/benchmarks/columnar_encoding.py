@@ -0,0 +1,159 @@
+# Context Annotation Web App
+# Columnar paper payload benchmark
+
+"""
+Loads synthetic papers of increasing size (see app.synthetic_corpus), and
+compares get_paper_data() responses with their contexts and events sent as
+lists of records and as columns (app.columnar): the size of their JSON and of
+their encoded websocket frames, the time it takes to read and encode them
+(with the paper response cache emptied first), and the time it takes to
+decode them again as the client does.  Exits with status 1 if a columnar
+response does not decode to the same records.
+
+Run from the `server` directory, against a scratch database that already has
+the tables and grounding dictionaries loaded:
+
+    python3 benchmarks/columnar_encoding.py -postgres "user:pass@host:port/db"
+    python3 benchmarks/columnar_encoding.py -postgres "..." --sentences 5000
+
+Every paper loaded by the benchmark is deleted again afterwards.
+"""
+
+import argparse
+import base64
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import timeit
+import zlib
+
+sys.path.insert(0, os.getcwd())
+
+import app.columnar
+import app.config
+import app.frame_cache
+import app.paper_cache
+import app.synthetic_corpus
+
+parser = argparse.ArgumentParser(
+    description="Compares get_paper_data() responses with lists of records "
+                "and with columns, for synthetic papers of increasing size.")
+parser.add_argument('-postgres',
+                    default=app.config.provider_classes['postgres'][
+                        'default_source'],
+                    help=app.config.provider_classes['postgres'][
+                        'option_help'])
+parser.add_argument('--sentences', type=int, nargs='+',
+                    default=[1000, 5000, 20000],
+                    help="Numbers of sentences per paper. "
+                         "(Default: 1000 5000 20000)")
+parser.add_argument('--repeat', type=int, default=5,
+                    help="Number of timed reads per paper and format. "
+                         "(Default: 5)")
+parser.add_argument('--seed', type=int, default=0,
+                    help="Random seed for the generated papers.")
+
+RECORD_KEYS = ('contexts_reach', 'contexts_manual', 'events')
+
+
+def decode(frame):
+    """
+    Decodes a frame as the client does, turning any columnar tables back into
+    lists of records
+    """
+    data = json.loads(zlib.decompress(base64.b64decode(frame)).decode())[
+        'data']
+    for key in RECORD_KEYS:
+        if isinstance(data[key], dict):
+            data[key] = app.columnar.decode(data[key])
+    return data
+
+
+def time_format(provider, request, repeat):
+    """
+    Returns (JSON KiB, frame KiB, seconds per read and encoding, seconds per
+    decoding, decoded data) for get_paper_data() responses to the given
+    request
+    """
+    frame = None
+    start_time = timeit.default_timer()
+    for _ in range(repeat):
+        # Nothing from the session's identity map or the paper cache
+        provider.session.expire_all()
+        app.paper_cache.cache.clear()
+        frame = app.frame_cache.encode_message(
+            {'id': 0, 'command': 'get_paper_data',
+             'data': provider.get_paper_data(request)})
+    encoding = (timeit.default_timer() - start_time) / max(repeat, 1)
+
+    start_time = timeit.default_timer()
+    for _ in range(repeat):
+        data = decode(frame)
+    decoding = (timeit.default_timer() - start_time) / max(repeat, 1)
+
+    json_size = len(zlib.decompress(base64.b64decode(frame)))
+    return json_size / 1024, len(frame) / 1024, encoding, decoding, data
+
+
+def main():
+    args = parser.parse_args()
+
+    from app.providers.postgresql import PostgresProvider
+
+    logging.getLogger().setLevel(logging.WARNING)
+    provider = PostgresProvider(args.postgres)
+
+    work_path = tempfile.mkdtemp()
+    paper_ids = []
+    failed = False
+    try:
+        app.config.papers_path = work_path
+        print("{:>9}  {:>8}  {:>17}  {:>17}  {:>17}  {:>17}"
+              "".format("sentences", "format", "JSON KiB", "frame KiB",
+                        "encode ms", "decode ms"))
+        for sentences in args.sentences:
+            paper_id = app.synthetic_corpus.write_corpus(
+                work_path, 1, sentences, seed=args.seed,
+                prefix="PMCCOL{}x".format(sentences))[0]
+            provider._new_paper(provider._read_paper(paper_id))
+            paper_ids.append(paper_id)
+
+            request = {'paperID': paper_id}
+            records = time_format(provider, request, args.repeat)
+            columns = time_format(
+                provider, dict(request, format=app.columnar.FORMAT),
+                args.repeat)
+            if records[-1] != columns[-1]:
+                print("FAIL: The columnar response for {} does not decode to "
+                      "the same records.".format(paper_id))
+                failed = True
+                continue
+
+            for name, results in (("records", records),
+                                  ("columnar", columns)):
+                json_size, frame_size, encoding, decoding, _ = results
+                print("{:>9}  {:>8}  {:>8.1f} ({:>5.0%})  {:>8.1f} ({:>5.0%})"
+                      "  {:>8.2f} ({:>5.0%})  {:>8.2f} ({:>5.0%})"
+                      "".format(sentences, name,
+                                json_size, json_size / records[0],
+                                frame_size, frame_size / records[1],
+                                encoding * 1000, encoding / records[2],
+                                decoding * 1000, decoding / records[3]))
+    finally:
+        for paper_id in paper_ids:
+            try:
+                provider._delete_paper(paper_id)
+            except Exception:
+                provider.session.rollback()
+        shutil.rmtree(work_path)
+        provider.shutdown()
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
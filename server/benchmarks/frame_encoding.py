@@ -0,0 +1,137 @@
+# Context Annotation Web App
+# Websocket frame encoding benchmark
+
+"""
+Loads synthetic papers of increasing size (see app.synthetic_corpus), and
+times encoding their get_paper_data() responses for the websocket client
+from scratch against re-sending them from the frame cache (app.frame_cache)
+with a new request ID.  Exits with status 1 if a cached frame does not decode
+to the same message.
+
+Run from the `server` directory, against a scratch database that already has
+the tables and grounding dictionaries loaded:
+
+    python3 benchmarks/frame_encoding.py -postgres "user:pass@host:port/db"
+    python3 benchmarks/frame_encoding.py -postgres "..." --sentences 10 1000
+
+Every paper loaded by the benchmark is deleted again afterwards.
+"""
+
+import argparse
+import base64
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import timeit
+import zlib
+
+sys.path.insert(0, os.getcwd())
+
+import app.config
+import app.frame_cache
+import app.synthetic_corpus
+
+parser = argparse.ArgumentParser(
+    description="Times encoding get_paper_data() responses for the websocket "
+                "client, with and without the frame cache.")
+parser.add_argument('-postgres',
+                    default=app.config.provider_classes['postgres'][
+                        'default_source'],
+                    help=app.config.provider_classes['postgres'][
+                        'option_help'])
+parser.add_argument('--sentences', type=int, nargs='+',
+                    default=[100, 1000, 5000],
+                    help="Numbers of sentences per paper to encode. "
+                         "(Default: 100 1000 5000)")
+parser.add_argument('--repeat', type=int, default=20,
+                    help="Number of timed encodings per paper. (Default: 20)")
+parser.add_argument('--seed', type=int, default=0,
+                    help="Random seed for the generated papers.")
+
+
+def decode(frame):
+    """
+    Decodes a frame as the client does
+    """
+    return json.loads(zlib.decompress(base64.b64decode(frame)).decode())
+
+
+def time_paper(provider, paper_id, repeat):
+    """
+    Returns (frame size, seconds per uncached encoding, seconds per cached
+    encoding) for the given paper's get_paper_data() response
+    """
+    frame_cache = app.frame_cache.FrameCache()
+    data = provider.get_paper_data({'paperID': paper_id})
+    if data.get('error'):
+        raise RuntimeError("get_paper_data() failed for {}: {}"
+                           "".format(paper_id, data['message']))
+    message = {'id': 0, 'command': 'get_paper_data', 'data': data}
+
+    start_time = timeit.default_timer()
+    for _ in range(repeat):
+        frame = app.frame_cache.encode_message(message)
+    uncached = (timeit.default_timer() - start_time) / max(repeat, 1)
+
+    frame_cache.encode(message)
+    start_time = timeit.default_timer()
+    for request_id in range(1, repeat + 1):
+        cached_frame = frame_cache.encode(dict(message, id=request_id))
+    cached = (timeit.default_timer() - start_time) / max(repeat, 1)
+
+    if decode(cached_frame) != dict(decode(frame), id=repeat):
+        raise ValueError("Cached frame for {} does not match.".format(
+            paper_id))
+    return len(frame), uncached, cached
+
+
+def main():
+    args = parser.parse_args()
+
+    from app.providers.postgresql import PostgresProvider
+
+    logging.getLogger().setLevel(logging.WARNING)
+    provider = PostgresProvider(args.postgres)
+
+    work_path = tempfile.mkdtemp()
+    paper_ids = []
+    failed = False
+    try:
+        app.config.papers_path = work_path
+        print("{:>9}  {:>10}  {:>10}  {:>10}"
+              "".format("sentences", "frame KiB", "encode ms", "cached ms"))
+        for sentences in args.sentences:
+            paper_id = app.synthetic_corpus.write_corpus(
+                work_path, 1, sentences, seed=args.seed,
+                prefix="PMCFRM{}x".format(sentences))[0]
+            provider._new_paper(provider._read_paper(paper_id))
+            paper_ids.append(paper_id)
+
+            try:
+                size, uncached, cached = time_paper(provider, paper_id,
+                                                    args.repeat)
+            except ValueError as e:
+                print("FAIL: {}".format(e))
+                failed = True
+                continue
+            print("{:>9}  {:>10.1f}  {:>10.2f}  {:>10.3f}"
+                  "".format(sentences, size / 1024, uncached * 1000,
+                            cached * 1000))
+    finally:
+        for paper_id in paper_ids:
+            try:
+                provider._delete_paper(paper_id)
+            except Exception:
+                provider.session.rollback()
+        shutil.rmtree(work_path)
+        provider.shutdown()
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+# Context Annotation Web App
+# Ingestion scaling benchmark
+
+"""
+Generates synthetic corpora of increasing size from app.toy_data (see
+app.synthetic_corpus), and times _read_paper(), _new_paper() and
+_load_all_papers() on each, to show how paper ingestion scales with the
+number of papers.
+
+Run from the `server` directory, against a scratch database that already has
+the tables and grounding dictionaries loaded:
+
+    python3 benchmarks/ingestion_scaling.py -postgres "user:pass@host:port/db"
+    python3 benchmarks/ingestion_scaling.py -postgres "..." --sizes 10 100 \\
+        --sentences 500
+
+Every paper loaded by the benchmark is deleted again after each step.
+To only write a synthetic corpus to disk (e.g., to load it by hand), use
+--output instead.
+"""
+
+import argparse
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.getcwd())
+
+import app.config
+import app.synthetic_corpus
+
+parser = argparse.ArgumentParser(
+    description="Benchmarks paper ingestion on synthetic corpora of "
+                "increasing size.")
+parser.add_argument('-postgres',
+                    default=app.config.provider_classes['postgres'][
+                        'default_source'],
+                    help=app.config.provider_classes['postgres'][
+                        'option_help'])
+parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000],
+                    help="Numbers of papers to benchmark. "
+                         "(Default: 10 100 1000)")
+parser.add_argument('--sentences', type=int, default=100,
+                    help="Number of sentences per paper. (Default: 100)")
+parser.add_argument('--seed', type=int, default=0,
+                    help="Random seed for the generated corpora.")
+parser.add_argument('--workers', type=int, default=None,
+                    help="Worker processes for _load_all_papers(). "
+                         "(Default: app.config.paper_loader_workers)")
+parser.add_argument('--output',
+                    help="Only write a corpus of the first size to this "
+                         "directory, without touching the database.")
+
+
+def delete_papers(provider, paper_ids):
+    for paper_id in paper_ids:
+        try:
+            provider._delete_paper(paper_id)
+        except Exception:
+            provider.session.rollback()
+
+
+def run_size(provider, size, args):
+    """
+    Benchmarks a corpus of `size` papers; returns a List of
+    (step, seconds, errors) tuples
+    """
+    work_path = tempfile.mkdtemp()
+    try:
+        paper_ids = app.synthetic_corpus.write_corpus(
+            work_path, size, args.sentences, seed=args.seed,
+            prefix="PMCSYN{}x".format(size))
+        app.config.papers_path = work_path
+        results = []
+
+        # -- _read_paper
+        start_time = timeit.default_timer()
+        for paper_id in paper_ids:
+            provider._read_paper(paper_id)
+        results.append(("_read_paper", timeit.default_timer() - start_time,
+                        0))
+
+        # -- _new_paper (parsing is not included in the timing)
+        write_time = 0.0
+        errors = 0
+        for paper_id in paper_ids:
+            paper = provider._read_paper(paper_id)
+            start_time = timeit.default_timer()
+            try:
+                provider._new_paper(paper)
+            except Exception:
+                provider.session.rollback()
+                errors += 1
+            write_time += timeit.default_timer() - start_time
+        results.append(("_new_paper", write_time, errors))
+        delete_papers(provider, paper_ids)
+
+        # -- _load_all_papers
+        start_time = timeit.default_timer()
+        reports = provider._load_all_papers(workers=args.workers)
+        elapsed = timeit.default_timer() - start_time
+        errors = sum(1 for report in reports
+                     if report['status'] not in ("loaded", "partial"))
+        results.append(("_load_all_papers", elapsed, errors))
+        delete_papers(provider, paper_ids)
+
+        return results
+    finally:
+        shutil.rmtree(work_path)
+
+
+def main():
+    args = parser.parse_args()
+
+    if args.output:
+        paper_ids = app.synthetic_corpus.write_corpus(
+            args.output, args.sizes[0], args.sentences, seed=args.seed)
+        print("Wrote {} paper(s) with {} sentences each to {}."
+              "".format(len(paper_ids), args.sentences, args.output))
+        return
+
+    from app.providers.postgresql import PostgresProvider
+
+    logging.getLogger().setLevel(logging.WARNING)
+    provider = PostgresProvider(args.postgres)
+
+    print("Synthetic papers with {} sentences each.".format(args.sentences))
+    print("{:>6}  {:>16}  {:>10}  {:>10}  {}"
+          "".format("papers", "step", "seconds", "papers/s", "errors"))
+    for size in args.sizes:
+        for step, elapsed, errors in run_size(provider, size, args):
+            print("{:>6}  {:>16}  {:>10.3f}  {:>10.1f}  {}"
+                  "".format(size, step, elapsed,
+                            size / elapsed if elapsed else 0, errors))
+
+    provider.shutdown()
+
+
+if __name__ == '__main__':
+    main()
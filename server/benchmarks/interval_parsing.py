@@ -0,0 +1,180 @@
+# Context Annotation Web App
+# Interval parsing microbenchmark
+
+"""
+Times the parsing of 'mention_intervals.txt' and 'event_intervals.txt' for
+every paper folder in a directory, with the old regex-based parsing from
+_read_paper and with app.reach_parser, and checks that both produce the same
+records.
+
+Run from the `server` directory; no database is needed:
+
+    python3 benchmarks/interval_parsing.py
+    python3 benchmarks/interval_parsing.py --papers-path data/old_papers \\
+        --delimiter=-
+"""
+
+import argparse
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.getcwd())
+
+import app.config
+import app.reach_parser
+
+# The interval mentions that the old parser matched against, after each
+# mention in the file, while it was being debugged
+LEGACY_EXTRA_MATCHES = [
+    "astrocytes_.%cl:CL:0000127",
+    "stem_cell%cl:CL:0000034",
+    "Stem_Cell_Hypothesis%cl:CL:0000034",
+    "Preadipocyte_Factor%cl:CL:0002334",
+    "Keratinocyte_Signaling%tissuelist:TS-0500",
+    "Human_Embryonic%taxonomy:9606",
+    "THYROID_TUMORS%tissuelist:TS-1047",
+    "adult_subventricular_zone_astrocytes%uberon:UBERON:0004922",
+    "glioblastoma_initiating%tissuelist:TS-0417",
+    "colorectal_cancer_.%tissuelist:TS-0160",
+    "human_keratinocytes%cellosaurus:CVCL_9T09",
+    "Adipose_Derived%tissuelist:TS-0013"
+]
+
+parser = argparse.ArgumentParser(
+    description="Benchmarks regex-based vs. app.reach_parser interval "
+                "parsing.")
+parser.add_argument('--papers-path',
+                    default=app.config.papers_path,
+                    help="Directory of Reach paper folders to parse. "
+                         "(Default: {})".format(app.config.papers_path))
+parser.add_argument('--delimiter',
+                    default=app.config.mention_intervals_delimiter,
+                    help="Delimiter used in 'mention_intervals.txt'. "
+                         "(Default: {})"
+                         "".format(app.config.mention_intervals_delimiter
+                                   .replace("%", "%%")))
+parser.add_argument('--repeat', type=int, default=5,
+                    help="Number of passes to time for each parser; the "
+                         "best one is reported.")
+
+
+def legacy_parse(path, delimiter, extra_matches):
+    """
+    The regex-based parsing from the old _read_paper(): Returns a list of
+    (line_num, start, end, free_text, grounding_id) tuples
+    """
+    reach_matcher = re.compile(r"(.+)" + delimiter + "((" +
+                               "|".join(app.config.paper_grounding_prefixes) +
+                               r"):.+)")
+    mentions = []
+    with open(path) as f:
+        for line in f:
+            fields = line.strip().split()
+            if len(fields) > 1:
+                line_num = fields[0]
+                for mention in fields[1:]:
+                    intervals = mention.split(delimiter, maxsplit=2)
+                    m = reach_matcher.match(intervals[2])
+                    for extra_match in extra_matches:
+                        reach_matcher.match(extra_match)
+                    assert m
+                    mentions.append((int(line_num), int(intervals[0]),
+                                     int(intervals[1]),
+                                     m.group(1).replace("_", " "),
+                                     m.group(2)))
+    return mentions
+
+
+def legacy_parse_events(path):
+    """
+    The event interval parsing from the old _read_paper()
+    """
+    events = []
+    with open(path) as f:
+        for line in f:
+            fields = line.strip().split()
+            if len(fields) > 1:
+                line_num = fields[0]
+                for event in fields[1:]:
+                    interval_start, interval_end = event.split("-")
+                    events.append((int(line_num), int(interval_start),
+                                   int(interval_end)))
+    return events
+
+
+def time_pass(function, paths):
+    """
+    Runs the given function on every path; returns (seconds, outputs)
+    """
+    start_time = timeit.default_timer()
+    outputs = [function(path) for path in paths]
+    return timeit.default_timer() - start_time, outputs
+
+
+def main():
+    args = parser.parse_args()
+    app.config.mention_intervals_delimiter = args.delimiter
+
+    paper_dirs = [os.path.join(args.papers_path, directory)
+                  for directory in sorted(os.listdir(args.papers_path))
+                  if not directory.endswith(
+                      app.config.paper_disabled_suffix)]
+    mention_paths = [os.path.join(directory, 'mention_intervals.txt')
+                     for directory in paper_dirs
+                     if os.path.isfile(os.path.join(directory,
+                                                    'mention_intervals.txt'))]
+    event_paths = [os.path.join(directory, 'event_intervals.txt')
+                   for directory in paper_dirs
+                   if os.path.isfile(os.path.join(directory,
+                                                  'event_intervals.txt'))]
+    if len(mention_paths) == 0:
+        print("No interval files found in: {}".format(args.papers_path))
+        return
+
+    # The hard-coded matches only ever used the "%" delimiter
+    extra_matches = [extra.replace("%", args.delimiter)
+                     for extra in LEGACY_EXTRA_MATCHES]
+    candidates = [
+        ("mentions: regex + debug matches",
+         lambda path: legacy_parse(path, args.delimiter, extra_matches),
+         mention_paths),
+        ("mentions: regex",
+         lambda path: legacy_parse(path, args.delimiter, []),
+         mention_paths),
+        ("mentions: reach_parser",
+         app.reach_parser.parse_mention_intervals,
+         mention_paths),
+        ("events: split",
+         legacy_parse_events,
+         event_paths),
+        ("events: reach_parser",
+         app.reach_parser.parse_event_intervals,
+         event_paths)
+    ]
+
+    print("Parsing {} paper folder(s) from {}, best of {} pass(es)."
+          "".format(len(mention_paths), args.papers_path, args.repeat))
+    outputs = {}
+    for label, function, paths in candidates:
+        best = None
+        for _ in range(args.repeat):
+            elapsed, output = time_pass(function, paths)
+            if best is None or elapsed < best:
+                best = elapsed
+        outputs[label] = [[tuple(record) for record in records]
+                          for records in output]
+        record_count = sum(len(records) for records in output)
+        print("{:>32}: {:8.2f} ms  ({:.0f} records/s)"
+              "".format(label, best * 1000,
+                        record_count / best if best else 0))
+
+    if outputs["mentions: regex"] != outputs["mentions: reach_parser"]:
+        print("MISMATCH: reach_parser mentions differ from the regex parser.")
+    if outputs["events: split"] != outputs["events: reach_parser"]:
+        print("MISMATCH: reach_parser events differ from the old parser.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+# Context Annotation Web App
+# Paper ingestion benchmark
+
+"""
+Times paper ingestion with the per-row ORM path and the bulk COPY path, and
+reports papers per second for each.
+
+Run from the `server` directory, against a scratch database that already has
+the tables and grounding dictionaries loaded:
+
+    python3 benchmarks/paper_ingestion.py -postgres "user:pass@host:port/db"
+
+Papers that are already in the database are left alone (and skipped); every
+paper loaded by the benchmark is deleted again after each pass.
+"""
+
+import argparse
+import logging
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.getcwd())
+
+import app.config
+from app.providers.postgresql import PostgresProvider, Paper
+
+parser = argparse.ArgumentParser(
+    description="Benchmarks per-row vs. bulk (COPY) paper ingestion.")
+parser.add_argument('-postgres',
+                    default=app.config.provider_classes['postgres'][
+                        'default_source'],
+                    help=app.config.provider_classes['postgres'][
+                        'option_help'])
+parser.add_argument('--papers-path',
+                    default=app.config.papers_path,
+                    help="Directory of Reach paper folders to load. "
+                         "(Default: {})".format(app.config.papers_path))
+parser.add_argument('--repeat', type=int, default=1,
+                    help="Number of passes to time for each mode.")
+
+
+def list_papers(provider, papers_path):
+    """
+    Returns the IDs of the enabled paper folders that are not in the
+    database yet
+    """
+    paper_ids = []
+    for directory in sorted(os.listdir(papers_path)):
+        if directory.endswith(app.config.paper_disabled_suffix) or \
+                not os.path.isdir(os.path.join(papers_path, directory)):
+            continue
+        if provider.session.query(Paper.id) \
+                .filter_by(id=directory).first() is not None:
+            print("Skipping paper already in the database: {}"
+                  "".format(directory))
+            continue
+        paper_ids.append(directory)
+    return paper_ids
+
+
+def run_pass(provider, paper_ids, bulk):
+    """
+    Loads every paper with the given mode and deletes it again.
+    Returns (parse time, write time, errors).
+    """
+    parse_time = 0.0
+    write_time = 0.0
+    errors = []
+    for paper_id in paper_ids:
+        start_time = timeit.default_timer()
+        paper = provider._read_paper(paper_id)
+        parse_time += timeit.default_timer() - start_time
+        if not paper:
+            errors.append((paper_id, "Could not read paper."))
+            continue
+
+        start_time = timeit.default_timer()
+        try:
+            provider._new_paper(paper, bulk=bulk)
+        except Exception as e:
+            errors.append((paper_id, repr(e)))
+        write_time += timeit.default_timer() - start_time
+
+    for paper_id in paper_ids:
+        try:
+            provider._delete_paper(paper_id)
+        except Exception:
+            provider.session.rollback()
+
+    return parse_time, write_time, errors
+
+
+def main():
+    args = parser.parse_args()
+    app.config.papers_path = args.papers_path
+    logging.getLogger().setLevel(logging.WARNING)
+
+    provider = PostgresProvider(args.postgres)
+    paper_ids = list_papers(provider, args.papers_path)
+    if len(paper_ids) == 0:
+        print("No papers to load from: {}".format(args.papers_path))
+        return
+
+    print("Loading {} paper(s) from {}, {} pass(es) per mode."
+          "".format(len(paper_ids), args.papers_path, args.repeat))
+    for label, bulk in [("per-row", False), ("bulk", True)]:
+        best = None
+        for _ in range(args.repeat):
+            parse_time, write_time, errors = run_pass(provider, paper_ids,
+                                                      bulk)
+            if best is None or parse_time + write_time < sum(best[:2]):
+                best = (parse_time, write_time, errors)
+
+        parse_time, write_time, errors = best
+        print("{:>8}: {:8.2f} papers/s  (parse {:.3f}s, write {:.3f}s, "
+              "{} error(s))".format(label,
+                                    len(paper_ids) / (parse_time + write_time),
+                                    parse_time, write_time, len(errors)))
+        for paper_id, error in errors:
+            print("          {}: {}".format(paper_id, error))
+
+    provider.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+# Context Annotation Web App
+# Parsed paper memory benchmark
+
+"""
+Parses every paper folder in a directory with app.papers.read_paper(), keeps
+all the parsed papers in memory (or, with --stream, only counts the records
+from app.papers.iter_paper()), and reports the process' peak RSS before and
+after.
+
+Run from the `server` directory; no database is needed:
+
+    python3 benchmarks/paper_memory.py
+    python3 benchmarks/paper_memory.py --papers-path data/old_papers \\
+        --delimiter=- --copies 10
+
+Folders without a 'sentences.txt' (like those in data/old_papers, which
+predate it) are parsed from a temporary copy with one blank sentence per line
+of 'titles.txt', so that their contexts, events and curated associations can
+still be measured.
+"""
+
+import argparse
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.getcwd())
+
+import app.config
+import app.papers
+
+parser = argparse.ArgumentParser(
+    description="Reports peak RSS for holding a parsed corpus in memory.")
+parser.add_argument('--papers-path',
+                    default=app.config.papers_path,
+                    help="Directory of Reach paper folders to parse. "
+                         "(Default: {})".format(app.config.papers_path))
+parser.add_argument('--delimiter',
+                    default=app.config.mention_intervals_delimiter,
+                    help="Delimiter used in 'mention_intervals.txt'. "
+                         "(Default: {})"
+                         "".format(app.config.mention_intervals_delimiter
+                                   .replace("%", "%%")))
+parser.add_argument('--copies', type=int, default=1,
+                    help="Number of times to parse (and keep) the corpus.")
+parser.add_argument('--stream', action='store_true',
+                    help="Stream the records with app.papers.iter_paper() "
+                         "and count them instead of keeping the papers.")
+
+
+def peak_rss():
+    """
+    Returns the peak resident set size of this process, in MiB
+    """
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        # Bytes on macOS, KiB elsewhere
+        return usage / (1 << 20)
+    return usage / (1 << 10)
+
+
+def prepare_papers(papers_path, work_path):
+    """
+    Copies the files read_paper() needs for every enabled paper folder to
+    `work_path`, adding a blank 'sentences.txt' where there is none.
+    Returns the list of paper IDs.
+    """
+    paper_ids = app.papers.list_papers(papers_path)
+    for paper_id in paper_ids:
+        source = os.path.join(papers_path, paper_id)
+        target = os.path.join(work_path, paper_id)
+        os.mkdir(target)
+        for file_name in app.papers.paper_files(paper_id):
+            if os.path.isfile(os.path.join(source, file_name)):
+                shutil.copy(os.path.join(source, file_name), target)
+
+        if not os.path.isfile(os.path.join(target, 'sentences.txt')):
+            with open(os.path.join(target, 'titles.txt')) as f:
+                line_count = sum(1 for _ in f)
+            with open(os.path.join(target, 'sentences.txt'), 'w') as f:
+                f.write("\n" * line_count)
+    return paper_ids
+
+
+def main():
+    args = parser.parse_args()
+    app.config.mention_intervals_delimiter = args.delimiter
+
+    work_path = tempfile.mkdtemp()
+    try:
+        paper_ids = prepare_papers(args.papers_path, work_path)
+        start_rss = peak_rss()
+
+        start_time = timeit.default_timer()
+        papers = []
+        paper_count = 0
+        record_count = 0
+        for _ in range(args.copies):
+            for paper_id in paper_ids:
+                if args.stream:
+                    records = app.papers.iter_paper(paper_id, work_path)
+                    if next(records, None) is not None:
+                        paper_count += 1
+                        record_count += sum(1 for _ in records)
+                    continue
+
+                paper = app.papers.read_paper(paper_id, work_path)
+                if paper:
+                    papers.append(paper)
+                    paper_count += 1
+                    record_count += len(paper.sentences) + \
+                        len(paper.contexts) + len(paper.events)
+        elapsed = timeit.default_timer() - start_time
+    finally:
+        shutil.rmtree(work_path)
+
+    print("Parsed {} paper(s) ({} sentences/contexts/events) from {} in "
+          "{:.3f}s.".format(paper_count, record_count, args.papers_path,
+                            elapsed))
+    print("Peak RSS: {:.1f} MiB before parsing, {:.1f} MiB after "
+          "(+{:.1f} MiB)".format(start_rss, peak_rss(),
+                                 peak_rss() - start_rss))
+
+
+if __name__ == '__main__':
+    main()
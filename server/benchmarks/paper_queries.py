@@ -0,0 +1,146 @@
+# Context Annotation Web App
+# Paper read path query count check
+
+"""
+Loads synthetic papers of increasing size (see app.synthetic_corpus), and
+counts the SQL statements that get_paper_data() sends for each, to check that
+reading a paper takes the same number of queries however many contexts and
+events it has.  Exits with status 1 if the count changes with paper size.
+Reads are timed both with the paper response cache (app.paper_cache) emptied
+first and with it answering.
+
+Run from the `server` directory, against a scratch database that already has
+the tables and grounding dictionaries loaded:
+
+    python3 benchmarks/paper_queries.py -postgres "user:pass@host:port/db"
+    python3 benchmarks/paper_queries.py -postgres "..." --sentences 10 1000
+
+Every paper loaded by the check is deleted again afterwards.
+"""
+
+import argparse
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.getcwd())
+
+import sqlalchemy
+
+import app.config
+import app.paper_cache
+import app.synthetic_corpus
+
+parser = argparse.ArgumentParser(
+    description="Counts the SQL statements get_paper_data() sends for "
+                "synthetic papers of increasing size.")
+parser.add_argument('-postgres',
+                    default=app.config.provider_classes['postgres'][
+                        'default_source'],
+                    help=app.config.provider_classes['postgres'][
+                        'option_help'])
+parser.add_argument('--sentences', type=int, nargs='+',
+                    default=[10, 100, 1000],
+                    help="Numbers of sentences per paper to check. "
+                         "(Default: 10 100 1000)")
+parser.add_argument('--repeat', type=int, default=5,
+                    help="Number of timed get_paper_data() calls per paper. "
+                         "(Default: 5)")
+parser.add_argument('--seed', type=int, default=0,
+                    help="Random seed for the generated papers.")
+
+
+class StatementCounter(object):
+    """
+    Counts the statements executed on a SQLAlchemy engine
+    """
+    def __init__(self, engine):
+        self.count = 0
+        sqlalchemy.event.listen(engine, "before_cursor_execute",
+                                self._count)
+
+    def _count(self, *_):
+        self.count += 1
+
+
+def check_paper(provider, counter, paper_id, repeat):
+    """
+    Returns (statements, contexts, events, seconds per uncached call,
+    seconds per cached call) for get_paper_data() calls on the given paper
+    """
+    app.paper_cache.cache.clear()
+    counter.count = 0
+    data = provider.get_paper_data({'paperID': paper_id})
+    statements = counter.count
+    if data.get('error'):
+        raise RuntimeError("get_paper_data() failed for {}: {}"
+                           "".format(paper_id, data['message']))
+
+    start_time = timeit.default_timer()
+    for _ in range(repeat):
+        # A fresh session each time, so nothing comes from its identity map
+        provider.session.expire_all()
+        app.paper_cache.cache.clear()
+        provider.get_paper_data({'paperID': paper_id})
+    elapsed = (timeit.default_timer() - start_time) / max(repeat, 1)
+
+    start_time = timeit.default_timer()
+    for _ in range(repeat):
+        provider.get_paper_data({'paperID': paper_id})
+    cached = (timeit.default_timer() - start_time) / max(repeat, 1)
+
+    contexts = len(data['contexts_reach']) + len(data['contexts_manual'])
+    return statements, contexts, len(data['events']), elapsed, cached
+
+
+def main():
+    args = parser.parse_args()
+
+    from app.providers.postgresql import PostgresProvider
+
+    logging.getLogger().setLevel(logging.WARNING)
+    provider = PostgresProvider(args.postgres)
+    counter = StatementCounter(provider.engine)
+
+    work_path = tempfile.mkdtemp()
+    paper_ids = []
+    counts = set()
+    try:
+        app.config.papers_path = work_path
+        print("{:>9}  {:>8}  {:>6}  {:>10}  {:>10}  {:>10}"
+              "".format("sentences", "contexts", "events", "statements",
+                        "ms/call", "cached ms"))
+        for sentences in args.sentences:
+            paper_id = app.synthetic_corpus.write_corpus(
+                work_path, 1, sentences, seed=args.seed,
+                prefix="PMCQRY{}x".format(sentences))[0]
+            provider._new_paper(provider._read_paper(paper_id))
+            paper_ids.append(paper_id)
+
+            statements, contexts, events, elapsed, cached = check_paper(
+                provider, counter, paper_id, args.repeat)
+            counts.add(statements)
+            print("{:>9}  {:>8}  {:>6}  {:>10}  {:>10.2f}  {:>10.2f}"
+                  "".format(sentences, contexts, events, statements,
+                            elapsed * 1000, cached * 1000))
+    finally:
+        for paper_id in paper_ids:
+            try:
+                provider._delete_paper(paper_id)
+            except Exception:
+                provider.session.rollback()
+        shutil.rmtree(work_path)
+        provider.shutdown()
+
+    if len(counts) > 1:
+        print("FAIL: get_paper_data() sent a different number of statements "
+              "for different paper sizes.")
+        sys.exit(1)
+    print("OK: {} statement(s) per paper.".format(counts.pop()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,181 @@
+# Context Annotation Web App
+# Windowed paper loading benchmark
+
+"""
+Loads synthetic papers of increasing size (see app.synthetic_corpus), and
+compares what it takes to show the start of each: reading and encoding the
+whole paper with get_paper_data() against reading and encoding its skeleton
+(get_paper_skeleton()) and first window of lines (get_paper_window()).
+Also checks that the paper's windows, one per section, add up to the whole
+paper, and exits with status 1 if they do not.
+
+Run from the `server` directory, against a scratch database that already has
+the tables and grounding dictionaries loaded:
+
+    python3 benchmarks/paper_windows.py -postgres "user:pass@host:port/db"
+    python3 benchmarks/paper_windows.py -postgres "..." --window 50
+
+Every paper loaded by the benchmark is deleted again afterwards.
+"""
+
+import argparse
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.getcwd())
+
+import app.config
+import app.frame_cache
+import app.paper_cache
+import app.synthetic_corpus
+
+parser = argparse.ArgumentParser(
+    description="Times showing the start of synthetic papers of increasing "
+                "size, whole and a window at a time.")
+parser.add_argument('-postgres',
+                    default=app.config.provider_classes['postgres'][
+                        'default_source'],
+                    help=app.config.provider_classes['postgres'][
+                        'option_help'])
+parser.add_argument('--sentences', type=int, nargs='+',
+                    default=[1000, 5000, 20000],
+                    help="Numbers of sentences per paper. "
+                         "(Default: 1000 5000 20000)")
+parser.add_argument('--window', type=int, default=100,
+                    help="Number of lines in the first window. "
+                         "(Default: 100)")
+parser.add_argument('--repeat', type=int, default=5,
+                    help="Number of timed reads per paper. (Default: 5)")
+parser.add_argument('--seed', type=int, default=0,
+                    help="Random seed for the generated papers.")
+
+
+def time_read(provider, read, repeat):
+    """
+    Returns (encoded size, seconds per call) for `read`, which returns a
+    list of messages to encode
+    """
+    size = 0
+    start_time = timeit.default_timer()
+    for _ in range(repeat):
+        # Nothing from the session's identity map or the paper cache
+        provider.session.expire_all()
+        app.paper_cache.cache.clear()
+        size = sum(len(app.frame_cache.encode_message(message))
+                   for message in read())
+    return size, (timeit.default_timer() - start_time) / max(repeat, 1)
+
+
+def stitch(skeleton, windows):
+    """
+    Puts a paper's windows back together into a get_paper_data() response
+    """
+    data = {
+        'paper':              dict(skeleton['paper'], sentences=[]),
+        'contexts_reach':     [],
+        'contexts_manual':    [],
+        'context_categories': skeleton['context_categories'],
+        'events':             []
+    }
+    del data['paper']['line_count']
+    for window in windows:
+        data['paper']['sentences'].extend(window['sentences'])
+        for key in ('contexts_reach', 'contexts_manual', 'events'):
+            data[key].extend(window[key])
+    for key in ('contexts_reach', 'contexts_manual'):
+        data[key].sort(key=lambda context: context['id'])
+    return data
+
+
+def check_paper(provider, paper_id, window, repeat):
+    """
+    Returns (whole paper KiB, whole paper ms, first window KiB, first
+    window ms) for the given paper; raises ValueError if its windows do not
+    add up to the whole paper
+    """
+    request = {'paperID': paper_id}
+
+    def read_whole():
+        return [{'id': 0, 'command': 'get_paper_data',
+                 'data': provider.get_paper_data(request)}]
+
+    def read_start():
+        return [{'id': 0, 'command': 'get_paper_skeleton',
+                 'data': provider.get_paper_skeleton(request)},
+                {'id': 1, 'command': 'get_paper_window',
+                 'data': provider.get_paper_window(
+                     dict(request, lines=[0, window]))}]
+
+    whole_size, whole_time = time_read(provider, read_whole, repeat)
+    start_size, start_time = time_read(provider, read_start, repeat)
+
+    skeleton = provider.get_paper_skeleton(request)
+    sections = len(skeleton['paper']['sections'].split(","))
+    windows = [provider.get_paper_window(dict(request, sections=[i, i + 1]))
+               for i in range(sections)]
+    for response in [skeleton] + windows:
+        if response.get('error'):
+            raise ValueError(response['message'])
+
+    # Compared as the client would receive them
+    whole = json.loads(json.dumps(provider.get_paper_data(request)))
+    stitched = json.loads(json.dumps(stitch(skeleton, windows)))
+    if stitched != whole:
+        raise ValueError("The windows of {} do not add up to the whole paper."
+                         "".format(paper_id))
+    return whole_size / 1024, whole_time, start_size / 1024, start_time
+
+
+def main():
+    args = parser.parse_args()
+
+    from app.providers.postgresql import PostgresProvider
+
+    logging.getLogger().setLevel(logging.WARNING)
+    provider = PostgresProvider(args.postgres)
+
+    work_path = tempfile.mkdtemp()
+    paper_ids = []
+    failed = False
+    try:
+        app.config.papers_path = work_path
+        print("{:>9}  {:>10}  {:>10}  {:>10}  {:>10}"
+              "".format("sentences", "whole KiB", "whole ms", "start KiB",
+                        "start ms"))
+        for sentences in args.sentences:
+            paper_id = app.synthetic_corpus.write_corpus(
+                work_path, 1, sentences, seed=args.seed,
+                prefix="PMCWIN{}x".format(sentences))[0]
+            provider._new_paper(provider._read_paper(paper_id))
+            paper_ids.append(paper_id)
+
+            try:
+                whole_size, whole_time, start_size, start_time = \
+                    check_paper(provider, paper_id, args.window, args.repeat)
+            except ValueError as e:
+                print("FAIL: {}".format(e))
+                failed = True
+                continue
+            print("{:>9}  {:>10.1f}  {:>10.2f}  {:>10.1f}  {:>10.2f}"
+                  "".format(sentences, whole_size, whole_time * 1000,
+                            start_size, start_time * 1000))
+    finally:
+        for paper_id in paper_ids:
+            try:
+                provider._delete_paper(paper_id)
+            except Exception:
+                provider.session.rollback()
+        shutil.rmtree(work_path)
+        provider.shutdown()
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()